@@ -0,0 +1,84 @@
+"""
+Optional read-replica routing for the read-mostly kid pages.
+
+Enabled by settings that define a ``replica`` database (see ``REPLICA_DB_HOST``
+in settings_production.py and ``LOCAL_REPLICA_DB`` in settings.py):
+
+- ``ReplicaReadMiddleware`` lets GET/HEAD requests under
+  ``REPLICA_READ_PATHS`` read from the replica.
+- ``ReplicaRouter`` sends those reads there. All writes, and all reads of any
+  other request, go to the primary.
+
+Replica lag is covered by two sticky-primary windows of
+``REPLICA_STICKY_SECONDS``:
+
+- After a POST (chore submission, reward request, login), the kid's session
+  reads from the primary, so the redirected page shows what was just written.
+- After any change to a kid or family, dashboard snapshots for that kid are
+  rebuilt from the primary (``core.caching.changed_recently``). A snapshot is
+  cached until the next change, so it must not be filled from a lagging copy.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = "default"
+REPLICA = "replica"
+STICKY_SESSION_KEY = "db_primary_until"
+
+_read_from_replica = contextvars.ContextVar("read_from_replica", default=False)
+
+
+@contextmanager
+def primary_reads(enabled=True):
+    """Read from the primary inside the block (no-op when ``enabled`` is false)."""
+    token = _read_from_replica.set(False) if enabled else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA if _read_from_replica.get() else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMiddleware:
+    """Route a request's reads to the replica unless its session is sticky.
+
+    Must come after SessionMiddleware, which then saves the sticky window.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, "REPLICA_READ_PATHS", ("/kid/home/", "/kid/api/")))
+        self.window = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD"):
+            request.session[STICKY_SESSION_KEY] = time.time() + self.window
+            return self.get_response(request)
+
+        use_replica = (
+            request.path.startswith(self.paths)
+            and request.session.get(STICKY_SESSION_KEY, 0) < time.time()
+        )
+        token = _read_from_replica.set(use_replica)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
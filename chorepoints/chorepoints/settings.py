@@ -56,8 +56,59 @@ DATABASES = {
     }
 }
 
+# Optional local PostgreSQL standing in for Azure (e.g. a Docker container);
+# the connection reuse benchmark in core/tests/test_performance.py needs it
+if os.environ.get('LOCAL_POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['LOCAL_POSTGRES_DB'],
+        'USER': os.environ.get('LOCAL_POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('LOCAL_POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('LOCAL_POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('LOCAL_POSTGRES_PORT', '5432'),
+    }
+
+# Optional second SQLite database acting as a read replica, to try the
+# replica router locally (chorepoints/db_router.py); nothing copies data to it
+if os.environ.get('LOCAL_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['LOCAL_REPLICA_DB'],
+    }
+    DATABASE_ROUTERS = ['chorepoints.db_router.ReplicaRouter']
+    REPLICA_STICKY_SECONDS = 10
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware') + 1,
+        'chorepoints.db_router.ReplicaReadMiddleware',
+    )
+
 AUTH_PASSWORD_VALIDATORS = []  # Simplified for local MVP
 
+# Cache (per-process local memory; production can switch to Redis via REDIS_URL)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'chorepoints',
+    }
+}
+
+# Whether all processes share the cache above. runserver and the tests run in
+# one process, so local memory counts as shared here; production sets it to
+# False without Redis, which disables caches that rely on version stamps.
+SHARED_CACHE = True
+
+# Seconds a kid dashboard snapshot may live in the cache (0 disables caching).
+# Snapshots are invalidated by version stamps on every relevant change anyway.
+DASHBOARD_SNAPSHOT_TIMEOUT = 300
+
+# Seconds a rendered adventure map fragment is kept (0 disables caching).
+# Its key (Kid.map_fragment_key) changes with position, ladder, theme and avatar.
+MAP_FRAGMENT_TIMEOUT = 3600
+
+# Seconds the rendered kid login picker is kept (0 disables caching).
+# Any kid change bumps the picker version stamp and replaces it.
+KID_PICKER_TIMEOUT = 3600
+
 LANGUAGE_CODE = 'lt'
 TIME_ZONE = 'Europe/Vilnius'  # Lithuanian timezone
 USE_I18N = True
@@ -80,11 +131,20 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # For collectstatic
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under their content hash and deduplicated (core/media_storage.py)
+STORAGES = {
+    "default": {"BACKEND": "core.media_storage.ContentAddressedFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
 # After any Django auth logout (including admin) go to landing page
 LOGOUT_REDIRECT_URL = '/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Session Security Settings
+# Sessions are read from the cache and written through to the database
+# (core/sessions.py), so kid pages skip the django_session lookup
+SESSION_ENGINE = 'core.sessions'
 SESSION_COOKIE_AGE = 3600  # 1 hour (in seconds)
 SESSION_SAVE_EVERY_REQUEST = False  # Only save when modified
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Clear session when browser closes
@@ -26,27 +26,100 @@ DATABASES = {
         'OPTIONS': {
             'sslmode': 'require',
         },
+        # Every new connection to Azure PostgreSQL costs a TCP + TLS handshake,
+        # so keep it open per gunicorn thread and ping it before reuse
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
-# Azure Storage for Static and Media Files
+# Alternatively DB_POOL=1 shares a psycopg 3 connection pool per worker
+# (Django 5.1+). CONN_HEALTH_CHECKS makes the pool check connections before
+# handing them out; persistent connections must then be off.
+DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '4')),  # gunicorn --threads
+        'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'max_idle': 300,  # seconds before idle pooled connections are closed
+    }
+
+# Optional read replica (e.g. an Azure PostgreSQL read replica server): kid
+# dashboard/API reads go there, everything else stays on the primary
+REPLICA_DB_HOST = os.environ.get('REPLICA_DB_HOST')
+if REPLICA_DB_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': REPLICA_DB_HOST,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+    }
+    DATABASE_ROUTERS = ['chorepoints.db_router.ReplicaRouter']
+    # Seconds a session / a changed kid keeps reading from the primary
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '10'))
+    MIDDLEWARE = list(MIDDLEWARE)
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware') + 1,
+        'chorepoints.db_router.ReplicaReadMiddleware',
+    )
+
+# Cache: shared Redis when configured, otherwise local memory (per gunicorn
+# worker - invalidations are then only seen by the worker that made them)
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    # A per-worker cache could serve a session another worker logged out
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    SHARED_CACHE = False
+    # Keyed by version stamps another worker would never see bumped. Map
+    # fragments stay cached: their key is the rendered content itself.
+    DASHBOARD_SNAPSHOT_TIMEOUT = 0
+    KID_PICKER_TIMEOUT = 0
+
+# Azure Storage for Media Files (and, opt-in, Static Files)
 AZURE_ACCOUNT_NAME = os.environ.get('AZURE_ACCOUNT_NAME')
 AZURE_ACCOUNT_KEY = os.environ.get('AZURE_ACCOUNT_KEY')
 
+# Static files are served by the app itself through WhiteNoise: collectstatic
+# writes content-hashed names plus precompressed .br/.gz variants to
+# STATIC_ROOT, and hashed files get far-future "immutable" caching.
+# Set AZURE_STATIC_FILES=1 to publish them to the Blob "static" container
+# instead (collectstatic then uploads on every boot, see startup.sh).
+AZURE_STATIC_FILES = os.environ.get('AZURE_STATIC_FILES', '').lower() in ('1', 'true', 'yes')
+
 # Django 4.2+ storage configuration (new format)
 STORAGES = {
     "default": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        # Content-addressed, deduplicated uploads with immutable caching
+        "BACKEND": "chorepoints.storage_backends.AzureMediaStorage",
         "OPTIONS": {
             "account_name": AZURE_ACCOUNT_NAME,
             "account_key": AZURE_ACCOUNT_KEY,
             "azure_container": "media",
-            "overwrite_files": True,  # Allow overwriting files with same name
+            "overwrite_files": True,  # Equal names hold equal bytes
             "expiration_secs": None,  # Public container, no expiration
         },
     },
     "staticfiles": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Static files (CSS, JavaScript, Images)
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+if AZURE_STATIC_FILES:
+    # Hashed names with "Cache-Control: immutable" on the blobs (see storage_backends.py)
+    STORAGES["staticfiles"] = {
+        "BACKEND": "chorepoints.storage_backends.AzureManifestStaticStorage",
         "OPTIONS": {
             "account_name": AZURE_ACCOUNT_NAME,
             "account_key": AZURE_ACCOUNT_KEY,
@@ -54,12 +127,15 @@ STORAGES = {
             "overwrite_files": True,
             "expiration_secs": None,
         },
-    },
-}
-
-# Static files (CSS, JavaScript, Images)
-STATIC_URL = f'https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+    }
+    STATIC_URL = f'https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/static/'
+else:
+    # Right after SecurityMiddleware so static requests skip sessions/auth
+    MIDDLEWARE = list(MIDDLEWARE)
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+    )
 
 # Media files (uploads)
 MEDIA_URL = f'https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/media/'
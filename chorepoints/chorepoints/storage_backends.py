@@ -2,26 +2,32 @@
 Custom storage backends for Azure Blob Storage.
 Separates static files and media files into different containers.
 """
+from django.contrib.staticfiles.storage import ManifestFilesMixin
 from storages.backends.azure_storage import AzureStorage
+from core.media_storage import ContentAddressedStorageMixin
 import os
+import re
 
+# Hashed static and media names change whenever their content does, so they never need revalidating
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed static names (css/app.css, staticfiles.json) change content on every deploy
+SHORT_CACHE_CONTROL = 'public, max-age=300'
+# The 12 hex digits HashedFilesMixin.hashed_name() puts before the extension
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}(\.[^./]+)?$')
 
-class AzureMediaStorage(AzureStorage):
-    """Storage for user-uploaded media files."""
+
+class AzureMediaStorage(ContentAddressedStorageMixin, AzureStorage):
+    """Storage for user-uploaded media files.
+
+    Files are named by their content hash and deduplicated (see
+    core/media_storage.py), so a blob never changes once written.
+    """
     account_name = os.environ.get('AZURE_ACCOUNT_NAME')
     account_key = os.environ.get('AZURE_ACCOUNT_KEY')
     azure_container = 'media'
     expiration_secs = None
-    overwrite_files = True  # Allow overwriting existing files
-    
-    def get_available_name(self, name, max_length=None):
-        """
-        Return the name as-is to allow overwriting.
-        By default, Django appends random strings to avoid conflicts.
-        """
-        if self.overwrite_files:
-            return name
-        return super().get_available_name(name, max_length)
+    overwrite_files = True  # Equal names hold equal bytes
+    cache_control = IMMUTABLE_CACHE_CONTROL
 
 
 class AzureStaticStorage(AzureStorage):
@@ -31,3 +37,20 @@ class AzureStaticStorage(AzureStorage):
     azure_container = 'static'
     expiration_secs = None
     overwrite_files = True
+
+
+class AzureManifestStaticStorage(ManifestFilesMixin, AzureStaticStorage):
+    """Static files with content-hashed names (staticfiles.json manifest).
+
+    collectstatic also uploads the unhashed originals and the manifest itself;
+    only the hashed copies get far-future caching.
+    """
+    cache_control = SHORT_CACHE_CONTROL
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        # The manifest (hashed_files) is only filled in after collectstatic has
+        # uploaded the hashed copies, so their names are recognised by pattern too
+        if name in self.hashed_files.values() or HASHED_NAME.search(name):
+            params['cache_control'] = IMMUTABLE_CACHE_CONTROL
+        return params
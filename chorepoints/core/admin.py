@@ -1,6 +1,13 @@
 from django.contrib import admin
+from django.db import transaction
+from django.urls import reverse
 from django.utils.html import mark_safe
-from .models import Kid, Chore, Reward, ChoreLog, Redemption, PointAdjustment
+from .models import (
+    Family, Kid, Chore, Reward, ChoreLog, Redemption, PointAdjustment, MilestoneLadder, LadderMilestone, LedgerEntry,
+    ImageJob, MediaBlob,
+)
+from .caching import bump_kid_version
+from .ledger import bulk_approve_chore_logs, bulk_approve_redemptions
 
 # Customize default admin site
 admin.site.site_title = "Taškų sistema"
@@ -26,7 +33,14 @@ class KidAdmin(admin.ModelAdmin):
     )
     
     def reset_map_position(self, request, queryset):
-        count = queryset.update(map_position=0)
+        with transaction.atomic():
+            positions = dict(queryset.select_for_update().values_list("pk", "map_position"))
+            LedgerEntry.objects.bulk_create(
+                LedgerEntry(kid_id=pk, kind=LedgerEntry.Kind.CORRECTION, balance_delta=0, position_delta=-position)
+                for pk, position in positions.items() if position
+            )
+            count = Kid.objects.filter(pk__in=positions).update(map_position=0)
+        bump_kid_version(*positions)  # update() sends no signals
         self.message_user(request, f"Atstatyta {count} vaikų žemėlapio pozicija į 0.")
     reset_map_position.short_description = "Atstatyti žemėlapio poziciją (0)"
 
@@ -67,10 +81,7 @@ class ChoreLogAdmin(admin.ModelAdmin):
     actions = ["approve_selected", "reject_selected"]
 
     def approve_selected(self, request, queryset):
-        count = 0
-        for log in queryset:
-            if log.approve():
-                count += 1
+        count = bulk_approve_chore_logs(queryset)
         self.message_user(request, f"Patvirtinta {count} darbų įrašų.")
     approve_selected.short_description = "Patvirtinti pasirinktus laukiančius darbus"
 
@@ -89,10 +100,7 @@ class RedemptionAdmin(admin.ModelAdmin):
     actions = ["approve_selected", "reject_selected"]
 
     def approve_selected(self, request, queryset):
-        count = 0
-        for red in queryset:
-            if red.approve():
-                count += 1
+        count = bulk_approve_redemptions(queryset)
         self.message_user(request, f"Patvirtinta {count} apdovanojimų.")
     approve_selected.short_description = "Patvirtinti pasirinktus laukiančius apdovanojimus"
 
@@ -123,3 +131,79 @@ class PointAdjustmentAdmin(admin.ModelAdmin):
         if not change:  # Only set parent on creation
             obj.parent = request.user
         super().save_model(request, obj, form, change)
+
+
+class LadderMilestoneInline(admin.TabularInline):
+    model = LadderMilestone
+    extra = 1
+    fields = ("position", "icon", "name", "bonus")
+
+
+@admin.register(MilestoneLadder)
+class MilestoneLadderAdmin(admin.ModelAdmin):
+    list_display = ("parent", "bonus_interval", "bonus_points", "updated_at")
+    fields = ("bonus_interval", "bonus_points")
+    inlines = [LadderMilestoneInline]
+
+    def save_model(self, request, obj, form, change):
+        if not change:  # Ladder belongs to the parent creating it
+            obj.parent = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(Family)
+class FamilyAdmin(admin.ModelAdmin):
+    """Family login codes: open /kid/login/<code>/ once on each kid device."""
+    list_display = ("parent", "login_code", "login_url")
+    search_fields = ("parent__username", "login_code")
+    list_select_related = ("parent",)
+
+    @admin.display(description="Prisijungimo nuoroda")
+    def login_url(self, obj):
+        return reverse("family_kid_login", args=[obj.login_code])
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    """Read-only view of the points ledger (entries are append-only)."""
+    list_display = ("created_at", "kid", "kind", "balance_delta", "position_delta", "milestone")
+    list_filter = ("kind", "kid__parent")
+    search_fields = ("kid__name",)
+    list_select_related = ("kid",)
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    """Upload processing queue, worked off by manage.py process_image_jobs."""
+    list_display = ("created_at", "kind", "object_id", "name", "status", "attempts", "processed_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("kind", "object_id", "name", "attempts", "error", "created_at", "processed_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    """Content-addressed media files and their reference counts (read-only)."""
+    list_display = ("name", "refs", "size", "created_at")
+    search_fields = ("name",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
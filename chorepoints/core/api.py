@@ -0,0 +1,132 @@
+"""
+Versioned JSON API for kid devices (wall tablets polling the dashboard).
+
+Responses carry a strong ETag built from the kid and family version stamps
+(``core/caching.py``). Those are bumped on every change that can affect the
+payload, so a poll with a matching ``If-None-Match`` is answered with
+``304 Not Modified`` after one cache lookup, without loading any dashboard rows.
+
+Stamps bumped in another worker's private cache would go unnoticed, so without
+a shared cache (``SHARED_CACHE``) the ETag is a hash of the payload instead:
+every poll builds the dashboard, and only an unchanged one is answered with 304.
+"""
+import hashlib
+
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_http_methods
+
+from .caching import cache_is_shared, get_versions
+from .dashboard import get_dashboard_snapshot
+from .views import _get_kid
+
+API_VERSION = 1
+
+
+def _image_url(field, ready=True):
+    # Not-yet-processed uploads are left out; clients fall back to the emoji
+    return field.url if field and ready else None
+
+
+def _chore(chore, pending_ids):
+    return {
+        "id": chore.id,
+        "title": chore.title,
+        "points": chore.points,
+        "icon": chore.display_icon,
+        "icon_url": _image_url(chore.icon_image, chore.icon_ready),
+        "pending": chore.id in pending_ids,
+    }
+
+
+def _reward(reward, pending_ids, balance):
+    return {
+        "id": reward.id,
+        "title": reward.title,
+        "cost_points": reward.cost_points,
+        "icon": reward.display_icon,
+        "icon_url": _image_url(reward.icon_image, reward.icon_ready),
+        "pending": reward.id in pending_ids,
+        "affordable": reward.cost_points <= balance,
+    }
+
+
+def dashboard_payload(kid, data) -> dict:
+    """Serialize a dashboard snapshot (see ``core/dashboard.py``) for the API."""
+    balance = kid.points_balance
+    next_reward = data["next_reward"]
+    return {
+        "api_version": API_VERSION,
+        "kid": {
+            "id": kid.id,
+            "name": kid.name,
+            "greeting": kid.get_greeting(),
+            "avatar_emoji": kid.avatar_emoji or kid.display_letter,
+            "photo_url": _image_url(kid.photo, kid.photo_ready),
+            "map_theme": kid.map_theme,
+        },
+        "balance": balance,
+        "map": data["map_data"],
+        "next_reward": {
+            "id": next_reward.id,
+            "title": next_reward.title,
+            "cost_points": next_reward.cost_points,
+            "progress_percent": data["progress_percent"],
+        } if next_reward else None,
+        "chores": [_chore(chore, data["pending_chore_ids"]) for chore in data["chores"]],
+        "rewards": [_reward(reward, data["pending_reward_ids"], balance) for reward in data["rewards"]],
+        "pending": {
+            "chores": [
+                {"id": log.id, "chore_id": log.chore_id, "title": log.chore.title,
+                 "points": log.points_awarded, "logged_at": log.logged_at}
+                for log in data["pending_logs"]
+            ],
+            "rewards": [
+                {"id": red.id, "reward_id": red.reward_id, "title": red.reward.title,
+                 "cost_points": red.cost_points, "redeemed_at": red.redeemed_at}
+                for red in data["pending_redemptions"]
+            ],
+        },
+        "history": {
+            "chores": [
+                {"id": log.id, "title": log.chore.title, "points": log.points_awarded,
+                 "processed_at": log.processed_at}
+                for log in data["approved_logs"]
+            ],
+            "rewards": [
+                {"id": red.id, "title": red.reward.title, "cost_points": red.cost_points,
+                 "processed_at": red.processed_at}
+                for red in data["approved_redemptions"]
+            ],
+            "adjustments": [
+                {"id": adj.id, "points": adj.points, "reason": adj.reason, "created_at": adj.created_at}
+                for adj in data["recent_adjustments"]
+            ],
+        },
+    }
+
+
+@require_http_methods(["GET", "HEAD"])
+def dashboard(request):
+    """The logged-in kid's dashboard as JSON, honouring If-None-Match."""
+    kid = _get_kid(request)
+    if not kid:
+        return JsonResponse({"error": "not logged in"}, status=401)
+
+    if cache_is_shared():
+        kid_version, family_version = get_versions(kid.pk, kid.parent_id)
+        etag = f'"v{API_VERSION}-{kid.pk}-{kid_version}-{family_version}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(dashboard_payload(kid, get_dashboard_snapshot(kid)))
+    else:
+        payload = JsonResponse(dashboard_payload(kid, get_dashboard_snapshot(kid)))
+        digest = hashlib.sha256(payload.content).hexdigest()[:32]
+        etag = f'"v{API_VERSION}-{kid.pk}-{digest}"'
+        response = get_conditional_response(request, etag=etag) or payload
+    # Stamps are bumped before and after each commit, so an ETag read next to
+    # an in-flight change is replaced on the following poll
+    response["ETag"] = etag
+    # Per-kid data: browsers may keep it but must revalidate every poll
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
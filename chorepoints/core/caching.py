@@ -0,0 +1,105 @@
+"""
+Cache version stamps for kid-facing data.
+
+Every kid has a version counter and every family (parent user) has one too.
+Anything cached for a kid embeds both numbers in its cache key, so bumping a
+counter invalidates all derived entries at once without having to know their
+keys. Counters are bumped from model signals (``core/signals.py``) and from
+the ledger's UPDATE-based paths, which do not send signals.
+
+Counters live in Django's cache. A missing counter is re-created from the
+clock, so an evicted counter never reuses an old value. They only invalidate
+other processes' copies if the cache is shared (``SHARED_CACHE``); production
+without Redis turns the version-keyed caches off.
+
+With a read replica (``chorepoints/db_router.py``) every bump also leaves a
+short-lived "changed recently" marker, so data that is about to be cached is
+read from the primary until the change has had time to replicate.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KID_VERSION_KEY = "kid-version:{kid_id}"
+FAMILY_VERSION_KEY = "family-version:{parent_id}"
+KID_PICKER_VERSION_KEY = "kid-picker-version:{parent_id}"
+CHANGED_RECENTLY_KEY = "changed-recently:{key}"
+
+
+def cache_is_shared() -> bool:
+    """Whether every process reads and bumps the same version stamps."""
+    return getattr(settings, "SHARED_CACHE", True)
+
+
+def _fresh_version() -> int:
+    return time.time_ns()
+
+
+def _get_stamps(keys) -> list[int]:
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _fresh_version(), None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+def get_versions(kid_id, parent_id) -> tuple[int, int]:
+    """Return the (kid, family) version stamps, creating missing ones."""
+    kid_version, family_version = _get_stamps(
+        [KID_VERSION_KEY.format(kid_id=kid_id), FAMILY_VERSION_KEY.format(parent_id=parent_id)]
+    )
+    return kid_version, family_version
+
+
+def get_kid_version(kid_id) -> int:
+    """Return the kid's version stamp alone (the family is not known yet)."""
+    return _get_stamps([KID_VERSION_KEY.format(kid_id=kid_id)])[0]
+
+
+def get_kid_picker_version(parent_id) -> int:
+    """Return the stamp of a family's kid login picker (its list of active kids)."""
+    return _get_stamps([KID_PICKER_VERSION_KEY.format(parent_id=parent_id)])[0]
+
+
+def changed_recently(kid_id, parent_id) -> bool:
+    """Whether the kid or family changed within the replica lag window."""
+    if not getattr(settings, "REPLICA_STICKY_SECONDS", 0):
+        return False
+    keys = [KID_VERSION_KEY.format(kid_id=kid_id), FAMILY_VERSION_KEY.format(parent_id=parent_id)]
+    return bool(cache.get_many([CHANGED_RECENTLY_KEY.format(key=key) for key in keys]))
+
+
+def _bump(keys) -> None:
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), None)
+    window = getattr(settings, "REPLICA_STICKY_SECONDS", 0)
+    if window:
+        cache.set_many({CHANGED_RECENTLY_KEY.format(key=key): True for key in keys}, window)
+
+
+def _bump_now_and_on_commit(keys) -> None:
+    # Bumping again after commit drops anything cached from pre-commit reads
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def bump_kid_version(*kid_ids) -> None:
+    """Invalidate everything cached for the given kids."""
+    _bump_now_and_on_commit([KID_VERSION_KEY.format(kid_id=kid_id) for kid_id in kid_ids])
+
+
+def bump_family_version(parent_id) -> None:
+    """Invalidate everything cached for all kids of a family."""
+    _bump_now_and_on_commit([FAMILY_VERSION_KEY.format(parent_id=parent_id)])
+
+
+def bump_kid_picker_version(parent_id) -> None:
+    """Invalidate a family's rendered kid login picker."""
+    _bump_now_and_on_commit([KID_PICKER_VERSION_KEY.format(parent_id=parent_id)])
@@ -0,0 +1,102 @@
+"""
+Data loader for the kid dashboard (kid_home).
+
+Fetches everything the page renders in a fixed number of queries: related
+chores/rewards are joined with ``select_related``, pending ID sets are derived
+from the already fetched rows and the "new approvals since last visit" check
+reuses the approval history instead of running separate ``exists()`` queries.
+
+The result, together with reward progress and map data, is cached per kid as
+a "dashboard snapshot" keyed by the kid and family version stamps from
+``core/caching.py``. Per-session effects (confetti, newly unlocked milestones,
+newly affordable rewards) are computed by the view on top of the snapshot.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from chorepoints.db_router import primary_reads
+
+from .caching import changed_recently, get_versions
+from .models import Chore, Reward, ChoreLog, Redemption
+
+HISTORY_LIMIT = 10
+
+
+def load_dashboard(kid) -> dict:
+    """Return the dashboard rows for ``kid`` as evaluated lists (7 queries)."""
+    chores = list(Chore.objects.filter(parent_id=kid.parent_id, active=True).order_by("title"))
+    rewards = list(Reward.objects.filter(parent_id=kid.parent_id, active=True).order_by("cost_points"))
+    pending_logs = list(
+        kid.chore_logs.filter(status=ChoreLog.Status.PENDING)
+        .select_related("chore").order_by("-logged_at")
+    )
+    pending_redemptions = list(
+        kid.redemptions.filter(status=Redemption.Status.PENDING)
+        .select_related("reward").order_by("-redeemed_at")
+    )
+    approved_logs = list(
+        kid.chore_logs.filter(status=ChoreLog.Status.APPROVED)
+        .select_related("chore").order_by(F("processed_at").desc(nulls_last=True))[:HISTORY_LIMIT]
+    )
+    approved_redemptions = list(
+        kid.redemptions.filter(status=Redemption.Status.APPROVED)
+        .select_related("reward").order_by(F("processed_at").desc(nulls_last=True))[:HISTORY_LIMIT]
+    )
+    recent_adjustments = list(kid.point_adjustments.order_by("-created_at")[:HISTORY_LIMIT])
+
+    # History is newest first, so its head is the latest approval of any kind
+    approval_times = [
+        row.processed_at for row in approved_logs[:1] + approved_redemptions[:1] if row.processed_at
+    ]
+    return {
+        "chores": chores,
+        "rewards": rewards,
+        "pending_logs": pending_logs,
+        "pending_redemptions": pending_redemptions,
+        "pending_chore_ids": {log.chore_id for log in pending_logs},
+        "pending_reward_ids": {red.reward_id for red in pending_redemptions},
+        "approved_logs": approved_logs,
+        "approved_redemptions": approved_redemptions,
+        "recent_adjustments": recent_adjustments,
+        "latest_approval_at": max(approval_times, default=None),
+    }
+
+
+def next_reward_progress(rewards: list, balance: int):
+    """Return (next reward to save for, progress percent) for a sorted reward list."""
+    if not rewards:
+        return None, 0
+    # reward just above current balance
+    for reward in rewards:
+        if reward.cost_points > balance:
+            return reward, int(min(100, (balance / reward.cost_points) * 100))
+    # already can afford all rewards: most expensive
+    return rewards[-1], 100
+
+
+def build_snapshot(kid) -> dict:
+    """Dashboard data plus everything derived from the kid's balance and position."""
+    snapshot = load_dashboard(kid)
+    snapshot["next_reward"], snapshot["progress_percent"] = next_reward_progress(
+        snapshot["rewards"], kid.points_balance
+    )
+    snapshot["map_data"] = kid.get_map_progress()
+    return snapshot
+
+
+def get_dashboard_snapshot(kid) -> dict:
+    """Cached ``build_snapshot`` result, rebuilt whenever the kid or family changes."""
+    timeout = getattr(settings, "DASHBOARD_SNAPSHOT_TIMEOUT", 300)
+    kid_version, family_version = get_versions(kid.pk, kid.parent_id)
+    # Balance and position are part of the key so a kid row read before a
+    # concurrent approval can never be paired with a newer snapshot
+    key = f"dashboard:{kid.pk}:{kid_version}:{family_version}:{kid.points_balance}:{kid.map_position}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        # Never cache a copy a lagging replica returned for a fresh change
+        with primary_reads(changed_recently(kid.pk, kid.parent_id)):
+            snapshot = build_snapshot(kid)
+        if timeout:
+            cache.set(key, snapshot, timeout)
+    return snapshot
@@ -1,10 +1,17 @@
 from django import forms
 from .models import Kid
+from .images import MAX_PIXELS
 
 class KidLoginForm(forms.Form):
-    kid = forms.ModelChoiceField(queryset=Kid.objects.filter(active=True))
+    kid = forms.ModelChoiceField(queryset=Kid.objects.filter(active=True).order_by("id"))
     pin = forms.CharField(widget=forms.PasswordInput, max_length=20)
 
+    def __init__(self, *args, parent_id=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if parent_id is not None:
+            # Family login: list and accept only this family's kids
+            self.fields["kid"].queryset = self.fields["kid"].queryset.filter(parent_id=parent_id)
+
 class ChangePinForm(forms.Form):
     old_pin = forms.CharField(
         label="Senas PIN",
@@ -61,6 +68,13 @@ class AvatarUploadForm(forms.ModelForm):
             # Validate file size (max 5MB)
             if photo.size > 5 * 1024 * 1024:
                 raise forms.ValidationError("Nuotrauka per didelė! Maksimalus dydis: 5MB")
+
+            # Pixel budget from the image header (a small file can decode huge)
+            image = getattr(photo, 'image', None)
+            if image is not None and image.width * image.height > MAX_PIXELS:
+                raise forms.ValidationError(
+                    f"Nuotrauka per didelė! Maksimalus dydis: {MAX_PIXELS // 1_000_000} megapikselių"
+                )
             
             # Validate file type by MIME type
             # Support all common photo formats from iPhone and other devices
@@ -0,0 +1,177 @@
+"""
+Background worker for uploaded photos and icons (``ImageJob`` rows).
+
+``process_next_job`` claims the oldest pending job, reads the original from
+the media storage, writes the downscaled image and its renditions
+(``core/images.py``) and marks the image ready, which bumps the kid/family
+version stamps so cached pages pick it up. It is run in a loop by
+``manage.py process_image_jobs``; ``--backfill`` queues images uploaded before
+renditions existed.
+
+Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL, so
+several workers can share the queue. The claim marks the job processing and
+commits at once; the work itself runs outside any transaction. A job whose file was replaced or removed
+in the meantime is marked done without touching storage. The kid/chore/reward
+row is only locked for the final update, once the renditions are stored.
+"""
+import logging
+import os
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .images import (
+    AVATAR_SIZE, AVATAR_WIDTHS, ICON_SIZE, ICON_WIDTHS, ImageTooLarge, process_image,
+    rendition_name,
+)
+from .models import Chore, ImageJob, Kid, Reward
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# A job processing for longer than this was abandoned by a stopped worker
+STALE_AFTER = timedelta(minutes=10)
+
+# kind -> (model, image field, ready flag, renditions field, max size, rendition widths)
+TARGETS = {
+    ImageJob.Kind.KID_PHOTO: (Kid, "photo", "photo_ready", "photo_renditions", AVATAR_SIZE, AVATAR_WIDTHS),
+    ImageJob.Kind.CHORE_ICON: (Chore, "icon_image", "icon_ready", "icon_renditions", ICON_SIZE, ICON_WIDTHS),
+    ImageJob.Kind.REWARD_ICON: (Reward, "icon_image", "icon_ready", "icon_renditions", ICON_SIZE, ICON_WIDTHS),
+}
+
+
+def process_next_job():
+    """Process the oldest pending job; return it, or None if the queue is empty."""
+    job = _claim_next_job()
+    if job is None:
+        return None
+    # Storage I/O and Pillow run outside any transaction; files written by a
+    # failed run are deleted again rather than left without a MediaBlob row
+    written = []
+    try:
+        _process(job, written)
+    except Exception as exc:
+        logger.exception("Image job %s failed", job.pk)
+        _discard(job, written)
+        job.error = f"{type(exc).__name__}: {exc}"
+        # Over the pixel budget will never succeed; don't retry
+        if job.attempts >= MAX_ATTEMPTS or isinstance(exc, ImageTooLarge):
+            job.status = ImageJob.Status.FAILED
+        else:
+            job.status = ImageJob.Status.PENDING
+    else:
+        job.status = ImageJob.Status.DONE
+        job.error = ""
+    job.processed_at = timezone.now()
+    job.save(update_fields=["status", "error", "processed_at"])
+    return job
+
+
+def _claim_next_job():
+    """Mark the oldest pending job as processing, in a transaction of its own.
+
+    A job left processing by a worker that died is claimed again after
+    ``STALE_AFTER``, or failed once it has used up its attempts.
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                ImageJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ImageJob.Status.PENDING)
+                    | Q(status=ImageJob.Status.PROCESSING, processed_at__lt=now - STALE_AFTER)
+                )
+                .order_by("created_at", "id")
+                .first()
+            )
+            if job is None:
+                return None
+            # processed_at is the claim time while the job is processing
+            job.processed_at = now
+            if job.status == ImageJob.Status.PROCESSING and job.attempts >= MAX_ATTEMPTS:
+                job.status = ImageJob.Status.FAILED
+                job.error = "Worker stopped while processing"
+                job.save(update_fields=["status", "error", "processed_at"])
+                continue
+            job.status = ImageJob.Status.PROCESSING
+            job.attempts += 1
+            job.save(update_fields=["status", "attempts", "processed_at"])
+        return job
+
+
+def _discard(job, written) -> None:
+    """Delete the files a run stored; the uploaded original stays."""
+    if not written:
+        return
+    model, field_name = TARGETS[job.kind][:2]
+    storage = model._meta.get_field(field_name).storage
+    for name in written:
+        if name != job.name:
+            try:
+                storage.delete(name)
+            except Exception:
+                logger.exception("Could not delete %s of image job %s", name, job.pk)
+
+
+def queue_missing_renditions() -> int:
+    """Queue a job for every stored image without renditions; return how many."""
+    queued = 0
+    for kind, (model, field_name, _, renditions_field, _, _) in TARGETS.items():
+        pending = ImageJob.objects.filter(kind=kind, status=ImageJob.Status.PENDING).values("object_id")
+        objs = (
+            model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+            .filter(**{renditions_field: {}}).exclude(pk__in=pending)
+        )
+        for obj in objs.iterator():
+            ImageJob.enqueue(kind, obj, getattr(obj, field_name))
+            queued += 1
+    return queued
+
+
+def _process(job, written):
+    model, field_name, ready_field, renditions_field, max_size, widths = TARGETS[job.kind]
+    obj = model.objects.filter(pk=job.object_id).first()
+    fieldfile = getattr(obj, field_name) if obj else None
+    if not fieldfile or fieldfile.name != job.name:
+        return  # replaced or removed since the upload
+
+    # Decoding and storage writes (seconds on Azure) run without a row lock, so
+    # ledger UPDATEs of the same kid never wait for them
+    with fieldfile.open("rb"):
+        result = process_image(fieldfile, max_size, widths)
+    storage = fieldfile.storage
+    renditions = {}
+    if result is not None:
+        rewritten, files = result
+        if rewritten is not None:
+            fieldfile.save(os.path.basename(job.name), rewritten, save=False)
+            written.append(fieldfile.name)
+        for fmt, width, content in files:
+            name = storage.save(rendition_name(fieldfile.name, width, fmt), content)
+            renditions.setdefault(fmt, {})[str(width)] = name
+            written.append(name)
+
+    with transaction.atomic():
+        current = (
+            model.objects.select_for_update().filter(pk=job.object_id)
+            .values_list(field_name, renditions_field).first()
+        )
+        replaced = current is None or current[0] != job.name
+        if not replaced:
+            setattr(obj, ready_field, True)
+            setattr(obj, renditions_field, renditions)
+            obj.save(update_fields=[field_name, ready_field, renditions_field])
+            # Renditions of the previous upload (or of an earlier run of this
+            # job) and the replaced original, once nothing refers to them any more
+            stale = [name for names in (current[1] or {}).values() for name in names.values()]
+            # Overwriting storages may reuse the original name; content-addressed
+            # ones only do so for identical bytes (one extra ref, never lost data)
+            if fieldfile.name != job.name:
+                stale.append(job.name)
+            transaction.on_commit(lambda: [storage.delete(name) for name in stale], robust=True)
+    if replaced:
+        _discard(job, written)  # replaced while it was processed
+    written.clear()  # committed: the files belong to the row now
@@ -0,0 +1,184 @@
+"""
+Downscaling and renditions of uploaded kid photos and chore/reward icons.
+
+A model save stores the upload as it is and queues an ``ImageJob``; the
+``process_image_jobs`` worker (``core/image_jobs.py``) then reads the original
+back from storage and, in memory:
+
+- decodes it at reduced resolution (JPEG ``draft``/``reduce``) within a
+  pixel budget (``MAX_PIXELS``), so large photos stay cheap in memory;
+- downscales it (``AVATAR_SIZE``/``ICON_SIZE``), rotates it upright from its
+  EXIF orientation and strips EXIF/XMP metadata, replacing the original;
+- renders square crops at the display sizes (``AVATAR_WIDTHS``/``ICON_WIDTHS``)
+  in AVIF (when Pillow supports it) and WebP, plus JPEG, or PNG for images
+  with transparency, for browsers without either.
+
+Rendition names are kept on the model (``photo_renditions``/``icon_renditions``)
+as ``{format: {width: name}}`` and turned into ``<picture>``/``srcset`` markup
+by the ``renditions`` template tags. Nothing touches a filesystem path, so this
+works the same for the local ``FileSystemStorage`` and for Azure Blob Storage.
+
+Anything Pillow cannot read (e.g. HEIC without a plugin) is kept as uploaded.
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow should be installed; safeguard
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZE = 400
+ICON_SIZE = 128
+
+# Square rendition widths: login tiles show avatars at 64px, the dashboard at
+# 80px and the upload page at 120px; icons are shown at 22-28px
+AVATAR_WIDTHS = (64, 128, 256)
+ICON_WIDTHS = (32, 64, 96)
+
+# Encoder options per output format; iPhone MPO photos are written as JPEG
+SAVE_OPTIONS = {
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 80, "method": 6},
+    "AVIF": {"quality": 60},
+}
+OUTPUT_FORMATS = {"MPO": "JPEG"}
+
+# Decompression-bomb guard: 48 MP iPhone photos fit, anything larger is refused
+# before a single pixel is decoded
+MAX_PIXELS = 64_000_000
+ORIENTATION = 0x0112  # EXIF tag
+# Metadata (GPS location, camera data) that makes the worker rewrite an
+# otherwise fitting original; of the image info only KEEP_INFO is written
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop")
+KEEP_INFO = ("icc_profile", "transparency")
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg", "png": "png"}
+
+
+class ImageTooLarge(ValueError):
+    """The image has more pixels than ``MAX_PIXELS``."""
+
+
+def modern_formats() -> list[str]:
+    """Rendition formats preferred over JPEG/PNG, best first."""
+    if Image is None:
+        return []
+    formats = []
+    if "avif" in features.modules and features.check_module("avif"):
+        formats.append("avif")
+    if features.check_module("webp"):
+        formats.append("webp")
+    return formats
+
+
+def has_new_upload(fieldfile) -> bool:
+    """True if ``fieldfile`` holds an upload that has not been stored yet."""
+    return bool(fieldfile) and not fieldfile._committed
+
+
+def _encode(img, fmt: str) -> ContentFile:
+    fmt = fmt.upper()
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buffer = BytesIO()
+    # Only the colour profile is carried over; EXIF (GPS, camera) is never written
+    img.save(buffer, format=fmt, icc_profile=img.info.get("icc_profile"), **SAVE_OPTIONS.get(fmt, {}))
+    return ContentFile(buffer.getvalue())
+
+
+def _decode(img, max_size: int):
+    """Load ``img`` at no more than about twice ``max_size``, upright.
+
+    JPEGs are decoded at 1/2-1/8 scale by the decoder itself (``draft``), so
+    a 48 MP photo never exists in memory at full size. Other formats are
+    decoded and immediately shrunk by an integer factor (``reduce``). The 2x
+    headroom keeps the final LANCZOS resize sharp.
+    """
+    target = max_size * 2
+    img.draft(None, (target, target))
+    img.load()
+    factor = min(img.width // target, img.height // target)
+    if factor > 1:
+        img = img.reduce(factor)
+    ImageOps.exif_transpose(img, in_place=True)
+    return img
+
+
+def process_image(file, max_size: int, widths):
+    """Read ``file`` once and return ``(rewritten, renditions)``.
+
+    ``rewritten`` is a ``ContentFile`` to replace the original with: scaled to
+    fit ``max_size``, rotated upright and stripped of EXIF/XMP metadata. It is
+    None if the original already is all that. ``renditions`` is a list of
+    ``(format, width, ContentFile)`` square crops; widths larger than the
+    image are replaced by one crop at the image's own size.
+
+    Returns None if the file cannot be read or is animated, in which case the
+    original should be kept and shown as is. Raises ``ImageTooLarge`` for
+    images over ``MAX_PIXELS``.
+    """
+    if Image is None:
+        return None
+    try:
+        file.seek(0)
+        with Image.open(file) as img:
+            # Header only so far: refuse decompression bombs before decoding
+            if img.width * img.height > MAX_PIXELS:
+                raise ImageTooLarge(f"{img.width}x{img.height} is over the {MAX_PIXELS} pixel budget")
+            if getattr(img, "is_animated", False):
+                return None  # thumbnail() would keep only the first frame
+            fmt = OUTPUT_FORMATS.get(img.format, img.format)
+            transparent = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+            needs_rewrite = (
+                img.width > max_size or img.height > max_size
+                or img.getexif().get(ORIENTATION, 1) != 1
+                or any(key in img.info for key in METADATA_KEYS)
+            )
+            img = _decode(img, max_size)
+            img.info = {key: img.info[key] for key in KEEP_INFO if key in img.info}
+            if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                # Palette/CMYK images would be resized without filtering
+                img = img.convert("RGBA" if transparent else "RGB")
+            img.thumbnail((max_size, max_size))
+            rewritten = _encode(img, fmt) if needs_rewrite else None
+
+            formats = modern_formats() + ["png" if transparent else "jpeg"]
+            side = min(img.size)
+            renditions = []
+            for width in sorted(widths):
+                width = min(width, side)  # never upscale
+                crop = ImageOps.fit(img, (width, width))
+                renditions.extend((f, width, _encode(crop, f)) for f in formats)
+                if width == side:
+                    break
+    except Image.DecompressionBombError as exc:  # Pillow's own, far higher limit
+        raise ImageTooLarge(str(exc)) from exc
+    except Image.UnidentifiedImageError:
+        logger.warning("Could not read image %s, keeping it as is", file.name)
+        return None
+    return rewritten, renditions
+
+
+def rendition_name(original: str, width: int, fmt: str) -> str:
+    """Storage name for a rendition, next to the original upload.
+
+    Content-addressed storages (``core/media_storage.py``) keep only its extension.
+    """
+    directory, filename = posixpath.split(original)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "renditions", f"{stem}-{width}.{EXTENSIONS[fmt]}")
+
+
+def delete_renditions(storage, renditions) -> None:
+    """Remove the stored files of a ``{format: {width: name}}`` mapping."""
+    for names in (renditions or {}).values():
+        for name in names.values():
+            storage.delete(name)
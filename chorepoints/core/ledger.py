@@ -0,0 +1,278 @@
+"""
+Points ledger service.
+
+All balance and adventure-map changes go through this module so that every
+approval is applied with row-level F() expression UPDATEs inside a single
+transaction instead of the old read-modify-write on a Python ``Kid`` object.
+Each change also appends ``LedgerEntry`` rows in the same transaction, so the
+kid's counters can be audited and recomputed (``manage.py verify_ledger``).
+
+The first UPDATE on the kid row takes the row lock (PostgreSQL) or the write
+lock (SQLite); the follow-up SELECT and the optional milestone-bonus UPDATE
+therefore always see a consistent position and concurrent approvals for the
+same kid can no longer lose updates. Entries are timestamped only once that
+lock is held, so their ``created_at`` order (which ``verify_ledger`` replays)
+is the order in which they were applied.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_kid_version
+from .milestones import DEFAULT_MILESTONE_INDEX, get_milestone_index
+from .models import Kid, ChoreLog, Redemption, LedgerEntry
+
+
+@dataclass(frozen=True)
+class LedgerResult:
+    """Kid state after a ledger operation has been applied."""
+    points_balance: int
+    map_position: int
+    highest_milestone: int
+    milestones_crossed: tuple = ()
+
+
+def milestones_crossed(old_position: int, new_position: int, index=None) -> list[dict]:
+    """Return milestones passed when the map moves from old to new position.
+
+    Bonus intervals (every 500 points by default) only apply once the kid was
+    already past the last milestone of the ladder before this change.
+    """
+    return (index or DEFAULT_MILESTONE_INDEX).crossed(old_position, new_position)
+
+
+def _sync_kid(kid, result: LedgerResult) -> None:
+    """Copy ledger results onto an in-memory Kid so callers see fresh values."""
+    if kid is None:
+        return
+    kid.points_balance = result.points_balance
+    kid.map_position = result.map_position
+    kid.highest_milestone = result.highest_milestone
+    # Already journaled; a later kid.save() must not record them again
+    kid._remember_ledger_state()
+
+
+def _read_state(kid_id) -> tuple[int, int, int, int]:
+    return Kid.objects.filter(pk=kid_id).values_list(
+        "points_balance", "map_position", "highest_milestone", "parent_id"
+    ).get()
+
+
+def _milestone_entries(kid_id, crossed, last_position: int, now) -> list:
+    """One MILESTONE entry per crossed milestone (bonus tail entries carry no milestone)."""
+    return [
+        LedgerEntry(
+            kid_id=kid_id,
+            kind=LedgerEntry.Kind.MILESTONE,
+            balance_delta=milestone['bonus'],
+            position_delta=milestone['bonus'],
+            milestone=milestone['position'] if milestone['position'] <= last_position else None,
+            created_at=now,
+        )
+        for milestone in crossed
+    ]
+
+
+def credit(kid_id, points: int, *, kind=LedgerEntry.Kind.ADJUSTMENT, **source) -> LedgerResult:
+    """Add earned points to balance and map position, awarding milestone bonuses.
+
+    ``source`` (chore_log/redemption/adjustment) is stored on the ledger entry.
+    """
+    with transaction.atomic():
+        updated = Kid.objects.filter(pk=kid_id).update(
+            points_balance=F("points_balance") + points,
+            map_position=F("map_position") + points,
+        )
+        if not updated:
+            raise Kid.DoesNotExist(f"Kid {kid_id} does not exist")
+        now = timezone.now()  # under the row lock
+        balance, position, highest, parent_id = _read_state(kid_id)
+        index = get_milestone_index(parent_id, for_update=True)
+        crossed = index.crossed(position - points, position)
+        entries = [LedgerEntry(
+            kid_id=kid_id, kind=kind, balance_delta=points, position_delta=points, created_at=now, **source
+        )]
+        entries += _milestone_entries(kid_id, crossed, index.last_position, now)
+        LedgerEntry.objects.bulk_create(entries)
+        if crossed:
+            bonus = sum(milestone['bonus'] for milestone in crossed)
+            last_milestone_position = index.last_position
+            reached = [m['position'] for m in crossed if m['position'] <= last_milestone_position]
+            if reached:
+                highest = max(reached)
+            Kid.objects.filter(pk=kid_id).update(
+                points_balance=F("points_balance") + bonus,
+                map_position=F("map_position") + bonus,
+                highest_milestone=highest,
+            )
+            balance += bonus
+            position += bonus
+    # UPDATEs send no signals; invalidate cached dashboards explicitly
+    bump_kid_version(kid_id)
+    return LedgerResult(balance, position, highest, tuple(crossed))
+
+
+def debit(kid_id, points: int, *, kind=LedgerEntry.Kind.ADJUSTMENT,
+          allow_negative: bool = False, **source) -> LedgerResult | None:
+    """Subtract points from the balance only (map position never goes back).
+
+    Returns ``None`` without touching the row when the balance is too low,
+    unless ``allow_negative`` is set (parent penalties may overdraw).
+    """
+    with transaction.atomic():
+        queryset = Kid.objects.filter(pk=kid_id)
+        if not allow_negative:
+            queryset = queryset.filter(points_balance__gte=points)
+        if not queryset.update(points_balance=F("points_balance") - points):
+            return None
+        LedgerEntry.objects.create(kid_id=kid_id, kind=kind, balance_delta=-points, **source)
+        balance, position, highest, _ = _read_state(kid_id)
+    bump_kid_version(kid_id)
+    return LedgerResult(balance, position, highest)
+
+
+def approve_chore_log(log: ChoreLog) -> LedgerResult | None:
+    """Approve a pending chore log and credit its points. ``None`` if not pending."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = ChoreLog.objects.filter(pk=log.pk, status=ChoreLog.Status.PENDING).update(
+            status=ChoreLog.Status.APPROVED, processed_at=now
+        )
+        if not claimed:
+            return None
+        result = credit(log.child_id, log.points_awarded, kind=LedgerEntry.Kind.CHORE, chore_log=log)
+    log.status = ChoreLog.Status.APPROVED
+    log.processed_at = now
+    if ChoreLog.child.is_cached(log):
+        _sync_kid(log.child, result)
+    return result
+
+
+def approve_redemption(redemption: Redemption) -> LedgerResult | None:
+    """Approve a pending redemption if the kid can still afford it."""
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = Redemption.objects.filter(pk=redemption.pk, status=Redemption.Status.PENDING).update(
+            status=Redemption.Status.APPROVED, processed_at=now
+        )
+        if not claimed:
+            return None
+        result = debit(
+            redemption.child_id, redemption.cost_points,
+            kind=LedgerEntry.Kind.REDEMPTION, redemption=redemption,
+        )
+        if result is None:
+            # Not enough points: undo the status claim, redemption stays pending
+            transaction.set_rollback(True)
+            return None
+    redemption.status = Redemption.Status.APPROVED
+    redemption.processed_at = now
+    if Redemption.child.is_cached(redemption):
+        _sync_kid(redemption.child, result)
+    return result
+
+
+def apply_adjustment(adjustment) -> LedgerResult:
+    """Apply a parent's manual point adjustment (positive moves the map too)."""
+    if adjustment.points > 0:
+        result = credit(adjustment.kid_id, adjustment.points, adjustment=adjustment)
+    else:
+        result = debit(adjustment.kid_id, -adjustment.points, allow_negative=True, adjustment=adjustment)
+    if type(adjustment).kid.is_cached(adjustment):
+        _sync_kid(adjustment.kid, result)
+    return result
+
+
+def _share_milestone_indexes(kids) -> None:
+    """Look up each family's ladder once for all kids in a bulk operation."""
+    indexes = {}
+    for kid in kids:
+        if kid.parent_id not in indexes:
+            indexes[kid.parent_id] = get_milestone_index(kid.parent_id, for_update=True)
+        kid.milestone_index = indexes[kid.parent_id]
+
+
+def _credit_in_memory(kid, points: int, now) -> list:
+    """Apply ``credit`` rules to an already locked Kid instance (bulk path).
+
+    Returns the milestone ledger entries; the caller adds the credit entry.
+    """
+    index = kid.milestone_index
+    old_position = kid.map_position
+    kid.points_balance += points
+    kid.map_position += points
+    crossed = index.crossed(old_position, kid.map_position)
+    last_milestone_position = index.last_position
+    entries = _milestone_entries(kid.pk, crossed, last_milestone_position, now)
+    for milestone in crossed:
+        kid.points_balance += milestone['bonus']
+        kid.map_position += milestone['bonus']
+        if milestone['position'] <= last_milestone_position:
+            kid.highest_milestone = milestone['position']
+    return entries
+
+
+def bulk_approve_chore_logs(queryset) -> int:
+    """Approve every pending log in ``queryset`` with a fixed number of queries.
+
+    Logs are applied per kid in queryset order, so the result matches calling
+    ``approve()`` on each row in turn. Returns the number of approved logs.
+    """
+    with transaction.atomic():
+        logs = list(queryset.filter(status=ChoreLog.Status.PENDING).select_for_update(of=("self",)))
+        if not logs:
+            return 0
+        kids = Kid.objects.select_for_update().in_bulk({log.child_id for log in logs})
+        now = timezone.now()  # under the kid row locks
+        _share_milestone_indexes(kids.values())
+        entries = []
+        for log in logs:
+            entries.append(LedgerEntry(
+                kid_id=log.child_id, kind=LedgerEntry.Kind.CHORE, chore_log=log,
+                balance_delta=log.points_awarded, position_delta=log.points_awarded, created_at=now,
+            ))
+            entries += _credit_in_memory(kids[log.child_id], log.points_awarded, now)
+            log.status = ChoreLog.Status.APPROVED
+            log.processed_at = now
+        ChoreLog.objects.bulk_update(logs, ["status", "processed_at"])
+        LedgerEntry.objects.bulk_create(entries)
+        Kid.objects.bulk_update(kids.values(), ["points_balance", "map_position", "highest_milestone"])
+        bump_kid_version(*kids)
+    return len(logs)
+
+
+def bulk_approve_redemptions(queryset) -> int:
+    """Approve pending redemptions in order while each kid can afford them.
+
+    Redemptions the kid cannot afford at their turn stay pending, exactly as
+    with sequential ``approve()`` calls. Returns the number approved.
+    """
+    with transaction.atomic():
+        redemptions = list(queryset.filter(status=Redemption.Status.PENDING).select_for_update(of=("self",)))
+        if not redemptions:
+            return 0
+        kids = Kid.objects.select_for_update().in_bulk({red.child_id for red in redemptions})
+        now = timezone.now()  # under the kid row locks
+        approved = []
+        for red in redemptions:
+            kid = kids[red.child_id]
+            if kid.points_balance < red.cost_points:
+                continue
+            kid.points_balance -= red.cost_points
+            red.status = Redemption.Status.APPROVED
+            red.processed_at = now
+            approved.append(red)
+        if approved:
+            Redemption.objects.bulk_update(approved, ["status", "processed_at"])
+            LedgerEntry.objects.bulk_create(
+                LedgerEntry(
+                    kid_id=red.child_id, kind=LedgerEntry.Kind.REDEMPTION, redemption=red,
+                    balance_delta=-red.cost_points, created_at=now,
+                )
+                for red in approved
+            )
+            Kid.objects.bulk_update(kids.values(), ["points_balance"])
+            bump_kid_version(*kids)
+    return len(approved)
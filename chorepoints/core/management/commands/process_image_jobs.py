@@ -0,0 +1,62 @@
+"""
+Management command that runs the background image worker.
+
+Downscales newly uploaded kid photos and chore/reward icons queued as
+ImageJob rows (see core/image_jobs.py). startup.sh runs it next to gunicorn.
+
+Usage:
+    python manage.py process_image_jobs             # run forever, poll every 5s
+    python manage.py process_image_jobs --once      # drain the queue and exit
+    python manage.py process_image_jobs --interval 2
+    python manage.py process_image_jobs --backfill --once  # add renditions to older uploads
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.image_jobs import process_next_job, queue_missing_renditions
+from core.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Downscale uploaded photos and icons queued as image jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the pending jobs and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when the queue is empty (default 5)',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First queue every stored photo and icon that has no renditions',
+        )
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f'Queued {queue_missing_renditions()} images without renditions')
+        while True:
+            done = failed = 0
+            while (job := process_next_job()) is not None:
+                if job.status == ImageJob.Status.DONE:
+                    done += 1
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'✗ {job}: {job.error}'))
+                    if job.status == ImageJob.Status.PENDING:
+                        break  # retried after the interval
+            if done or failed:
+                self.stdout.write(f'Processed {done} images, {failed} failed')
+            if options['once']:
+                break
+            # Don't keep a connection open across idle polls (CONN_MAX_AGE)
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,115 @@
+"""
+Management command to check kid balances against the points ledger.
+
+Replays every kid's LedgerEntry rows and compares the result with the stored
+points_balance, map_position and highest_milestone. Entries and kids are both
+streamed in primary-key / (kid, created_at) order and merge-joined, so memory
+use stays bounded by --chunk-size no matter how large the ledger grows.
+
+Usage:
+    python manage.py verify_ledger               # report drift only
+    python manage.py verify_ledger --fix         # rewrite drifted kids from the ledger
+    python manage.py verify_ledger --chunk-size 5000
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.caching import bump_kid_version
+from core.models import Kid, LedgerEntry
+
+
+def replay_ledger(chunk_size=2000):
+    """Yield (kid_id, balance, position, highest_milestone) per kid with entries.
+
+    ``highest_milestone`` is the milestone of the latest entry that set one.
+    """
+    entries = LedgerEntry.objects.order_by("kid_id", "created_at", "id").values_list(
+        "kid_id", "balance_delta", "position_delta", "milestone"
+    )
+    current = None
+    balance = position = highest = 0
+    for kid_id, balance_delta, position_delta, milestone in entries.iterator(chunk_size=chunk_size):
+        if kid_id != current:
+            if current is not None:
+                yield current, balance, position, highest
+            current = kid_id
+            balance = position = highest = 0
+        balance += balance_delta
+        position += position_delta
+        if milestone is not None:
+            highest = milestone
+    if current is not None:
+        yield current, balance, position, highest
+
+
+class Command(BaseCommand):
+    help = 'Verify kid balances, map positions and milestones against the points ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite drifted kid counters from the ledger',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip (default 2000)',
+        )
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+        chunk_size = options['chunk_size']
+
+        kids = Kid.objects.order_by("id").values_list(
+            "id", "name", "points_balance", "map_position", "highest_milestone"
+        ).iterator(chunk_size=chunk_size)
+        replayed = replay_ledger(chunk_size)
+        expected = next(replayed, None)
+
+        checked = drifted = fixed = 0
+        for kid_id, name, *stored in kids:
+            # Both streams are ordered by kid id; skip ledger rows of deleted kids
+            while expected is not None and expected[0] < kid_id:
+                expected = next(replayed, None)
+            if expected is not None and expected[0] == kid_id:
+                ledger_state = list(expected[1:])
+            else:
+                ledger_state = [0, 0, 0]
+            checked += 1
+            if stored == ledger_state:
+                continue
+
+            drifted += 1
+            self.stdout.write(self.style.WARNING(
+                f'✗ {name} (#{kid_id}): stored balance/position/milestone {tuple(stored)}, '
+                f'ledger {tuple(ledger_state)}'
+            ))
+            if fix and self._fix_kid(kid_id, stored, ledger_state):
+                fixed += 1
+
+        self.stdout.write(f'Checked {checked} kids, {drifted} drifted')
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f'✓ Fixed {fixed} kids'))
+        elif drifted:
+            self.stdout.write('Run with --fix to rewrite them from the ledger')
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Ledger and balances match'))
+
+    def _fix_kid(self, kid_id, stored, ledger_state) -> bool:
+        balance, position, highest = ledger_state
+        with transaction.atomic():
+            # Only overwrite the values we compared; a concurrent approval
+            # changes the row and is left for the next run
+            updated = Kid.objects.filter(
+                pk=kid_id,
+                points_balance=stored[0],
+                map_position=stored[1],
+                highest_milestone=stored[2],
+            ).update(points_balance=balance, map_position=position, highest_milestone=highest)
+        if not updated:
+            self.stdout.write(self.style.WARNING(f'  #{kid_id} changed during the check, skipped'))
+            return False
+        bump_kid_version(kid_id)
+        return True
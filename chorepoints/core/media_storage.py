@@ -0,0 +1,109 @@
+"""
+Content-addressed media storage for uploads and image renditions.
+
+Every file is stored as ``sha256/<2 hex>/<sha256 of the bytes>.<ext>`` no
+matter what it was called on upload, so:
+
+- two kids uploading different ``IMG_4762.jpg`` files never overwrite each
+  other, and a name always refers to the same bytes; URLs can be cached
+  forever (``Cache-Control: immutable`` on Azure, see storage_backends.py);
+- identical uploads (the same icon for ten chores) are stored once.
+  ``MediaBlob`` rows count the references; a duplicate save only bumps the
+  count without writing to storage, and ``delete()`` removes the file when
+  the last reference goes.
+
+Releasing the last reference leaves the row at ``refs=0`` until the commit;
+the file and row are then removed together under the row lock, unless a save
+has taken the row back in the meantime. A save that finds such a released row
+writes the bytes again, in case the file is already gone.
+
+Files stored before content addressing have no ``MediaBlob`` row and are
+deleted as before.
+"""
+import hashlib
+import posixpath
+from functools import partial
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+HASH_PREFIX = "sha256"
+
+
+def content_name(name: str, content) -> str:
+    """The content-addressed storage name for ``content`` uploaded as ``name``."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    hexdigest = digest.hexdigest()
+    ext = posixpath.splitext(name)[1].lower()
+    return f"{HASH_PREFIX}/{hexdigest[:2]}/{hexdigest}{ext}"
+
+
+class ContentAddressedStorageMixin:
+    """Store files under their content hash, reference-counted in ``MediaBlob``."""
+
+    def save(self, name, content, max_length=None):
+        from core.models import MediaBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = content_name(name, content)
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None:
+                MediaBlob.objects.filter(pk=blob.pk).update(refs=F("refs") + 1)
+                if blob.refs:
+                    return name  # already stored: no write
+                # Released and about to be removed: keep it, rewritten below
+            name = super().save(name, content, max_length)
+            if blob is None:
+                try:
+                    with transaction.atomic():
+                        MediaBlob.objects.create(name=name, refs=1, size=content.size)
+                except IntegrityError:
+                    # The same bytes were stored concurrently; ours overwrote them
+                    MediaBlob.objects.filter(name=name).update(refs=F("refs") + 1)
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # Equal names hold equal bytes, so never pick an alternative name
+        return name
+
+    def delete(self, name):
+        from core.models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                # Stored before content addressing
+                transaction.on_commit(partial(super().delete, name))
+                return
+            if blob.refs:
+                MediaBlob.objects.filter(pk=blob.pk).update(refs=F("refs") - 1)
+            if blob.refs <= 1:
+                # Only once the release is committed for good
+                transaction.on_commit(partial(self._delete_released, name))
+
+    def _delete_released(self, name):
+        """Remove a file whose last reference is gone, unless it was saved again."""
+        from core.models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None or blob.refs:
+                return
+            blob.delete()
+            super().delete(name)
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedStorageMixin, FileSystemStorage):
+    """Local development and tests (``MEDIA_ROOT``)."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_add_kid_gender'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilestoneLadder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bonus_interval', models.PositiveIntegerField(default=500, help_text='Po paskutinio ženkliuko – premija kas tiek taškų (0 – be premijų)')),
+                ('bonus_points', models.PositiveIntegerField(default=50, help_text='Premijos dydis kas intervalą')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('parent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='milestone_ladder', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Pasiekimų laiptai',
+                'verbose_name_plural': 'Pasiekimų laiptai',
+            },
+        ),
+        migrations.CreateModel(
+            name='LadderMilestone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(help_text='Kiek taškų reikia surinkti')),
+                ('name', models.CharField(max_length=100)),
+                ('icon', models.CharField(default='🏅', max_length=8)),
+                ('bonus', models.PositiveIntegerField(default=10, help_text='Premijos taškai pasiekus')),
+                ('ladder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milestones', to='core.milestoneladder')),
+            ],
+            options={
+                'verbose_name': 'Pasiekimas',
+                'verbose_name_plural': 'Pasiekimai',
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('ladder', 'position'), name='unique_ladder_milestone_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_milestone_ladders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('OPENING', 'Pradinis likutis'), ('CHORE', 'Darbas'), ('REDEMPTION', 'Apdovanojimas'), ('ADJUSTMENT', 'Koregavimas'), ('MILESTONE', 'Ženkliuko premija'), ('CORRECTION', 'Rankinis pataisymas')], max_length=10)),
+                ('balance_delta', models.IntegerField()),
+                ('position_delta', models.IntegerField(default=0)),
+                ('milestone', models.IntegerField(blank=True, help_text='Pasiektas ženkliukas (highest_milestone po šio įrašo)', null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('adjustment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.pointadjustment')),
+                ('chore_log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.chorelog')),
+                ('kid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='core.kid')),
+                ('redemption', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.redemption')),
+            ],
+            options={
+                'verbose_name': 'Taškų žurnalo įrašas',
+                'verbose_name_plural': 'Taškų žurnalas',
+                'indexes': [models.Index(fields=['kid', 'created_at'], name='ledger_kid_created_idx')],
+            },
+        ),
+    ]
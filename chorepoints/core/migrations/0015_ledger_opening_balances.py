@@ -0,0 +1,42 @@
+# Data migration: record every existing kid's state as an OPENING ledger entry
+
+from django.db import migrations
+
+
+def add_opening_entries(apps, schema_editor):
+    """Seed the ledger so replaying it reproduces current balances."""
+    Kid = apps.get_model('core', 'Kid')
+    LedgerEntry = apps.get_model('core', 'LedgerEntry')
+
+    batch = []
+    kids = Kid.objects.values_list('id', 'points_balance', 'map_position', 'highest_milestone')
+    for kid_id, balance, position, highest in kids.iterator(chunk_size=1000):
+        if not (balance or position or highest):
+            continue
+        batch.append(LedgerEntry(
+            kid_id=kid_id,
+            kind='OPENING',
+            balance_delta=balance,
+            position_delta=position,
+            milestone=highest or None,
+        ))
+        if len(batch) >= 1000:
+            LedgerEntry.objects.bulk_create(batch)
+            batch = []
+    LedgerEntry.objects.bulk_create(batch)
+
+
+def remove_opening_entries(apps, schema_editor):
+    LedgerEntry = apps.get_model('core', 'LedgerEntry')
+    LedgerEntry.objects.filter(kind='OPENING').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_ledgerentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_opening_entries, remove_opening_entries),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+from django.utils import timezone
+
+
+def reject_duplicate_pending(apps, schema_editor):
+    """Keep the oldest pending row per (child, chore/reward) so the unique constraints can be built."""
+    for model_name, target in (('ChoreLog', 'chore'), ('Redemption', 'reward')):
+        model = apps.get_model('core', model_name)
+        pending = model.objects.filter(status='PENDING')
+        keep = pending.values('child', target).annotate(first=Min('id')).values_list('first', flat=True)
+        duplicates = pending.exclude(id__in=list(keep))
+        duplicates.update(status='REJECTED', processed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_ledger_opening_balances'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chorelog',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['child', '-logged_at'], name='chorelog_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chorelog',
+            index=models.Index(fields=['child', 'status', '-processed_at'], name='chorelog_child_status_proc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pointadjustment',
+            index=models.Index(fields=['kid', '-created_at'], name='adjustment_kid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redemption',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['child', '-redeemed_at'], name='redemption_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redemption',
+            index=models.Index(fields=['child', 'status', '-processed_at'], name='redemption_child_status_proc'),
+        ),
+        migrations.RunPython(reject_duplicate_pending, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='chorelog',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('child', 'chore'), name='unique_pending_chorelog'),
+        ),
+        migrations.AddConstraint(
+            model_name='redemption',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('child', 'reward'), name='unique_pending_redemption'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_status_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KidSeenCursor',
+            fields=[
+                ('kid', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seen_cursor', serialize=False, to='core.kid')),
+                ('approval_at', models.DateTimeField(blank=True, help_text='Naujausias matytas patvirtinimas', null=True)),
+                ('map_position', models.IntegerField(default=0, help_text='Paskutinė matyta žemėlapio pozicija')),
+                ('points_balance', models.IntegerField(blank=True, help_text='Paskutinis matytas taškų likutis', null=True)),
+            ],
+            options={
+                'verbose_name': 'Peržiūrėta būsena',
+                'verbose_name_plural': 'Peržiūrėtos būsenos',
+            },
+        ),
+    ]
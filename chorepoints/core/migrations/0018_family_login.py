@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:14
+
+import core.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_families(apps, schema_editor):
+    """Give every parent with kids a family login code."""
+    Kid = apps.get_model('core', 'Kid')
+    Family = apps.get_model('core', 'Family')
+    parent_ids = Kid.objects.values_list('parent_id', flat=True).distinct()
+    Family.objects.bulk_create(Family(parent_id=parent_id) for parent_id in parent_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_kid_seen_cursor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Family',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('login_code', models.SlugField(default=core.models.generate_family_code, help_text='Vaikų prisijungimo nuorodos kodas (/kid/login/<kodas>/)', max_length=32, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Šeima',
+                'verbose_name_plural': 'Šeimos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='kid',
+            index=models.Index(fields=['parent', 'active'], name='kid_parent_active_idx'),
+        ),
+        migrations.AddField(
+            model_name='family',
+            name='parent',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='family', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(create_families, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_family_login'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chore',
+            name='icon_ready',
+            field=models.BooleanField(default=True, editable=False, help_text='Sumažintas paveikslėlis paruoštas rodyti'),
+        ),
+        migrations.AddField(
+            model_name='kid',
+            name='photo_ready',
+            field=models.BooleanField(default=True, editable=False, help_text='Sumažinta nuotrauka paruošta rodyti'),
+        ),
+        migrations.AddField(
+            model_name='reward',
+            name='icon_ready',
+            field=models.BooleanField(default=True, editable=False, help_text='Sumažintas paveikslėlis paruoštas rodyti'),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('KID_PHOTO', 'Vaiko nuotrauka'), ('CHORE_ICON', 'Darbo paveikslėlis'), ('REWARD_ICON', 'Prizo paveikslėlis')], max_length=12)),
+                ('object_id', models.PositiveIntegerField()),
+                ('name', models.CharField(help_text='Įkelto failo vardas saugykloje', max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Laukia'), ('DONE', 'Atlikta'), ('FAILED', 'Nepavyko')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Paveikslėlio apdorojimas',
+                'verbose_name_plural': 'Paveikslėlių apdorojimas',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='imagejob_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_image_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chore',
+            name='icon_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Mažesnės paveikslėlio kopijos (formatas → plotis → failas)'),
+        ),
+        migrations.AddField(
+            model_name='kid',
+            name='photo_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Mažesnės nuotraukos kopijos (formatas → plotis → failas)'),
+        ),
+        migrations.AddField(
+            model_name='reward',
+            name='icon_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Mažesnės paveikslėlio kopijos (formatas → plotis → failas)'),
+        ),
+    ]
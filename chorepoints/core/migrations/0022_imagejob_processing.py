@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_media_blobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imagejob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Laukia'), ('PROCESSING', 'Apdorojama'), ('DONE', 'Atlikta'), ('FAILED', 'Nepavyko')], default='PENDING', max_length=10),
+        ),
+    ]
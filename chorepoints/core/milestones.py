@@ -0,0 +1,205 @@
+"""
+Precomputed adventure-map milestone index.
+
+A ``MilestoneIndex`` is built once from a milestone ladder and then answers
+every map query (current/next milestone, avatar percentage, milestones crossed
+between two positions, display list) with binary search over the sorted
+positions instead of scanning the ladder on each call.
+
+Families can configure their own ladder (``MilestoneLadder``). The compiled
+index is kept in Django's cache per parent and invalidated whenever the ladder
+or one of its milestones is saved or deleted, so request paths never query
+ladder rows. Without a shared cache (``SHARED_CACHE``) other workers never see
+that invalidation: they keep their copy for ``MILESTONE_INDEX_LOCAL_TIMEOUT``
+seconds only, and approvals, whose bonuses are stored for good, always compile
+the ladder from the database.
+"""
+import hashlib
+from bisect import bisect_right
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import cache_is_shared
+
+# Achievement Milestones Configuration (Infinite Progressive System)
+ACHIEVEMENT_MILESTONES = [
+    {'position': 50, 'name': 'Bronzos ženkliukas', 'icon': '🥉', 'bonus': 10},
+    {'position': 100, 'name': 'Sidabro ženkliukas', 'icon': '🥈', 'bonus': 10},
+    {'position': 200, 'name': 'Aukso ženkliukas', 'icon': '🥇', 'bonus': 15},
+    {'position': 300, 'name': 'Deimanto ženkliukas', 'icon': '💎', 'bonus': 15},
+    {'position': 500, 'name': 'Karūnos ženkliukas', 'icon': '👑', 'bonus': 20},
+    {'position': 750, 'name': 'Žvaigždės ženkliukas', 'icon': '⭐', 'bonus': 20},
+    {'position': 1000, 'name': 'Superžvaigždė', 'icon': '🌟', 'bonus': 25},
+    {'position': 1500, 'name': 'Čempionas', 'icon': '🏆', 'bonus': 30},
+    {'position': 2000, 'name': 'Legenda', 'icon': '🔥', 'bonus': 40},
+    {'position': 3000, 'name': 'Herojus', 'icon': '🚀', 'bonus': 50},
+]
+
+# After the last milestone a bonus is awarded every BONUS_INTERVAL points
+BONUS_INTERVAL = 500
+BONUS_POINTS = 50
+BONUS_ICON = '🎁'
+
+
+class MilestoneIndex:
+    """Immutable, sorted view of a milestone ladder."""
+
+    __slots__ = (
+        '_milestones', '_positions', '_percentages', '_display',
+        'bonus_interval', 'bonus_points', 'last_position', 'fingerprint',
+    )
+
+    def __init__(self, milestones, *, bonus_interval=BONUS_INTERVAL, bonus_points=BONUS_POINTS):
+        ordered = sorted(milestones, key=lambda milestone: milestone['position'])
+        count = len(ordered)
+        self._milestones = tuple(
+            {
+                'position': m['position'],
+                'name': m['name'],
+                'icon': m['icon'],
+                'bonus': m['bonus'],
+            }
+            for m in ordered
+        )
+        self._positions = tuple(m['position'] for m in self._milestones)
+        # Avatar sits on the marker of the last reached milestone
+        self._percentages = tuple(
+            100 if i == count - 1 else int((i / (count - 1)) * 100)
+            for i in range(count)
+        )
+        self._display = tuple(
+            {**m, 'index': i, 'label_prefix': f"{m['name']}, {m['position']} taškai"}
+            for i, m in enumerate(self._milestones)
+        )
+        self.bonus_interval = bonus_interval
+        self.bonus_points = bonus_points
+        self.last_position = self._positions[-1] if self._positions else 0
+        # Identifies the ladder's content, e.g. in cache keys of rendered maps
+        self.fingerprint = hashlib.md5(
+            repr((self._milestones, bonus_interval, bonus_points)).encode(), usedforsecurity=False
+        ).hexdigest()[:12]
+
+    def __len__(self):
+        return len(self._positions)
+
+    @property
+    def milestones(self) -> tuple:
+        return self._milestones
+
+    def current_index(self, position: int) -> int:
+        """Index of the highest reached milestone, -1 if none."""
+        return bisect_right(self._positions, position) - 1
+
+    def current(self, position: int) -> dict | None:
+        index = self.current_index(position)
+        return dict(self._milestones[index]) if index >= 0 else None
+
+    def next(self, position: int, *, bonus_name: str = 'Bonus') -> dict | None:
+        """Next milestone to reach, continuing with bonus intervals past the ladder."""
+        index = bisect_right(self._positions, position)
+        if index < len(self._positions):
+            return dict(self._milestones[index])
+        if not self.bonus_interval:
+            return None
+        return {
+            'position': ((position // self.bonus_interval) + 1) * self.bonus_interval,
+            'name': bonus_name,
+            'icon': BONUS_ICON,
+            'bonus': self.bonus_points,
+        }
+
+    def avatar_percentage(self, position: int) -> int:
+        index = self.current_index(position)
+        return self._percentages[index] if index >= 0 else 0
+
+    def crossed(self, old_position: int, new_position: int) -> list[dict]:
+        """Milestones passed moving from old to new position, in O(log n + k).
+
+        Bonus intervals only apply when the kid was already past the last
+        milestone before the move.
+        """
+        start = bisect_right(self._positions, old_position)
+        end = bisect_right(self._positions, new_position)
+        crossed = [dict(m) for m in self._milestones[start:end]]
+        if self.bonus_interval and old_position >= self.last_position:
+            for interval in range(old_position // self.bonus_interval + 1,
+                                  new_position // self.bonus_interval + 1):
+                crossed.append({
+                    'position': interval * self.bonus_interval,
+                    'name': 'Bonus Milestone',
+                    'icon': BONUS_ICON,
+                    'bonus': self.bonus_points,
+                })
+        return crossed
+
+    def display_list(self, position: int) -> list[dict]:
+        """Milestone payloads for the map template with status and aria label."""
+        reached = bisect_right(self._positions, position)
+        milestones = []
+        for i, base in enumerate(self._display):
+            achieved = i < reached
+            aria_status = 'pasiekta' if achieved else f"dar reikia {base['position'] - position} taškų"
+            milestones.append({
+                'position': base['position'],
+                'name': base['name'],
+                'icon': base['icon'],
+                'bonus': base['bonus'],
+                'status': 'achieved' if achieved else 'locked',
+                'index': i,
+                'aria_label': f"{base['label_prefix']}, {aria_status}",
+            })
+        return milestones
+
+    def reached_between(self, milestones: list[dict], old_position: int, new_position: int) -> list[dict]:
+        """Slice of a ``display_list`` result reached after old_position up to new_position."""
+        start = bisect_right(self._positions, old_position)
+        end = bisect_right(self._positions, new_position)
+        return milestones[start:end]
+
+    def map_progress(self, position: int) -> dict:
+        """Everything the adventure map needs for one position."""
+        next_milestone = self.next(position)
+        return {
+            'current_position': position,
+            'current_milestone': self.current(position),
+            'current_milestone_index': self.current_index(position),
+            'next_milestone': next_milestone,
+            'milestones': self.display_list(position),
+            'progress_percentage': self.avatar_percentage(position),
+            'points_needed': next_milestone['position'] - position if next_milestone else 0,
+            'total_points_earned': position,
+            'completed_all_milestones': bool(self.last_position and position >= self.last_position),
+        }
+
+
+DEFAULT_MILESTONE_INDEX = MilestoneIndex(ACHIEVEMENT_MILESTONES)
+
+MILESTONE_INDEX_CACHE_KEY = "milestone-index:{parent_id}"
+# Seconds a per-worker cache keeps a compiled ladder
+MILESTONE_INDEX_LOCAL_TIMEOUT = 30
+
+
+def get_milestone_index(parent_id, *, for_update=False) -> MilestoneIndex:
+    """Compiled ladder for a family, built from the database on a cache miss.
+
+    ``for_update`` is for callers that store milestone bonuses: without a
+    shared cache they skip the cached copy, which may predate a ladder edit
+    made in another worker.
+    """
+    shared = cache_is_shared()
+    key = MILESTONE_INDEX_CACHE_KEY.format(parent_id=parent_id)
+    index = cache.get(key) if shared or not for_update else None
+    if index is None:
+        from .models import MilestoneLadder
+        ladder = MilestoneLadder.objects.filter(parent_id=parent_id).first()
+        index = ladder.compile() if ladder else DEFAULT_MILESTONE_INDEX
+        cache.set(key, index, None if shared else MILESTONE_INDEX_LOCAL_TIMEOUT)
+    return index
+
+
+def invalidate_milestone_index(parent_id) -> None:
+    """Drop a family's compiled ladder now and again once the change commits."""
+    key = MILESTONE_INDEX_CACHE_KEY.format(parent_id=parent_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
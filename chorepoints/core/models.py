@@ -1,29 +1,12 @@
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from pathlib import Path
-from io import BytesIO
-try:
-    from PIL import Image
-except ImportError:  # Pillow should be installed; safeguard
-    Image = None
+from django.utils.crypto import get_random_string
+from .images import has_new_upload
+from .milestones import get_milestone_index
 
 User = get_user_model()
 
-# Achievement Milestones Configuration (Infinite Progressive System)
-ACHIEVEMENT_MILESTONES = [
-    {'position': 50, 'name': 'Bronzos ženkliukas', 'icon': '🥉', 'bonus': 10},
-    {'position': 100, 'name': 'Sidabro ženkliukas', 'icon': '🥈', 'bonus': 10},
-    {'position': 200, 'name': 'Aukso ženkliukas', 'icon': '🥇', 'bonus': 15},
-    {'position': 300, 'name': 'Deimanto ženkliukas', 'icon': '💎', 'bonus': 15},
-    {'position': 500, 'name': 'Karūnos ženkliukas', 'icon': '👑', 'bonus': 20},
-    {'position': 750, 'name': 'Žvaigždės ženkliukas', 'icon': '⭐', 'bonus': 20},
-    {'position': 1000, 'name': 'Superžvaigždė', 'icon': '🌟', 'bonus': 25},
-    {'position': 1500, 'name': 'Čempionas', 'icon': '🏆', 'bonus': 30},
-    {'position': 2000, 'name': 'Legenda', 'icon': '🔥', 'bonus': 40},
-    {'position': 3000, 'name': 'Herojus', 'icon': '🚀', 'bonus': 50},
-]
-
 class Kid(models.Model):
     class MapTheme(models.TextChoices):
         ISLAND = "ISLAND", "Sala"
@@ -46,26 +29,59 @@ class Kid(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     avatar_emoji = models.CharField(max_length=4, blank=True, default="", help_text="Emoji (jei tuščia – generuojama raidė)")
     photo = models.ImageField(upload_to="kid_avatars/", null=True, blank=True, help_text="Nuotrauka (jei nenaudojamas emoji)")
+    photo_ready = models.BooleanField(default=True, editable=False, help_text="Sumažinta nuotrauka paruošta rodyti")
+    photo_renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Mažesnės nuotraukos kopijos (formatas → plotis → failas)")
     map_theme = models.CharField(max_length=10, choices=MapTheme.choices, default=MapTheme.ISLAND, help_text="Nuotykių žemėlapio tema")
 
+    # Counters mirrored by LedgerEntry rows; direct edits are journaled in save()
+    LEDGER_FIELDS = ("points_balance", "map_position", "highest_milestone")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_ledger_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_ledger_state()
+
+    def _remember_ledger_state(self, fields=LEDGER_FIELDS):
+        # Deferred fields are missing from __dict__ and are never journaled
+        state = self.__dict__.setdefault("_ledger_state", {})
+        state.update({f: self.__dict__[f] for f in fields if f in self.__dict__})
+
+    def _ledger_correction(self, adding: bool, fields):
+        """Ledger entry for counters changed directly on this instance, if any."""
+        saved = {f: 0 for f in self.LEDGER_FIELDS} if adding else self.__dict__.get("_ledger_state", {})
+        deltas = {f: getattr(self, f) - saved[f] for f in fields if f in saved}
+        if not any(deltas.values()):
+            return None
+        return LedgerEntry(
+            kid=self,
+            kind=LedgerEntry.Kind.OPENING if adding else LedgerEntry.Kind.CORRECTION,
+            balance_delta=deltas.get("points_balance", 0),
+            position_delta=deltas.get("map_position", 0),
+            milestone=self.highest_milestone if deltas.get("highest_milestone") else None,
+        )
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # After initial save ensure photo (if any) is resized (max 400x400)
-        # Only resize if using local filesystem storage (not Azure Blob Storage)
-        if self.photo and Image:
-            try:
-                # Azure Blob Storage doesn't support .path attribute
-                # Check if storage backend supports path before trying to resize
-                if hasattr(self.photo.storage, 'location'):
-                    photo_path = Path(self.photo.path)
-                    with Image.open(photo_path) as img:
-                        if img.width > 400 or img.height > 400:
-                            img.thumbnail((400, 400))
-                            img.save(photo_path)
-            except (NotImplementedError, AttributeError, Exception):
-                # Silently ignore processing errors for cloud storage
-                # Azure Blob Storage doesn't support local path access
-                pass
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        fields = [f for f in self.LEDGER_FIELDS if update_fields is None or f in update_fields]
+        # A new photo is stored as uploaded and downscaled by the image worker;
+        # until then pages show the emoji/letter avatar
+        new_photo = has_new_upload(self.photo)
+        if new_photo:
+            self.photo_ready = False
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            entry = self._ledger_correction(adding, fields) if fields else None
+            if entry:
+                entry.save()
+            if new_photo:
+                ImageJob.enqueue(ImageJob.Kind.KID_PHOTO, self, self.photo)
+        self._remember_ledger_state(fields)
 
     @property
     def display_letter(self) -> str:
@@ -82,110 +98,46 @@ class Kid(models.Model):
         # Neutral fallback when gender is unknown/other
         return f"Labas, {self.name}!"
 
+    @property
+    def milestone_index(self):
+        """Compiled family milestone ladder (one cache lookup per instance)."""
+        index = self.__dict__.get("_milestone_index")
+        if index is None:
+            index = self.__dict__["_milestone_index"] = get_milestone_index(self.parent_id)
+        return index
+
+    @milestone_index.setter
+    def milestone_index(self, index):
+        self.__dict__["_milestone_index"] = index
+
+    def map_fragment_key(self) -> str:
+        """Cache key part for the rendered adventure map.
+
+        The map markup is a pure function of these values, so repeat visits
+        and kids sharing a ladder, position, theme and avatar reuse one fragment.
+        """
+        return f"{self.milestone_index.fingerprint}:{self.map_position}:{self.map_theme}:{self.avatar_emoji}"
+
     def get_current_milestone(self) -> dict:
         """Get the highest milestone achieved by this kid."""
-        achieved = None
-        for milestone in ACHIEVEMENT_MILESTONES:
-            if self.map_position >= milestone['position']:
-                achieved = milestone
-            else:
-                break
-        return achieved
+        return self.milestone_index.current(self.map_position)
     
     def get_current_milestone_index(self) -> int:
         """Get the index of the current (highest achieved) milestone. Returns -1 if none achieved."""
-        for i, milestone in enumerate(ACHIEVEMENT_MILESTONES):
-            if self.map_position < milestone['position']:
-                return i - 1
-        # If we've achieved all milestones
-        return len(ACHIEVEMENT_MILESTONES) - 1
+        return self.milestone_index.current_index(self.map_position)
 
     def get_next_milestone(self) -> dict:
-        """Get the next milestone to achieve."""
-        for milestone in ACHIEVEMENT_MILESTONES:
-            if milestone['position'] > self.map_position:
-                return milestone
-        # If beyond all defined milestones, continue with bonus intervals
-        if self.map_position >= ACHIEVEMENT_MILESTONES[-1]['position']:
-            # After last milestone, give bonuses every 500 points
-            next_interval = ((self.map_position // 500) + 1) * 500
-            return {
-                'position': next_interval,
-                'name': 'Bonus',
-                'icon': '🎁',
-                'bonus': 50
-            }
-        return None
+        """Get the next milestone to achieve (bonus every 500 points after the last one)."""
+        return self.milestone_index.next(self.map_position)
 
     def get_avatar_progress_percentage(self, position: int | None = None) -> int:
         """Return map percentage based on current milestone position (where avatar should be displayed)."""
         current_position = self.map_position if position is None else position
-        total_milestones = len(ACHIEVEMENT_MILESTONES)
-        if total_milestones == 0:
-            return 0
-        
-        # Find which milestone tier the user is currently in
-        current_milestone_index = -1
-        for i, milestone in enumerate(ACHIEVEMENT_MILESTONES):
-            if current_position >= milestone['position']:
-                current_milestone_index = i
-            else:
-                break
-        
-        # If no milestones achieved yet (before first milestone), return 0
-        if current_milestone_index == -1:
-            return 0
-        
-        # If all milestones achieved, place at last milestone
-        if current_milestone_index == total_milestones - 1:
-            return 100
-        
-        # Calculate percentage based on milestone index position in the sequence
-        # Place avatar at the milestone marker position, not between milestones
-        return int((current_milestone_index / (total_milestones - 1)) * 100)
+        return self.milestone_index.avatar_percentage(current_position)
 
     def get_map_progress(self) -> dict:
         """Calculate adventure map progress based on achievement milestones."""
-        current_milestone = self.get_current_milestone()
-        current_milestone_index = self.get_current_milestone_index()
-        next_milestone = self.get_next_milestone()
-        final_milestone_position = ACHIEVEMENT_MILESTONES[-1]['position'] if ACHIEVEMENT_MILESTONES else 0
-        completed_all_milestones = bool(final_milestone_position and self.map_position >= final_milestone_position)
-        
-        # Calculate progress to next milestone
-        progress_percentage = self.get_avatar_progress_percentage()
-        points_needed = 0
-        
-        if next_milestone:
-            points_needed = next_milestone['position'] - self.map_position
-        
-        # Build milestone display list
-        milestones = []
-        for i, milestone in enumerate(ACHIEVEMENT_MILESTONES):
-            status = 'achieved' if self.map_position >= milestone['position'] else 'locked'
-            aria_status = 'pasiekta' if status == 'achieved' else f"dar reikia {milestone['position'] - self.map_position} taškų"
-            
-            milestones.append({
-                'position': milestone['position'],
-                'name': milestone['name'],
-                'icon': milestone['icon'],
-                'bonus': milestone['bonus'],
-                'status': status,
-                'index': i,  # Add index for template logic
-                'aria_label': f"{milestone['name']}, {milestone['position']} taškai, {aria_status}",
-            })
-        
-        return {
-            'current_position': self.map_position,
-            'current_milestone': current_milestone,
-            'current_milestone_index': current_milestone_index,
-            'next_milestone': next_milestone,
-            'milestones': milestones,
-            'progress_percentage': progress_percentage,
-            'points_needed': points_needed,
-            'total_points_earned': self.map_position,
-            'completed_all_milestones': completed_all_milestones,
-        }
+        return self.milestone_index.map_progress(self.map_position)
 
     def __str__(self):
         return f"{self.name} ({self.parent.username})"
@@ -193,6 +145,10 @@ class Kid(models.Model):
     class Meta:
         verbose_name = "Vaikas"
         verbose_name_plural = "Vaikai"
+        indexes = [
+            # Family login picker: one family's active kids
+            models.Index(fields=["parent", "active"], name="kid_parent_active_idx"),
+        ]
 
 class Chore(models.Model):
     parent = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chores")
@@ -201,22 +157,17 @@ class Chore(models.Model):
     active = models.BooleanField(default=True)
     icon_emoji = models.CharField(max_length=8, blank=True, default="", help_text="Emoji (pvz. 🧹) – jei nėra paveikslėlio")
     icon_image = models.ImageField(upload_to="chore_icons/", null=True, blank=True, help_text="Paveikslėlis (128x128 rekomenduojama)")
+    icon_ready = models.BooleanField(default=True, editable=False, help_text="Sumažintas paveikslėlis paruoštas rodyti")
+    icon_renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Mažesnės paveikslėlio kopijos (formatas → plotis → failas)")
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.icon_image and Image:
-            from PIL import Image as PilImage
-            try:
-                # Azure Blob Storage doesn't support .path attribute
-                if hasattr(self.icon_image.storage, 'location'):
-                    path = Path(self.icon_image.path)
-                    with PilImage.open(path) as img:
-                        if img.width > 128 or img.height > 128:
-                            img.thumbnail((128,128))
-                            img.save(path)
-            except (NotImplementedError, AttributeError, Exception):
-                # Silently ignore for cloud storage
-                pass
+        new_icon = has_new_upload(self.icon_image)
+        if new_icon:
+            self.icon_ready = False
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if new_icon:
+                ImageJob.enqueue(ImageJob.Kind.CHORE_ICON, self, self.icon_image)
 
     @property
     def display_icon(self):
@@ -236,22 +187,17 @@ class Reward(models.Model):
     active = models.BooleanField(default=True)
     icon_emoji = models.CharField(max_length=8, blank=True, default="", help_text="Emoji (pvz. 🎁) – jei nėra paveikslėlio")
     icon_image = models.ImageField(upload_to="reward_icons/", null=True, blank=True, help_text="Paveikslėlis (128x128 rekomenduojama)")
+    icon_ready = models.BooleanField(default=True, editable=False, help_text="Sumažintas paveikslėlis paruoštas rodyti")
+    icon_renditions = models.JSONField(default=dict, blank=True, editable=False, help_text="Mažesnės paveikslėlio kopijos (formatas → plotis → failas)")
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        if self.icon_image and Image:
-            from PIL import Image as PilImage
-            try:
-                # Azure Blob Storage doesn't support .path attribute
-                if hasattr(self.icon_image.storage, 'location'):
-                    path = Path(self.icon_image.path)
-                    with PilImage.open(path) as img:
-                        if img.width > 128 or img.height > 128:
-                            img.thumbnail((128,128))
-                            img.save(path)
-            except (NotImplementedError, AttributeError, Exception):
-                # Silently ignore for cloud storage
-                pass
+        new_icon = has_new_upload(self.icon_image)
+        if new_icon:
+            self.icon_ready = False
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if new_icon:
+                ImageJob.enqueue(ImageJob.Kind.REWARD_ICON, self, self.icon_image)
 
     @property
     def display_icon(self):
@@ -285,48 +231,9 @@ class ChoreLog(models.Model):
     def approve(self):
         if self.status != self.Status.PENDING:
             return False
-        with transaction.atomic():
-            # Refresh child from DB to avoid race conditions when approving multiple logs
-            self.child.refresh_from_db()
-            old_position = self.child.map_position
-            self.child.points_balance += self.points_awarded
-            self.child.map_position += self.points_awarded
-            
-            # Check if any milestones were crossed and award bonuses
-            milestones_crossed = []
-            for milestone in ACHIEVEMENT_MILESTONES:
-                if old_position < milestone['position'] <= self.child.map_position:
-                    milestones_crossed.append(milestone)
-            
-            # Check for bonuses after the last defined milestone (every 500 pts)
-            last_milestone_position = ACHIEVEMENT_MILESTONES[-1]['position']
-            if old_position >= last_milestone_position:
-                # Check every 500-point interval crossed
-                old_interval = old_position // 500
-                new_interval = self.child.map_position // 500
-                intervals_crossed = new_interval - old_interval
-                
-                if intervals_crossed > 0:
-                    for _ in range(intervals_crossed):
-                        milestones_crossed.append({
-                            'position': (old_interval + 1) * 500,
-                            'name': 'Bonus Milestone',
-                            'icon': '🎁',
-                            'bonus': 50
-                        })
-            
-            # Award bonuses for crossed milestones
-            for milestone in milestones_crossed:
-                self.child.points_balance += milestone['bonus']
-                self.child.map_position += milestone['bonus']
-                if milestone['position'] <= last_milestone_position:
-                    self.child.highest_milestone = milestone['position']
-            
-            self.child.save(update_fields=["points_balance", "map_position", "highest_milestone"])
-            self.status = self.Status.APPROVED
-            self.processed_at = timezone.now()
-            self.save(update_fields=["status", "processed_at"])
-        return True
+        from .ledger import approve_chore_log
+        # Status claim and balance update run as guarded UPDATEs in one transaction
+        return approve_chore_log(self) is not None
 
     def reject(self):
         if self.status != self.Status.PENDING:
@@ -339,6 +246,24 @@ class ChoreLog(models.Model):
     class Meta:
         verbose_name = "Darbo įrašas"
         verbose_name_plural = "Darbų įrašai"
+        indexes = [
+            # Pending list on the dashboard and the admin approval queue
+            models.Index(
+                fields=["child", "-logged_at"],
+                condition=models.Q(status="PENDING"),
+                name="chorelog_pending_idx",
+            ),
+            # Approved history and the "new approvals" check
+            models.Index(fields=["child", "status", "-processed_at"], name="chorelog_child_status_proc_idx"),
+        ]
+        constraints = [
+            # One open submission per chore; also serves the duplicate-pending lookup
+            models.UniqueConstraint(
+                fields=["child", "chore"],
+                condition=models.Q(status="PENDING"),
+                name="unique_pending_chorelog",
+            ),
+        ]
 
 class Redemption(models.Model):
     class Status(models.TextChoices):
@@ -361,18 +286,9 @@ class Redemption(models.Model):
     def approve(self):
         if self.status != self.Status.PENDING:
             return False
-        with transaction.atomic():
-            # Refresh child from DB to avoid race conditions when approving multiple redemptions
-            self.child.refresh_from_db()
-            # ensure sufficient points at approval time
-            if self.child.points_balance < self.cost_points:
-                return False
-            self.child.points_balance -= self.cost_points
-            self.child.save(update_fields=["points_balance"])
-            self.status = self.Status.APPROVED
-            self.processed_at = timezone.now()
-            self.save(update_fields=["status", "processed_at"])
-        return True
+        from .ledger import approve_redemption
+        # Balance is checked and deducted by a single conditional UPDATE
+        return approve_redemption(self) is not None
 
     def reject(self):
         if self.status != self.Status.PENDING:
@@ -385,6 +301,21 @@ class Redemption(models.Model):
     class Meta:
         verbose_name = "Apdovanojimo išpirkimas"
         verbose_name_plural = "Apdovanojimų išpirkimai"
+        indexes = [
+            models.Index(
+                fields=["child", "-redeemed_at"],
+                condition=models.Q(status="PENDING"),
+                name="redemption_pending_idx",
+            ),
+            models.Index(fields=["child", "status", "-processed_at"], name="redemption_child_status_proc"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["child", "reward"],
+                condition=models.Q(status="PENDING"),
+                name="unique_pending_redemption",
+            ),
+        ]
 
 
 class PointAdjustment(models.Model):
@@ -399,43 +330,8 @@ class PointAdjustment(models.Model):
         super().save(*args, **kwargs)
         if is_new:
             # apply adjustment after creation to have record even if update fails
-            old_position = self.kid.map_position
-            self.kid.points_balance += self.points
-            # Also update map_position for positive adjustments
-            if self.points > 0:
-                self.kid.map_position += self.points
-                
-                # Check if any milestones were crossed and award bonuses
-                milestones_crossed = []
-                for milestone in ACHIEVEMENT_MILESTONES:
-                    if old_position < milestone['position'] <= self.kid.map_position:
-                        milestones_crossed.append(milestone)
-                
-                # Check for bonuses after the last defined milestone (every 500 pts)
-                last_milestone_position = ACHIEVEMENT_MILESTONES[-1]['position']
-                if old_position >= last_milestone_position:
-                    # Check every 500-point interval crossed
-                    old_interval = old_position // 500
-                    new_interval = self.kid.map_position // 500
-                    intervals_crossed = new_interval - old_interval
-                    
-                    if intervals_crossed > 0:
-                        for _ in range(intervals_crossed):
-                            milestones_crossed.append({
-                                'position': (old_interval + 1) * 500,
-                                'name': 'Bonus Milestone',
-                                'icon': '🎁',
-                                'bonus': 50
-                            })
-                
-                # Award bonuses for crossed milestones
-                for milestone in milestones_crossed:
-                    self.kid.points_balance += milestone['bonus']
-                    self.kid.map_position += milestone['bonus']
-                    if milestone['position'] <= last_milestone_position:
-                        self.kid.highest_milestone = milestone['position']
-            
-            self.kid.save(update_fields=["points_balance", "map_position", "highest_milestone"])
+            from .ledger import apply_adjustment
+            apply_adjustment(self)
 
     def __str__(self):
         sign = '+' if self.points >= 0 else ''
@@ -445,3 +341,217 @@ class PointAdjustment(models.Model):
         verbose_name = "Taškų koregavimas"
         verbose_name_plural = "Taškų koregavimai"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["kid", "-created_at"], name="adjustment_kid_created_idx"),
+        ]
+
+
+class MilestoneLadder(models.Model):
+    """Family-specific adventure map milestones (falls back to ACHIEVEMENT_MILESTONES)."""
+    parent = models.OneToOneField(User, on_delete=models.CASCADE, related_name="milestone_ladder")
+    bonus_interval = models.PositiveIntegerField(default=500, help_text="Po paskutinio ženkliuko – premija kas tiek taškų (0 – be premijų)")
+    bonus_points = models.PositiveIntegerField(default=50, help_text="Premijos dydis kas intervalą")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def compile(self):
+        """Build the immutable lookup index for this ladder."""
+        from .milestones import MilestoneIndex
+        return MilestoneIndex(
+            self.milestones.values("position", "name", "icon", "bonus"),
+            bonus_interval=self.bonus_interval,
+            bonus_points=self.bonus_points,
+        )
+
+    def __str__(self):
+        return f"Pasiekimų laiptai ({self.parent.username})"
+
+    class Meta:
+        verbose_name = "Pasiekimų laiptai"
+        verbose_name_plural = "Pasiekimų laiptai"
+
+
+FAMILY_CODE_ALPHABET = "abcdefghjkmnpqrstuvwxyz23456789"  # no look-alike characters
+
+
+def generate_family_code() -> str:
+    return get_random_string(8, FAMILY_CODE_ALPHABET)
+
+
+class Family(models.Model):
+    """A parent's household as seen by kid devices.
+
+    The login code is part of the family's kid login URL (``/kid/login/<code>/``),
+    so a tablet only ever lists the kids of its own family.
+    """
+    parent = models.OneToOneField(User, on_delete=models.CASCADE, related_name="family")
+    login_code = models.SlugField(
+        max_length=32, unique=True, default=generate_family_code,
+        help_text="Vaikų prisijungimo nuorodos kodas (/kid/login/<kodas>/)",
+    )
+
+    def __str__(self):
+        return f"Šeima ({self.parent.username})"
+
+    class Meta:
+        verbose_name = "Šeima"
+        verbose_name_plural = "Šeimos"
+
+
+class LadderMilestone(models.Model):
+    ladder = models.ForeignKey(MilestoneLadder, on_delete=models.CASCADE, related_name="milestones")
+    position = models.PositiveIntegerField(help_text="Kiek taškų reikia surinkti")
+    name = models.CharField(max_length=100)
+    icon = models.CharField(max_length=8, default="🏅")
+    bonus = models.PositiveIntegerField(default=10, help_text="Premijos taškai pasiekus")
+
+    def __str__(self):
+        return f"{self.icon} {self.name} ({self.position})"
+
+    class Meta:
+        verbose_name = "Pasiekimas"
+        verbose_name_plural = "Pasiekimai"
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=["ladder", "position"], name="unique_ladder_milestone_position"),
+        ]
+
+
+class KidSeenCursor(models.Model):
+    """What the kid has already seen on the dashboard.
+
+    Drives the "new since last visit" effects (confetti, milestone unlocks,
+    newly affordable rewards). Written only when a value changes, so repeated
+    dashboard loads do not write anything.
+    """
+    kid = models.OneToOneField(Kid, on_delete=models.CASCADE, primary_key=True, related_name="seen_cursor")
+    approval_at = models.DateTimeField(null=True, blank=True, help_text="Naujausias matytas patvirtinimas")
+    map_position = models.IntegerField(default=0, help_text="Paskutinė matyta žemėlapio pozicija")
+    points_balance = models.IntegerField(null=True, blank=True, help_text="Paskutinis matytas taškų likutis")
+
+    FIELDS = ("approval_at", "map_position", "points_balance")
+
+    def advance(self, **values) -> None:
+        """Store the given values, writing only those that changed (no signals)."""
+        changed = {name: value for name, value in values.items() if getattr(self, name) != value}
+        if not changed:
+            return
+        for name, value in changed.items():
+            setattr(self, name, value)
+        if self._state.adding:
+            try:
+                with transaction.atomic():
+                    self.save(force_insert=True)
+            except IntegrityError:
+                # Another tab of the same kid created it first
+                type(self).objects.filter(pk=self.kid_id).update(**changed)
+            self._state.adding = False
+        else:
+            type(self).objects.filter(pk=self.kid_id).update(**changed)
+
+    class Meta:
+        verbose_name = "Peržiūrėta būsena"
+        verbose_name_plural = "Peržiūrėtos būsenos"
+
+
+class LedgerEntry(models.Model):
+    """Append-only record of every change to a kid's balance and map position.
+
+    Written by ``core/ledger.py`` in the same transaction as the balance
+    update. ``Kid.points_balance``/``map_position``/``highest_milestone`` are a
+    materialized view of these rows (see the ``verify_ledger`` command).
+    """
+    class Kind(models.TextChoices):
+        OPENING = "OPENING", "Pradinis likutis"
+        CHORE = "CHORE", "Darbas"
+        REDEMPTION = "REDEMPTION", "Apdovanojimas"
+        ADJUSTMENT = "ADJUSTMENT", "Koregavimas"
+        MILESTONE = "MILESTONE", "Ženkliuko premija"
+        CORRECTION = "CORRECTION", "Rankinis pataisymas"
+
+    kid = models.ForeignKey(Kid, on_delete=models.CASCADE, related_name="ledger_entries")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    balance_delta = models.IntegerField()
+    position_delta = models.IntegerField(default=0)
+    milestone = models.IntegerField(null=True, blank=True, help_text="Pasiektas ženkliukas (highest_milestone po šio įrašo)")
+    chore_log = models.ForeignKey(ChoreLog, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries")
+    redemption = models.ForeignKey(Redemption, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries")
+    adjustment = models.ForeignKey(PointAdjustment, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries are append-only")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        sign = '+' if self.balance_delta >= 0 else ''
+        return f"{self.get_kind_display()} {sign}{self.balance_delta} ({self.kid_id})"
+
+    class Meta:
+        verbose_name = "Taškų žurnalo įrašas"
+        verbose_name_plural = "Taškų žurnalas"
+        indexes = [
+            models.Index(fields=["kid", "created_at"], name="ledger_kid_created_idx"),
+        ]
+
+
+class ImageJob(models.Model):
+    """A newly uploaded photo or icon waiting for its downscaled rendition.
+
+    Queued by ``Kid.save``/``Chore.save``/``Reward.save`` and processed by the
+    ``process_image_jobs`` command (``core/image_jobs.py``), so uploads never
+    run Pillow on a request thread.
+    """
+    class Kind(models.TextChoices):
+        KID_PHOTO = "KID_PHOTO", "Vaiko nuotrauka"
+        CHORE_ICON = "CHORE_ICON", "Darbo paveikslėlis"
+        REWARD_ICON = "REWARD_ICON", "Prizo paveikslėlis"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Laukia"
+        PROCESSING = "PROCESSING", "Apdorojama"
+        DONE = "DONE", "Atlikta"
+        FAILED = "FAILED", "Nepavyko"
+
+    kind = models.CharField(max_length=12, choices=Kind.choices)
+    object_id = models.PositiveIntegerField()
+    name = models.CharField(max_length=255, help_text="Įkelto failo vardas saugykloje")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def enqueue(cls, kind, obj, fieldfile) -> "ImageJob":
+        return cls.objects.create(kind=kind, object_id=obj.pk, name=fieldfile.name)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Paveikslėlio apdorojimas"
+        verbose_name_plural = "Paveikslėlių apdorojimas"
+        indexes = [
+            # Worker queue: oldest pending job first
+            models.Index(fields=["status", "created_at"], name="imagejob_status_idx"),
+        ]
+
+
+class MediaBlob(models.Model):
+    """A content-addressed media file and how many images/renditions use it.
+
+    Maintained by ``core.media_storage.ContentAddressedStorageMixin``: saving
+    bytes that are already stored only increments ``refs``.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refs = models.PositiveIntegerField(default=0)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refs})"
+
+    class Meta:
+        verbose_name = "Medijos failas"
+        verbose_name_plural = "Medijos failai"
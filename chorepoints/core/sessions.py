@@ -0,0 +1,54 @@
+"""
+Session engine for kid (and parent) logins: cache first, database behind it.
+
+Works like Django's ``cached_db`` backend: every write goes to the
+``django_session`` table and then to the cache, and reads are served from the
+cache. That takes the session SELECT off every kid request. Cached entries
+expire together with the session (``SESSION_COOKIE_AGE``, one hour).
+
+If the cache is unreachable, sessions are loaded from the database and the
+failure is only logged. Stock ``cached_db`` would return a 500 in that case,
+because it re-raises errors when it re-caches a session or checks a new key.
+The cache must be shared by all workers (Redis in production, see
+``settings_production.py``). Otherwise a logout in one worker would leave a
+stale copy in another.
+
+Expired rows are still removed by ``manage.py clearsessions`` (run by
+``startup.sh`` on every boot).
+"""
+import logging
+
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+logger = logging.getLogger("django.contrib.sessions")
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = "core.sessions"
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            logger.exception("Error reading session from cache (%s)", self._cache)
+            data = None
+        if data is not None:
+            return data
+
+        session = self._get_session_from_db()
+        if not session:
+            return {}
+        data = self.decode(session.session_data)
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=session.expire_date))
+        except Exception:
+            logger.exception("Error saving session to cache (%s)", self._cache)
+        return data
+
+    def exists(self, session_key):
+        try:
+            if session_key and (self.cache_key_prefix + session_key) in self._cache:
+                return True
+        except Exception:
+            logger.exception("Error reading session from cache (%s)", self._cache)
+        return super(CachedDBStore, self).exists(session_key)
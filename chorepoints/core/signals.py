@@ -0,0 +1,58 @@
+"""
+Signal handlers that invalidate cached kid data when the underlying rows change.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .caching import bump_kid_version, bump_family_version, bump_kid_picker_version
+from .milestones import invalidate_milestone_index
+from .models import Family, Kid, Chore, Reward, ChoreLog, Redemption, PointAdjustment, MilestoneLadder, LadderMilestone
+
+
+@receiver([post_save, post_delete], sender=Kid)
+def kid_changed(sender, instance, **kwargs):
+    bump_kid_version(instance.pk)
+    # Name, avatar, photo or active flag may have changed
+    bump_kid_picker_version(instance.parent_id)
+
+
+@receiver(post_save, sender=Kid)
+def ensure_family(sender, instance, created, raw=False, **kwargs):
+    """A parent's first kid gives the family its login code."""
+    if created and not raw:
+        Family.objects.get_or_create(parent_id=instance.parent_id)
+
+
+@receiver([post_save, post_delete], sender=ChoreLog)
+@receiver([post_save, post_delete], sender=Redemption)
+def kid_activity_changed(sender, instance, **kwargs):
+    bump_kid_version(instance.child_id)
+
+
+@receiver([post_save, post_delete], sender=PointAdjustment)
+def adjustment_changed(sender, instance, **kwargs):
+    bump_kid_version(instance.kid_id)
+
+
+@receiver([post_save, post_delete], sender=Chore)
+@receiver([post_save, post_delete], sender=Reward)
+def family_catalog_changed(sender, instance, **kwargs):
+    bump_family_version(instance.parent_id)
+
+
+# Receivers rather than save()/delete() overrides, so queryset deletes (admin
+# "delete selected") and cascades from a deleted parent drop the ladder too
+@receiver([post_save, post_delete], sender=MilestoneLadder)
+def ladder_changed(sender, instance, **kwargs):
+    invalidate_milestone_index(instance.parent_id)
+    bump_family_version(instance.parent_id)
+
+
+@receiver([post_save, post_delete], sender=LadderMilestone)
+def ladder_milestone_changed(sender, instance, **kwargs):
+    try:
+        parent_id = instance.ladder.parent_id
+    except MilestoneLadder.DoesNotExist:
+        return  # cascade from the ladder, whose own receiver invalidates
+    invalidate_milestone_index(parent_id)
+    bump_family_version(parent_id)
@@ -0,0 +1,720 @@
+// Kid dashboard scripts. Per-request values come from the JSON payload
+// rendered by the kid_home view (json_script, id="kid-home-data").
+const pageData = JSON.parse(document.getElementById('kid-home-data').textContent);
+
+// Loading State Management
+const loadingOverlay = document.getElementById('loading-overlay');
+
+function showLoading(message = 'Vykdoma...') {
+  if (loadingOverlay) {
+    const textEl = loadingOverlay.querySelector('.loading-text');
+    if (textEl) textEl.textContent = message;
+    loadingOverlay.classList.add('show');
+  }
+}
+
+function hideLoading() {
+  if (loadingOverlay) {
+    loadingOverlay.classList.remove('show');
+  }
+}
+
+// Form Submission Handler
+function handleFormSubmit(form, button) {
+  // Prevent double submission
+  if (form.dataset.submitting === 'true') {
+    return false;
+  }
+
+  form.dataset.submitting = 'true';
+
+  // Add loading state to button
+  if (button) {
+    button.classList.add('btn-loading');
+    button.disabled = true;
+  }
+
+  // Show overlay with custom message
+  const isChore = form.action.includes('complete_chore');
+  const isReward = form.action.includes('redeem_reward');
+
+  if (isChore) {
+    showLoading('Pateikiamas darbas...');
+  } else if (isReward) {
+    showLoading('Prašomas apdovanojimas...');
+  } else {
+    showLoading('Vykdoma...');
+  }
+
+  return true;
+}
+
+// Confirmation Modal Functions
+let confirmCallback = null;
+let confirmFormRef = null;
+let confirmButtonRef = null;
+
+function showConfirmModal(icon, title, message, form, button) {
+  const modal = document.getElementById('confirmModal');
+  const confirmIcon = document.getElementById('confirmIcon');
+  const confirmTitle = document.getElementById('confirmTitle');
+  const confirmMessage = document.getElementById('confirmMessage');
+
+  if (modal && confirmIcon && confirmTitle && confirmMessage) {
+    confirmIcon.textContent = icon;
+    confirmTitle.textContent = title;
+    confirmMessage.innerHTML = message; // Use innerHTML to support line breaks
+    confirmFormRef = form;
+    confirmButtonRef = button;
+    modal.style.display = 'flex';
+
+    // Focus on "Yes" button for keyboard accessibility
+    setTimeout(() => {
+      const yesBtn = modal.querySelector('.confirm-btn-yes');
+      if (yesBtn) yesBtn.focus();
+    }, 100);
+  }
+}
+
+function closeConfirmModal() {
+  const modal = document.getElementById('confirmModal');
+  if (modal) {
+    modal.style.display = 'none';
+    confirmFormRef = null;
+    confirmButtonRef = null;
+  }
+}
+
+function confirmAction() {
+  if (confirmFormRef && confirmButtonRef) {
+    handleFormSubmit(confirmFormRef, confirmButtonRef);
+    confirmFormRef.submit();
+  }
+  closeConfirmModal();
+}
+
+// Keyboard support for confirmation modal
+document.addEventListener('keydown', function(e) {
+  const modal = document.getElementById('confirmModal');
+  if (modal && modal.style.display === 'flex') {
+    if (e.key === 'Escape') {
+      closeConfirmModal();
+    } else if (e.key === 'Enter') {
+      confirmAction();
+    }
+  }
+});
+
+// Attach handlers to all forms
+document.addEventListener('DOMContentLoaded', function() {
+  const forms = document.querySelectorAll('form[action*="/complete/"], form[action*="/redeem/"]');
+
+  forms.forEach(form => {
+    form.addEventListener('submit', function(e) {
+      e.preventDefault(); // Always prevent default first
+      e.stopPropagation(); // Stop event from bubbling
+
+      const button = form.querySelector('button[type="submit"]');
+
+      // Only handle if not already submitting
+      if (form.dataset.submitting === 'true') {
+        return false;
+      }
+
+      // Get chore/reward details for confirmation
+      const isReward = form.action.includes('/redeem/');
+      const card = form.closest('.card');
+      const titleEl = card.querySelector('strong');
+      const pointsEl = card.querySelector('.small');
+
+      // Extract title (remove icon if present)
+      let title = titleEl ? titleEl.textContent.trim() : '';
+      const points = pointsEl ? pointsEl.textContent.trim() : '';
+
+      // Build confirmation message
+      let icon, confirmTitle, confirmMessage;
+      if (isReward) {
+        icon = '🎁';
+        confirmTitle = 'Prašyti apdovanojimo?';
+        confirmMessage = `<div style="font-size:1.1rem; margin:.5rem 0;"><strong>${title}</strong></div>
+                         <div style="color:#ff9800; font-weight:700; font-size:1.05rem;">${points}</div>
+                         <div style="margin-top:1rem; color:#666;">Ar tikrai nori prašyti šio apdovanojimo?<br>Tavo tėveliai turės patvirtinti.</div>`;
+      } else {
+        icon = '🧹';
+        confirmTitle = 'Padarei darbą?';
+        confirmMessage = `<div style="font-size:1.1rem; margin:.5rem 0;"><strong>${title}</strong></div>
+                         <div style="color:#4caf50; font-weight:700; font-size:1.05rem;">${points}</div>
+                         <div style="margin-top:1rem; color:#666;">Ar tikrai padarei šį darbą?<br>Tavo tėveliai turės patvirtinti.</div>`;
+      }
+
+      // Show custom confirmation modal
+      showConfirmModal(icon, confirmTitle, confirmMessage, form, button);
+
+      return false; // Extra safeguard to prevent form submission
+    });
+  });
+});
+
+// Hide loading on page unload (if redirect doesn't happen)
+window.addEventListener('pageshow', function(event) {
+  // If page is restored from cache (back button)
+  if (event.persisted) {
+    hideLoading();
+    // Re-enable all buttons
+    document.querySelectorAll('.btn-loading').forEach(btn => {
+      btn.classList.remove('btn-loading');
+      btn.disabled = false;
+    });
+    // Reset form states
+    document.querySelectorAll('form[data-submitting="true"]').forEach(form => {
+      form.dataset.submitting = 'false';
+    });
+  }
+});
+
+// Toast Notification System
+function showToast(message, type = 'success') {
+  const container = document.getElementById('toast-container');
+  if (!container) return;
+
+  const toast = document.createElement('div');
+  toast.className = `kid-toast kid-toast-${type}`;
+
+  const emojiMap = {
+    success: '🎉',
+    error: '❌',
+    info: 'ℹ️'
+  };
+
+  toast.innerHTML = `
+    <span class="toast-emoji">${emojiMap[type] || '✅'}</span>
+    <span>${message}</span>
+  `;
+
+  container.appendChild(toast);
+
+  // Trigger show animation
+  setTimeout(() => toast.classList.add('kid-toast-show'), 10);
+
+  // Auto-hide after 4 seconds
+  setTimeout(() => {
+    toast.classList.remove('kid-toast-show');
+    setTimeout(() => toast.remove(), 300);
+  }, 4000);
+}
+
+// Show Django messages as toasts
+(function() {
+  const messages = pageData.messages;
+  messages.forEach((msg, index) => {
+    setTimeout(() => {
+      showToast(msg.message, msg.level);
+    }, index * 150); // Stagger multiple messages
+  });
+})();
+
+// Point Counter Animation
+function animatePointChange(oldValue, newValue) {
+  const badge = document.getElementById('points-badge');
+  const valueSpan = document.getElementById('points-value');
+  if (!badge || !valueSpan) return;
+
+  const duration = 1000; // 1 second
+  const steps = 30;
+  const increment = (newValue - oldValue) / steps;
+  const stepDuration = duration / steps;
+
+  let current = oldValue;
+  badge.classList.add('animating');
+
+  const interval = setInterval(() => {
+    current += increment;
+    if ((increment > 0 && current >= newValue) || (increment < 0 && current <= newValue)) {
+      clearInterval(interval);
+      valueSpan.textContent = newValue;
+      setTimeout(() => {
+        badge.classList.remove('animating');
+      }, 300);
+    } else {
+      valueSpan.textContent = Math.round(current);
+    }
+  }, stepDuration);
+}
+
+// Trigger point animation on page load if points changed
+(function() {
+  const pointsChanged = pageData.pointsChanged;
+  if (!pointsChanged) return;
+
+  const badge = document.getElementById('points-badge');
+  if (!badge) return;
+
+  const oldPoints = parseInt(badge.dataset.oldPoints) || 0;
+  const currentPoints = parseInt(badge.dataset.currentPoints) || 0;
+
+  if (oldPoints !== currentPoints) {
+    setTimeout(() => {
+      animatePointChange(oldPoints, currentPoints);
+    }, 400); // Delay slightly for toast to appear first
+  }
+})();
+
+// Interactive Adventure Map Functions
+function showMilestoneDetails(milestoneElement) {
+  const milestoneName = milestoneElement.dataset.milestoneName;
+  const milestoneIcon = milestoneElement.dataset.milestoneIcon;
+  const milestonePoints = parseInt(milestoneElement.dataset.milestonePosition);
+  const currentPoints = pageData.stats.currentPoints;
+  const isAchieved = milestoneElement.dataset.isAchieved === 'true';
+
+  // Update modal content
+  document.getElementById('modalIcon').textContent = milestoneIcon;
+  document.getElementById('modalTitle').textContent = milestoneName;
+  document.getElementById('modalPoints').textContent = milestonePoints + ' tšk';
+
+  // Determine status
+  const statusEl = document.getElementById('modalStatus');
+  const pointsNeeded = milestonePoints - currentPoints;
+
+  if (isAchieved) {
+    statusEl.className = 'modal-status achieved';
+    statusEl.innerHTML = '🎉 <strong>Pasiekta!</strong><br>Tu jau pasiekei šį ženkliuką!';
+  } else if (currentPoints >= milestonePoints) {
+    statusEl.className = 'modal-status unlocked';
+    statusEl.innerHTML = '✅ <strong>Beveik ten!</strong><br>Dar keletas taškų!';
+  } else {
+    statusEl.className = 'modal-status locked';
+    statusEl.innerHTML = '🔒 <strong>Dar reikia ' + Math.abs(pointsNeeded) + ' tšk!</strong><br>Dirbi gerai, tęsk!';
+
+    // Shake animation for locked milestones
+    milestoneElement.classList.add('milestone-locked');
+    setTimeout(() => {
+      milestoneElement.classList.remove('milestone-locked');
+    }, 300);
+  }
+
+  // Show modal
+  document.getElementById('rewardModal').style.display = 'flex';
+}
+
+function closeMilestoneModal() {
+  document.getElementById('rewardModal').style.display = 'none';
+}
+
+// Close modal on Escape key
+document.addEventListener('keydown', function(e) {
+  if (e.key === 'Escape') {
+    closeMilestoneModal();
+  }
+});
+
+// Milestone Unlock Celebration
+(function() {
+  const milestoneUnlocked = pageData.milestoneUnlocked;
+  if (!milestoneUnlocked) return;
+
+  const newlyUnlocked = pageData.newlyUnlockedMilestones;
+  if (newlyUnlocked.length === 0) return;
+
+  // Add celebration class to newly unlocked milestones
+  setTimeout(() => {
+    newlyUnlocked.forEach(milestone => {
+      const milestoneEl = document.querySelector(`.milestone[data-reward-id="${milestone.reward_id}"]`);
+      if (milestoneEl) {
+        milestoneEl.classList.add('milestone-just-unlocked');
+
+        // Create sparkle particles around the milestone
+        createSparkles(milestoneEl);
+
+        // Scroll to the milestone
+        setTimeout(() => {
+          milestoneEl.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        }, 400);
+
+        // Remove animation class after completion
+        setTimeout(() => {
+          milestoneEl.classList.remove('milestone-just-unlocked');
+        }, 2000);
+      }
+    });
+  }, 500);
+
+  // Create sparkle particles
+  function createSparkles(element) {
+    const rect = element.getBoundingClientRect();
+    const centerX = rect.left + rect.width / 2;
+    const centerY = rect.top + rect.height / 2;
+    const sparkleCount = 12;
+
+    for (let i = 0; i < sparkleCount; i++) {
+      const sparkle = document.createElement('div');
+      sparkle.className = 'sparkle-particle';
+
+      const angle = (i / sparkleCount) * Math.PI * 2;
+      const distance = 60 + Math.random() * 40;
+      const endX = centerX + Math.cos(angle) * distance;
+      const endY = centerY + Math.sin(angle) * distance;
+
+      sparkle.style.left = centerX + 'px';
+      sparkle.style.top = centerY + 'px';
+      sparkle.style.position = 'fixed';
+
+      document.body.appendChild(sparkle);
+
+      // Animate sparkle outward
+      const delay = Math.random() * 200;
+      setTimeout(() => {
+        sparkle.style.transition = 'all 1s ease-out';
+        sparkle.style.left = endX + 'px';
+        sparkle.style.top = endY + 'px';
+      }, delay);
+
+      // Remove sparkle after animation
+      setTimeout(() => {
+        sparkle.remove();
+      }, 1200 + delay);
+    }
+  }
+})();
+
+(function(){
+  const approvedNew = pageData.approvedNew;
+  if(!approvedNew) return;
+
+  const c = document.getElementById('confetti-canvas');
+  c.style.display='block';
+  const ctx = c.getContext('2d');
+
+  function resize(){c.width=window.innerWidth; c.height=window.innerHeight;} 
+  resize(); 
+  window.addEventListener('resize',resize);
+
+  // Enhanced color palette - vibrant, kid-friendly colors
+  const colors = [
+    '#FF6B6B', // Red
+    '#FF8E53', // Orange
+    '#FFD93D', // Yellow
+    '#6BCF7F', // Green
+    '#4D96FF', // Blue
+    '#9D6CFF', // Purple
+    '#FF6BCB', // Pink
+    '#45B7D1', // Cyan
+    '#FFA07A', // Light coral
+    '#98D8C8'  // Mint
+  ];
+
+  // Shape types: 'circle', 'square', 'star'
+  const shapes = ['circle', 'square', 'star', 'circle', 'square']; // More circles for balance
+
+  // Create 200 confetti pieces with variety
+  const pieces = Array.from({length:200},()=>({
+    x: Math.random()*c.width,
+    y: Math.random()*-c.height - 100, // Start higher for more staggered effect
+    r: 4+Math.random()*8, // Size: 4-12px
+    d: 2+Math.random()*4, // Fall speed: 2-6px per frame
+    c: colors[Math.floor(Math.random()*colors.length)], // Pick from palette
+    shape: shapes[Math.floor(Math.random()*shapes.length)], // Random shape
+    rotation: Math.random()*Math.PI*2, // Initial rotation
+    rotationSpeed: (Math.random()-0.5)*0.15, // Rotation speed
+    tilt: Math.random()*10,
+    tiltDir: Math.random()<.5?-1:1,
+    opacity: 0.8 + Math.random()*0.2 // Slight opacity variation
+  }));
+
+  let frame=0; 
+  const maxFrames=380; // Slightly longer animation (was 320)
+
+  // Helper function to draw a star
+  function drawStar(ctx, cx, cy, spikes, outerRadius, innerRadius) {
+    let rot = Math.PI / 2 * 3;
+    let x = cx;
+    let y = cy;
+    const step = Math.PI / spikes;
+
+    ctx.beginPath();
+    ctx.moveTo(cx, cy - outerRadius);
+    for (let i = 0; i < spikes; i++) {
+      x = cx + Math.cos(rot) * outerRadius;
+      y = cy + Math.sin(rot) * outerRadius;
+      ctx.lineTo(x, y);
+      rot += step;
+
+      x = cx + Math.cos(rot) * innerRadius;
+      y = cy + Math.sin(rot) * innerRadius;
+      ctx.lineTo(x, y);
+      rot += step;
+    }
+    ctx.lineTo(cx, cy - outerRadius);
+    ctx.closePath();
+    ctx.fill();
+  }
+
+  function draw(){
+    ctx.clearRect(0,0,c.width,c.height);
+
+    pieces.forEach(p=>{
+      ctx.save();
+      ctx.globalAlpha = p.opacity;
+      ctx.fillStyle = p.c;
+
+      // Apply rotation
+      ctx.translate(p.x, p.y);
+      ctx.rotate(p.rotation);
+
+      // Draw based on shape
+      if (p.shape === 'circle') {
+        ctx.beginPath();
+        ctx.arc(0, 0, p.r, 0, Math.PI*2);
+        ctx.fill();
+      } else if (p.shape === 'square') {
+        ctx.fillRect(-p.r, -p.r, p.r*2, p.r*2);
+      } else if (p.shape === 'star') {
+        drawStar(ctx, 0, 0, 5, p.r, p.r*0.5);
+      }
+
+      ctx.restore();
+
+      // Update position and rotation
+      p.y += p.d; 
+      p.x += Math.sin((frame+p.y)/30)*0.5; // Gentler horizontal sway
+      p.rotation += p.rotationSpeed;
+      p.tilt += p.tiltDir*0.5;
+
+      // Fade out as it falls
+      if (p.y > c.height * 0.8) {
+        p.opacity = Math.max(0, p.opacity - 0.02);
+      }
+
+      // Recycle pieces that fall off screen
+      if(p.y > c.height + 20) {
+        p.y = -20; 
+        p.x = Math.random()*c.width;
+        p.opacity = 0.8 + Math.random()*0.2;
+      }
+    });
+
+    frame++; 
+    if(frame < maxFrames) {
+      requestAnimationFrame(draw);
+    } else {
+      // Fade out animation
+      setTimeout(()=>{
+        c.style.transition = 'opacity 0.6s';
+        c.style.opacity='0'; 
+        setTimeout(()=>c.remove(), 600);
+      }, 800);
+    }
+  }
+
+  requestAnimationFrame(draw);
+})();
+
+(function() {
+  // Badge definitions with thresholds
+  const badgeDefinitions = [
+    {
+      id: 'first-steps',
+      icon: '🌟',
+      label: 'Pirmi Žingsniai',
+      category: 'chores',
+      threshold: 1,
+      checkFn: (stats) => stats.approvedChores >= 1
+    },
+    {
+      id: 'getting-started',
+      icon: '⭐',
+      label: 'Pradedantysis',
+      category: 'chores',
+      threshold: 5,
+      checkFn: (stats) => stats.approvedChores >= 5
+    },
+    {
+      id: 'super-helper',
+      icon: '🌠',
+      label: 'Super Pagalbininkas',
+      category: 'chores',
+      threshold: 10,
+      checkFn: (stats) => stats.approvedChores >= 10
+    },
+    {
+      id: 'chore-champion',
+      icon: '🏆',
+      label: 'Darbų Čempionas',
+      category: 'chores',
+      threshold: 25,
+      checkFn: (stats) => stats.approvedChores >= 25
+    },
+    {
+      id: 'chore-legend',
+      icon: '👑',
+      label: 'Darbų Legenda',
+      category: 'chores',
+      threshold: 50,
+      checkFn: (stats) => stats.approvedChores >= 50
+    },
+    {
+      id: 'point-collector',
+      icon: '💰',
+      label: 'Taškų Rinkėjas',
+      category: 'points',
+      threshold: 50,
+      checkFn: (stats) => stats.currentPoints >= 50
+    },
+    {
+      id: 'points-master',
+      icon: '💎',
+      label: 'Taškų Meistras',
+      category: 'points',
+      threshold: 100,
+      checkFn: (stats) => stats.currentPoints >= 100
+    },
+    {
+      id: 'treasure-hunter',
+      icon: '🗺️',
+      label: 'Lobių Medžiotojas',
+      category: 'master',
+      threshold: 3,
+      checkFn: (stats) => stats.mapPosition >= 3
+    }
+  ];
+
+  // Get stats from the page
+  const stats = pageData.stats;
+
+  // Track newly unlocked badges for animation
+  const lastSeenBadges = JSON.parse(sessionStorage.getItem('lastSeenBadges') || '[]');
+  const currentUnlockedBadges = [];
+
+  // Calculate which badges are unlocked
+  const container = document.getElementById('achievement-badges');
+  if (!container) return;
+
+  badgeDefinitions.forEach(badge => {
+    const isUnlocked = badge.checkFn(stats);
+    if (isUnlocked) {
+      currentUnlockedBadges.push(badge.id);
+    }
+
+    const isNewlyUnlocked = isUnlocked && !lastSeenBadges.includes(badge.id);
+
+    const badgeEl = document.createElement('div');
+    badgeEl.className = `badge badge-${badge.category} ${isUnlocked ? 'badge-unlocked' : 'badge-locked'}`;
+    badgeEl.title = isUnlocked 
+      ? `Atrakinta! ${badge.label}` 
+      : `Užrakinta (reikia: ${badge.threshold})`;
+
+    badgeEl.innerHTML = `
+      <span class="badge-icon">${badge.icon}</span>
+      <span class="badge-label">${badge.label}</span>
+    `;
+
+    // Add unlock animation for newly unlocked badges
+    if (isNewlyUnlocked) {
+      badgeEl.classList.add('badge-unlock-anim', 'badge-newly-unlocked');
+
+      // Trigger confetti for first badge unlock
+      if (currentUnlockedBadges.length === 1) {
+        setTimeout(() => {
+          // Mini confetti burst
+          triggerBadgeConfetti();
+        }, 400);
+      }
+    }
+
+    container.appendChild(badgeEl);
+  });
+
+  // Update session storage with current unlocked badges
+  sessionStorage.setItem('lastSeenBadges', JSON.stringify(currentUnlockedBadges));
+
+  // Badge unlock confetti (smaller, centered burst)
+  function triggerBadgeConfetti() {
+    const c = document.createElement('canvas');
+    c.style.position = 'fixed';
+    c.style.top = '0';
+    c.style.left = '0';
+    c.style.width = '100%';
+    c.style.height = '100%';
+    c.style.pointerEvents = 'none';
+    c.style.zIndex = '9998';
+    c.width = window.innerWidth;
+    c.height = window.innerHeight;
+    document.body.appendChild(c);
+
+    const ctx = c.getContext('2d');
+    const particles = [];
+    const colors = ['#FFD700', '#FFA500', '#FF6347', '#32CD32', '#1E90FF', '#9370DB'];
+    const particleCount = 60; // Smaller burst
+
+    // Create particles from badge area
+    const badgeContainer = document.getElementById('achievement-badges-container');
+    const rect = badgeContainer ? badgeContainer.getBoundingClientRect() : { left: window.innerWidth/2, top: 200 };
+
+    for (let i = 0; i < particleCount; i++) {
+      particles.push({
+        x: rect.left + (badgeContainer ? badgeContainer.offsetWidth/2 : 0),
+        y: rect.top,
+        vx: (Math.random() - 0.5) * 8,
+        vy: (Math.random() - 0.5) * 8 - 4,
+        size: 6 + Math.random() * 6,
+        color: colors[Math.floor(Math.random() * colors.length)],
+        rotation: Math.random() * 360,
+        rotationSpeed: (Math.random() - 0.5) * 10,
+        opacity: 1,
+        shape: Math.random() > 0.5 ? 'circle' : 'star'
+      });
+    }
+
+    let frame = 0;
+    const maxFrames = 120;
+
+    function draw() {
+      ctx.clearRect(0, 0, c.width, c.height);
+
+      particles.forEach(p => {
+        p.x += p.vx;
+        p.y += p.vy;
+        p.vy += 0.3; // gravity
+        p.rotation += p.rotationSpeed;
+        p.opacity = Math.max(0, 1 - (frame / maxFrames));
+
+        ctx.save();
+        ctx.translate(p.x, p.y);
+        ctx.rotate(p.rotation * Math.PI / 180);
+        ctx.globalAlpha = p.opacity;
+        ctx.fillStyle = p.color;
+
+        if (p.shape === 'circle') {
+          ctx.beginPath();
+          ctx.arc(0, 0, p.size, 0, Math.PI * 2);
+          ctx.fill();
+        } else {
+          // Draw star
+          ctx.beginPath();
+          for (let i = 0; i < 5; i++) {
+            const angle = (i * 4 * Math.PI) / 5 - Math.PI / 2;
+            const x = Math.cos(angle) * p.size;
+            const y = Math.sin(angle) * p.size;
+            if (i === 0) ctx.moveTo(x, y);
+            else ctx.lineTo(x, y);
+          }
+          ctx.closePath();
+          ctx.fill();
+        }
+
+        ctx.restore();
+      });
+
+      frame++;
+      if (frame < maxFrames) {
+        requestAnimationFrame(draw);
+      } else {
+        c.style.transition = 'opacity 0.4s';
+        c.style.opacity = '0';
+        setTimeout(() => c.remove(), 400);
+      }
+    }
+
+    requestAnimationFrame(draw);
+  }
+})();
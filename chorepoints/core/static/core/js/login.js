@@ -0,0 +1,131 @@
+(function() {
+  // Kid tile selection (the tile grid is cached, so the previous choice is
+  // restored here after a failed login)
+  const tiles = [...document.querySelectorAll('.kid-tile')];
+  const selectedId = document.getElementById('kid-login-form').dataset.selectedKid;
+  tiles.forEach(t => {
+    if (selectedId && t.dataset.kidId === selectedId) t.querySelector('input').checked = true;
+  });
+  function syncTiles() {
+    tiles.forEach(t => {
+      const input = t.querySelector('input');
+      t.classList.toggle('selected', input.checked);
+    });
+  }
+  tiles.forEach(t => t.addEventListener('click', () => {
+    const input = t.querySelector('input');
+    input.checked = true;
+    syncTiles();
+  }));
+  syncTiles();
+
+  // PIN Pad functionality
+  const pinInput = document.getElementById('id_pin');
+  const pinDisplay = document.getElementById('pinDisplay');
+  const pinDots = pinDisplay.querySelectorAll('.pin-dot');
+  const clearBtn = document.getElementById('clearBtn');
+  const submitBtn = document.getElementById('submitBtn');
+  const form = document.getElementById('kid-login-form');
+  let pinValue = '';
+  const maxLength = 4;
+
+  // Digit button clicks
+  document.querySelectorAll('.pin-button[data-digit]').forEach(btn => {
+    btn.addEventListener('click', () => {
+      if (pinValue.length < maxLength) {
+        pinValue += btn.dataset.digit;
+        updateDisplay();
+      }
+    });
+  });
+
+  // Clear button
+  clearBtn.addEventListener('click', () => {
+    pinValue = '';
+    updateDisplay();
+    pinDisplay.classList.remove('error');
+  });
+
+  // Submit button
+  submitBtn.addEventListener('click', () => {
+    if (pinValue.length === maxLength) {
+      // Check if kid is selected
+      const selectedKid = document.querySelector('input[name="kid"]:checked');
+      if (!selectedKid) {
+        alert('⚠️ Pasirink savo profilį!');
+        return;
+      }
+
+      // Set the hidden PIN input value
+      pinInput.value = pinValue;
+
+      // Show success animation
+      pinDisplay.classList.add('success');
+
+      // Add success transition to entire form
+      const container = document.querySelector('.login-container');
+      setTimeout(() => {
+        container.classList.add('success-transition');
+      }, 300);
+
+      // Submit form after animations complete
+      setTimeout(() => {
+        form.submit();
+      }, 800);
+    }
+  });
+
+  // Update display
+  function updateDisplay() {
+    pinDots.forEach((dot, index) => {
+      if (index < pinValue.length) {
+        dot.classList.add('filled');
+      } else {
+        dot.classList.remove('filled');
+      }
+    });
+
+    // Update hidden input
+    pinInput.value = pinValue;
+
+    // Enable/disable submit button
+    submitBtn.disabled = pinValue.length !== maxLength;
+
+    // Auto-submit when 4 digits entered (optional - remove if want explicit submit)
+    if (pinValue.length === maxLength) {
+      const selectedKid = document.querySelector('input[name="kid"]:checked');
+      if (selectedKid) {
+        // Optionally auto-submit after short delay
+        // setTimeout(() => submitBtn.click(), 300);
+      }
+    }
+  }
+
+  // Keyboard support for accessibility
+  document.addEventListener('keydown', (e) => {
+    if (e.key >= '0' && e.key <= '9' && pinValue.length < maxLength) {
+      pinValue += e.key;
+      updateDisplay();
+    } else if (e.key === 'Backspace' || e.key === 'Delete') {
+      pinValue = pinValue.slice(0, -1);
+      updateDisplay();
+      pinDisplay.classList.remove('error');
+    } else if (e.key === 'Enter' && pinValue.length === maxLength) {
+      submitBtn.click();
+    }
+  });
+
+  // Show error animation if form has errors
+  if (document.getElementById('kid-login-form').dataset.hasErrors === 'true') {
+    pinDisplay.classList.add('error');
+    setTimeout(() => {
+      pinDisplay.classList.remove('error');
+      // Clear PIN after error shake
+      pinValue = '';
+      updateDisplay();
+    }, 600);
+  }
+
+  // Initialize display
+  updateDisplay();
+})();
@@ -0,0 +1,60 @@
+"""
+Template helpers for responsive photo and icon renditions (``core/images.py``).
+
+    {% load renditions %}
+    {% picture kid.photo kid.photo_renditions 64 alt=kid.name class="kid-photo" %}
+    <img srcset="{% srcset kid.photo kid.photo_renditions 'webp' %}" ...>
+
+``picture`` renders a ``<picture>`` with an AVIF/WebP ``<source>`` per format
+and a JPEG/PNG ``<img>`` fallback, all sized for ``size`` CSS pixels so the
+browser picks the smallest file for the screen density. Images without
+renditions (uploaded before they existed, or unreadable) fall back to a plain
+``<img>`` of the original.
+"""
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from core.images import MIME_TYPES
+
+register = template.Library()
+
+FALLBACK_FORMATS = ("jpeg", "png")
+
+
+def _widths(names):
+    return sorted(names, key=int)
+
+
+@register.simple_tag
+def srcset(fieldfile, renditions, fmt):
+    """``srcset`` value ("url 64w, url 128w") for one rendition format."""
+    names = (renditions or {}).get(fmt) or {}
+    return ", ".join(f"{fieldfile.storage.url(names[w])} {w}w" for w in _widths(names))
+
+
+@register.simple_tag
+def picture(fieldfile, renditions, size, **attrs):
+    """``<picture>`` for ``fieldfile`` shown at ``size`` CSS pixels square."""
+    attrs = {key.replace("_", "-"): value for key, value in attrs.items()}
+    attrs.update(width=size, height=size)
+    renditions = renditions or {}
+    fallback = next((fmt for fmt in FALLBACK_FORMATS if renditions.get(fmt)), None)
+    if fallback is None:
+        return format_html('<img src="{}"{}>', fieldfile.url, flatatt(attrs))
+
+    sizes = f"{size}px"
+    names = renditions[fallback]
+    # src for browsers without srcset: the first rendition that covers size
+    src = next((names[w] for w in _widths(names) if int(w) >= size), names[_widths(names)[-1]])
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], srcset(fieldfile, renditions, fmt), sizes)
+         # Best format first (MIME_TYPES order); stored JSON keys may be reordered
+         for fmt in MIME_TYPES if fmt not in FALLBACK_FORMATS and renditions.get(fmt)),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, fieldfile.storage.url(src), srcset(fieldfile, renditions, fallback), sizes, flatatt(attrs),
+    )
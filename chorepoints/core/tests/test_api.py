@@ -0,0 +1,90 @@
+"""
+Tests for the kid dashboard JSON API (core/api.py).
+
+Tests cover:
+- Authentication and payload contents
+- Strong ETag and 304 Not Modified without dashboard queries
+- ETag changes after kid and family changes
+- Payload-hash ETag without a shared cache
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.models import Kid, Chore, Reward, ChoreLog
+
+
+class DashboardApiTests(TestCase):
+    """Test the versioned dashboard endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='apiparent', password='testpass123')
+        self.kid = Kid.objects.create(name='Api', parent=self.user, pin='1234', points_balance=40, map_position=40)
+        self.chore = Chore.objects.create(title='Dishes', points=15, icon_emoji='🍽️', parent=self.user)
+        self.reward = Reward.objects.create(title='Movie', cost_points=30, parent=self.user)
+        self.url = reverse('api_dashboard')
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+
+    def test_requires_login(self):
+        """Anonymous requests get a JSON 401 instead of a redirect."""
+        self.client.session.flush()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_payload(self):
+        """Balance, map, chores, rewards, pending and history are returned."""
+        ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['api_version'], 1)
+        self.assertEqual(data['balance'], 40)
+        self.assertEqual(data['map']['current_position'], 40)
+        self.assertEqual(data['chores'][0]['icon'], '🍽️')
+        self.assertTrue(data['chores'][0]['pending'])
+        self.assertTrue(data['rewards'][0]['affordable'])
+        self.assertEqual(data['pending']['chores'][0]['title'], 'Dishes')
+        self.assertEqual(data['history']['chores'], [])
+
+    def test_matching_etag_returns_304_without_dashboard_queries(self):
+        """A poll with the current ETag skips the dashboard loader entirely."""
+        etag = self.client.get(self.url)['ETag']
+        self.assertTrue(etag.startswith('"'))  # strong validator
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        tables = ' '.join(q['sql'] for q in queries)
+        for table in ('core_chore', 'core_reward', 'core_chorelog', 'core_redemption', 'core_pointadjustment'):
+            self.assertNotIn(f'"{table}"', tables)
+
+    def test_etag_changes_after_approval(self):
+        """Ledger updates bump the kid version and invalidate the ETag."""
+        etag = self.client.get(self.url)['ETag']
+        ChoreLog.objects.create(child=self.kid, chore=self.chore).approve()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['balance'], 65)  # 40 + 15 + 10 milestone bonus
+
+    def test_etag_changes_after_catalog_edit(self):
+        """Family changes (new reward) invalidate every kid's ETag."""
+        etag = self.client.get(self.url)['ETag']
+        Reward.objects.create(title='Park', cost_points=80, parent=self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['rewards']), 2)
+
+    @override_settings(SHARED_CACHE=False, DASHBOARD_SNAPSHOT_TIMEOUT=0)  # as in production without Redis
+    def test_unshared_cache_etag_follows_payload(self):
+        """A change another worker made (no local stamp bump) is never answered with 304."""
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Reward.objects.bulk_create([Reward(title='Park', cost_points=80, parent=self.user)])  # no signals
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['rewards']), 2)
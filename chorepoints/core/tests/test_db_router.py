@@ -0,0 +1,139 @@
+"""
+Tests for the optional read-replica router (chorepoints/db_router.py).
+
+Tests cover:
+- Read/write routing and the sticky-primary session window
+- Dashboard snapshots rebuilt from the primary right after a change
+- End-to-end routing with two SQLite databases, run as
+  LOCAL_REPLICA_DB=replica.sqlite3 python manage.py test core.tests.test_db_router
+"""
+import time
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from chorepoints.db_router import (
+    PRIMARY, REPLICA, STICKY_SESSION_KEY, ReplicaReadMiddleware, ReplicaRouter, primary_reads,
+)
+from core.caching import bump_kid_version, changed_recently
+from core.models import Chore, ChoreLog, Kid
+
+
+@override_settings(REPLICA_READ_PATHS=('/kid/home/',), REPLICA_STICKY_SECONDS=10)
+class ReplicaRouterTests(SimpleTestCase):
+    """Routing decisions, no replica database needed."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.seen = []
+
+        def view(request):
+            self.seen.append(self.router.db_for_read(Kid))
+            self.assertEqual(self.router.db_for_write(Kid), PRIMARY)
+            return HttpResponse()
+        self.middleware = ReplicaReadMiddleware(view)
+
+    def _request(self, method, path, session=None):
+        request = getattr(RequestFactory(), method)(path)
+        request.session = session if session is not None else SessionStore()
+        self.middleware(request)
+        return request
+
+    def test_kid_reads_go_to_replica(self):
+        """GETs under REPLICA_READ_PATHS read from the replica; others and writes don't."""
+        self._request('get', '/kid/home/')
+        self._request('get', '/admin/')
+        self.assertEqual(self.seen, [REPLICA, PRIMARY])
+        self.assertEqual(self.router.db_for_read(Kid), PRIMARY)  # outside a request
+
+    def test_post_makes_session_sticky(self):
+        """After a POST the same session reads from the primary for the window."""
+        request = self._request('post', '/kid/chore/1/complete/')
+        self.assertGreater(request.session[STICKY_SESSION_KEY], time.time())
+        self._request('get', '/kid/home/', session=request.session)
+        self.assertEqual(self.seen, [PRIMARY, PRIMARY])
+
+        request.session[STICKY_SESSION_KEY] = time.time() - 1
+        self._request('get', '/kid/home/', session=request.session)
+        self.assertEqual(self.seen[-1], REPLICA)
+
+    def test_primary_reads_block(self):
+        """primary_reads() overrides replica routing inside a request."""
+        def view(request):
+            with primary_reads():
+                self.seen.append(self.router.db_for_read(Kid))
+            with primary_reads(enabled=False):
+                self.seen.append(self.router.db_for_read(Kid))
+            return HttpResponse()
+        request = RequestFactory().get('/kid/home/')
+        request.session = SessionStore()
+        ReplicaReadMiddleware(view)(request)
+        self.assertEqual(self.seen, [PRIMARY, REPLICA])
+
+
+class ChangedRecentlyTests(TestCase):
+    """Fresh changes are marked so cached data is filled from the primary."""
+
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', parent=self.parent)
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_marker_only_with_replica(self):
+        """Without REPLICA_STICKY_SECONDS no markers are written."""
+        self.assertFalse(changed_recently(self.kid.pk, self.parent.pk))
+
+    @override_settings(REPLICA_STICKY_SECONDS=10)
+    def test_bump_marks_kid(self):
+        """Bumping a kid's version marks it for the sticky window."""
+        cache.clear()
+        self.assertFalse(changed_recently(self.kid.pk, self.parent.pk))
+        bump_kid_version(self.kid.pk)
+        self.assertTrue(changed_recently(self.kid.pk, self.parent.pk))
+
+
+@skipUnless('replica' in settings.DATABASES, 'set LOCAL_REPLICA_DB to test with two SQLite databases')
+@override_settings(REPLICA_STICKY_SECONDS=10, REPLICA_READ_PATHS=('/kid/home/', '/kid/api/'))
+class TwoDatabaseRoutingTests(TestCase):
+    """kid_home against a primary and a (deliberately different) replica database."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', parent=self.parent)
+        self.chore = Chore.objects.create(title='Primary chore', points=10, parent=self.parent)
+        # The replica has the same family but lags: it has never seen the
+        # primary's chore but has one the primary does not
+        self.parent.save(using='replica')
+        self.kid.save(using='replica')
+        Chore.objects.using('replica').create(title='Replica chore', points=5, parent_id=self.parent.pk)
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+        cache.clear()  # settle: no change is "recent" any more
+
+    def test_dashboard_reads_replica(self):
+        response = self.client.get(reverse('kid_home'))
+        self.assertContains(response, 'Replica chore')
+        self.assertNotContains(response, 'Primary chore')
+
+    def test_submission_redirect_reads_primary(self):
+        """Read-your-writes: the page after a submission comes from the primary."""
+        response = self.client.post(reverse('complete_chore', args=[self.chore.id]), follow=True)
+        self.assertContains(response, 'Primary chore')
+        self.assertTrue(ChoreLog.objects.using('default').filter(child=self.kid).exists())
+        self.assertFalse(ChoreLog.objects.using('replica').exists())
+
+    def test_fresh_change_rebuilds_snapshot_from_primary(self):
+        """A parent's change is not cached from a replica that has not seen it."""
+        Chore.objects.create(title='New chore', points=3, parent=self.parent)
+        response = self.client.get(reverse('kid_home'))
+        self.assertContains(response, 'New chore')
@@ -0,0 +1,423 @@
+"""
+Tests for upload processing (core/images.py, core/image_jobs.py).
+
+Tests cover:
+- Uploads stored as is and queued as ImageJob rows
+- The process_image_jobs worker downscaling in memory, against a blob-style
+  storage without filesystem paths (like Azure)
+- Small, unreadable, replaced and failing uploads
+- Square WebP/AVIF renditions with JPEG/PNG fallback, and the picture/srcset
+  template tags
+- Emoji/letter fallback until the rendition is ready
+- Reduced-resolution decoding (pixel memory via Pillow's allocator), the pixel budget,
+  EXIF orientation and metadata stripping
+"""
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageFile, JpegImagePlugin
+
+from core import image_jobs
+from core.image_jobs import MAX_ATTEMPTS
+from core.forms import AvatarUploadForm
+from core.images import AVATAR_SIZE, AVATAR_WIDTHS, ImageTooLarge, modern_formats, process_image
+from core.models import Chore, ImageJob, Kid, Reward
+
+
+class FakeBlobStorage(Storage):
+    """In-memory storage without ``location`` or ``path()``, like AzureMediaStorage."""
+
+    def __init__(self):
+        self.blobs = {}
+
+    def _save(self, name, content):
+        content.seek(0)
+        self.blobs[name] = content.read()
+        return name
+
+    def _open(self, name, mode="rb"):
+        return ContentFile(self.blobs[name], name=name)
+
+    def exists(self, name):
+        return name in self.blobs
+
+    def delete(self, name):
+        self.blobs.pop(name, None)
+
+    def size(self, name):
+        return len(self.blobs[name])
+
+    def url(self, name):
+        return f"https://blob.example/media/{name}"
+
+
+def image_upload(name, size, fmt="JPEG", color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "core.tests.test_images.FakeBlobStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class ImageJobTests(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', parent=self.parent)
+        self.blobs = default_storage.blobs
+        self.blobs.clear()
+        self.assertFalse(hasattr(default_storage, 'location'))
+
+    def stored_size(self, fieldfile):
+        with Image.open(BytesIO(self.blobs[fieldfile.name])) as img:
+            return img.size
+
+    def run_worker(self):
+        # Superseded files are deleted once the worker's transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_image_jobs', '--once', stdout=StringIO())
+
+    def test_upload_stores_original_and_queues_job(self):
+        """The save only stores the upload; Pillow runs in the worker."""
+        upload = image_upload('phone.jpg', (3000, 2000))
+        self.kid.photo = upload
+        self.kid.save()
+        self.assertFalse(self.kid.photo_ready)
+        self.assertEqual(self.blobs[self.kid.photo.name], upload.file.getvalue())
+        job = ImageJob.objects.get()
+        self.assertEqual((job.kind, job.object_id, job.name),
+                         (ImageJob.Kind.KID_PHOTO, self.kid.pk, self.kid.photo.name))
+
+    def test_worker_replaces_original_with_rendition(self):
+        """Only the downscaled photo and its renditions are left in blob storage."""
+        self.kid.photo = image_upload('phone.jpg', (3000, 2000))
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        self.assertTrue(self.kid.photo_ready)
+        renditions = [name for names in self.kid.photo_renditions.values() for name in names.values()]
+        self.assertEqual(sorted(self.blobs), sorted([self.kid.photo.name] + renditions))
+        self.assertEqual(self.stored_size(self.kid.photo), (400, 267))
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.Status.DONE)
+
+    def test_renditions_per_size_and_format(self):
+        """Square crops at every avatar width in WebP plus a JPEG fallback."""
+        self.kid.photo = image_upload('phone.jpg', (3000, 2000))
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        renditions = self.kid.photo_renditions
+        self.assertEqual(set(renditions), set(modern_formats()) | {'jpeg'})
+        for fmt, names in renditions.items():
+            self.assertEqual(sorted(names, key=int), [str(w) for w in AVATAR_WIDTHS])
+            for width, name in names.items():
+                with Image.open(BytesIO(self.blobs[name])) as img:
+                    self.assertEqual((img.format.lower(), img.size), (fmt, (int(width), int(width))))
+        self.assertLess(len(self.blobs[renditions['jpeg']['64']]), 10 * 1024)
+
+    def test_transparent_icon_falls_back_to_png_without_upscaling(self):
+        buffer = BytesIO()
+        Image.new('RGBA', (48, 60), (255, 0, 0, 128)).save(buffer, format='PNG')
+        chore = Chore.objects.create(
+            title='Dishes', parent=self.parent, icon_image=SimpleUploadedFile('dishes.png', buffer.getvalue()))
+        self.run_worker()
+        chore.refresh_from_db()
+        self.assertNotIn('jpeg', chore.icon_renditions)
+        self.assertEqual(sorted(chore.icon_renditions['png'], key=int), ['32', '48'])
+
+    def test_new_upload_replaces_old_renditions(self):
+        self.kid.photo = image_upload('first.jpg', (600, 600))
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        old = self.kid.photo_renditions['jpeg']['64']
+        self.kid.photo = image_upload('second.jpg', (600, 600), color='blue')
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        self.assertNotIn(old, self.blobs)
+        self.assertIn(self.kid.photo_renditions['jpeg']['64'], self.blobs)
+
+    def test_icons_resized_by_worker(self):
+        chore = Chore.objects.create(
+            title='Dishes', parent=self.parent, icon_image=image_upload('dishes.png', (512, 512), 'PNG'))
+        reward = Reward.objects.create(
+            title='Movie', parent=self.parent, icon_image=image_upload('movie.jpg', (300, 600)))
+        self.assertFalse(chore.icon_ready or reward.icon_ready)
+        self.run_worker()
+        chore.refresh_from_db()
+        reward.refresh_from_db()
+        self.assertTrue(chore.icon_ready and reward.icon_ready)
+        self.assertEqual(self.stored_size(chore.icon_image), (128, 128))
+        self.assertEqual(self.stored_size(reward.icon_image), (64, 128))
+
+    def test_small_and_unreadable_uploads_kept_as_is(self):
+        small = image_upload('small.jpg', (200, 200))
+        self.kid.photo = small
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        self.assertTrue(self.kid.photo_ready)
+        self.assertEqual(self.blobs[self.kid.photo.name], small.file.getvalue())
+
+        self.kid.photo = SimpleUploadedFile('photo.heic', b'not an image for Pillow')
+        self.kid.save()
+        with self.assertLogs('core.images', 'WARNING'):
+            self.run_worker()
+        self.kid.refresh_from_db()
+        self.assertTrue(self.kid.photo_ready)
+        self.assertEqual(self.blobs[self.kid.photo.name], b'not an image for Pillow')
+
+    def test_other_saves_do_not_queue_jobs(self):
+        """Saves that don't change the photo (e.g. change_pin) never reprocess it."""
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        self.run_worker()
+        self.kid.refresh_from_db()
+        stored = dict(self.blobs)
+        self.kid.pin = '4321'
+        self.kid.save()
+        self.assertEqual(ImageJob.objects.count(), 1)
+        self.assertEqual(self.blobs, stored)
+
+    def test_replaced_upload_job_is_skipped(self):
+        """A job whose photo was replaced by an emoji leaves storage alone."""
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        self.kid.photo.delete(save=False)
+        self.kid.avatar_emoji = '🚀'
+        self.kid.save()
+        self.run_worker()
+        self.assertEqual(self.blobs, {})
+        self.assertEqual(ImageJob.objects.get().status, ImageJob.Status.DONE)
+
+    def test_upload_replaced_during_processing_is_kept(self):
+        """The row is only locked for the final update, after checking the name again."""
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        first = self.kid.photo.name
+
+        def replace_meanwhile(*args):
+            self.kid.photo = image_upload('second.jpg', (300, 300), color='blue')
+            self.kid.save()
+            return real_process(*args)
+
+        real_process = image_jobs.process_image
+        with mock.patch('core.image_jobs.process_image', side_effect=replace_meanwhile):
+            with self.captureOnCommitCallbacks(execute=True):
+                image_jobs.process_next_job()  # the first upload's job only
+        self.kid.refresh_from_db()
+        self.assertEqual((self.kid.photo_renditions, self.kid.photo_ready), ({}, False))
+        self.assertEqual(sorted(self.blobs), sorted([first, self.kid.photo.name]))
+
+    def test_storage_errors_are_retried_then_failed(self):
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        with mock.patch.object(FakeBlobStorage, '_open', side_effect=OSError('blob unavailable')):
+            with self.assertLogs('core.image_jobs', 'ERROR'):
+                for _ in range(MAX_ATTEMPTS):
+                    self.run_worker()
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (ImageJob.Status.FAILED, MAX_ATTEMPTS))
+        self.assertIn('blob unavailable', job.error)
+        self.kid.refresh_from_db()
+        self.assertFalse(self.kid.photo_ready)
+
+    def test_failed_rendition_upload_leaves_no_orphans(self):
+        """Files written before a failing save are deleted again; only the original stays."""
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        save = FakeBlobStorage._save
+        calls = []
+
+        def flaky_save(storage, name, content):
+            calls.append(name)
+            if len(calls) == 3:
+                raise OSError('upload failed')
+            return save(storage, name, content)
+
+        with mock.patch.object(FakeBlobStorage, '_save', flaky_save), self.assertLogs('core.image_jobs', 'ERROR'):
+            self.run_worker()
+        self.assertEqual(list(self.blobs), [self.kid.photo.name])
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (ImageJob.Status.PENDING, 1))
+
+    def test_abandoned_job_is_claimed_again(self):
+        """A job left processing by a stopped worker is retried after STALE_AFTER."""
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        job = ImageJob.objects.get()
+        claimed = timezone.now() - image_jobs.STALE_AFTER
+        ImageJob.objects.update(status=ImageJob.Status.PROCESSING, attempts=1, processed_at=timezone.now())
+        self.assertIsNone(image_jobs.process_next_job())
+        ImageJob.objects.update(processed_at=claimed)
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ImageJob.Status.DONE, 2))
+
+    def test_over_pixel_budget_fails_without_retry(self):
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        with mock.patch('core.images.MAX_PIXELS', 1000 * 1000), self.assertLogs('core.image_jobs', 'ERROR'):
+            self.run_worker()
+        job = ImageJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (ImageJob.Status.FAILED, 1))
+        self.assertIn('ImageTooLarge', job.error)
+
+    def test_dashboard_shows_fallback_until_ready(self):
+        self.kid.avatar_emoji = '🚀'
+        self.kid.photo = image_upload('phone.jpg', (1200, 1200))
+        self.kid.save()
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+        response = self.client.get(reverse('kid_home'))
+        self.assertNotContains(response, 'kid_avatars/')
+        self.assertIsNone(self.client.get(reverse('api_dashboard')).json()['kid']['photo_url'])
+
+        self.run_worker()
+        self.kid.refresh_from_db()
+        response = self.client.get(reverse('kid_home'))
+        self.assertContains(response, default_storage.url(self.kid.photo_renditions['jpeg']['128']))
+
+    def test_backfill_queues_images_without_renditions(self):
+        """Photos stored before renditions existed get them from --backfill."""
+        Kid.objects.filter(pk=self.kid.pk).update(photo='kid_avatars/old.jpg')
+        self.blobs['kid_avatars/old.jpg'] = image_upload('old.jpg', (400, 400)).file.getvalue()
+        call_command('process_image_jobs', '--backfill', '--once', stdout=StringIO())
+        self.kid.refresh_from_db()
+        self.assertIn('64', self.kid.photo_renditions['jpeg'])
+        call_command('process_image_jobs', '--backfill', '--once', stdout=StringIO())
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+
+class PictureTagTests(SimpleTestCase):
+    """The {% picture %} and {% srcset %} template helpers."""
+
+    renditions = {
+        'jpeg': {'128': 'kid_avatars/renditions/a-128.jpg', '64': 'kid_avatars/renditions/a-64.jpg'},
+        'webp': {'64': 'kid_avatars/renditions/a-64.webp', '128': 'kid_avatars/renditions/a-128.webp'},
+        'avif': {'64': 'kid_avatars/renditions/a-64.avif'},
+    }
+
+    def render(self, source, **context):
+        return Template('{% load renditions %}' + source).render(Context(context))
+
+    def setUp(self):
+        self.photo = Kid(photo='kid_avatars/a.jpg').photo
+
+    def test_picture_sources_and_fallback(self):
+        html = self.render('{% picture photo renditions 64 alt="Elija" class="kid-photo" %}',
+                           photo=self.photo, renditions=self.renditions)
+        self.assertHTMLEqual(html, (
+            '<picture>'
+            '<source type="image/avif" srcset="/media/kid_avatars/renditions/a-64.avif 64w" sizes="64px">'
+            '<source type="image/webp" srcset="/media/kid_avatars/renditions/a-64.webp 64w, '
+            '/media/kid_avatars/renditions/a-128.webp 128w" sizes="64px">'
+            '<img src="/media/kid_avatars/renditions/a-64.jpg" srcset="/media/kid_avatars/renditions/a-64.jpg 64w, '
+            '/media/kid_avatars/renditions/a-128.jpg 128w" sizes="64px" alt="Elija" class="kid-photo" '
+            'width="64" height="64">'
+            '</picture>'
+        ))
+
+    def test_without_renditions_uses_original(self):
+        html = self.render('{% picture photo renditions 80 alt="" %}', photo=self.photo, renditions={})
+        self.assertHTMLEqual(html, '<img src="/media/kid_avatars/a.jpg" alt="" width="80" height="80">')
+
+    def test_srcset(self):
+        html = self.render("{% srcset photo renditions 'webp' %}", photo=self.photo, renditions=self.renditions)
+        self.assertEqual(html, '/media/kid_avatars/renditions/a-64.webp 64w, /media/kid_avatars/renditions/a-128.webp 128w')
+
+
+class BoundedDecodeTests(SimpleTestCase):
+    """Reduced-resolution decoding, pixel budget, orientation and metadata."""
+
+    def jpeg(self, size, **save_options):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='JPEG', **save_options)
+        buffer.name = 'photo.jpg'
+        return buffer
+
+    def pixel_memory(self, upload):
+        """Upper bound of the pixel memory Pillow allocates for ``process_image``.
+
+        Pixels live in C memory that tracemalloc cannot see, so this counts the
+        blocks of Pillow's own allocator: with small blocks and no block cache,
+        every image costs at least its size, rounded up to whole blocks.
+        """
+        core = Image.core
+        block_size, blocks_max = core.get_block_size(), core.get_blocks_max()
+        core.set_block_size(256 * 1024)
+        core.set_blocks_max(0)
+        self.addCleanup(core.set_block_size, block_size)
+        self.addCleanup(core.set_blocks_max, blocks_max)
+        core.reset_stats()
+        process_image(upload, AVATAR_SIZE, AVATAR_WIDTHS)
+        return core.get_stats()['allocated_blocks'] * core.get_block_size()
+
+    def test_large_jpeg_decoded_at_reduced_size(self):
+        """A 24 MP photo is decoded at 1/4 scale, never at full size."""
+        upload = self.jpeg((6000, 4000), quality=95)
+        decoded = []
+        load = ImageFile.ImageFile.load
+
+        def spy(img):
+            decoded.append(img.size)
+            return load(img)
+
+        with mock.patch.object(ImageFile.ImageFile, 'load', spy):
+            rewritten, renditions = process_image(upload, AVATAR_SIZE, AVATAR_WIDTHS)
+        self.assertEqual(max(decoded), (1500, 1000))
+        with Image.open(rewritten) as img:
+            self.assertEqual(img.size, (400, 267))
+
+        # 96 MB of pixels at full size (RGBX), about 6 MB decoded at 1/4 scale
+        self.assertLess(self.pixel_memory(upload), 16 * 1024 * 1024)
+        # Control: the same bound fails as soon as draft() is skipped
+        with mock.patch.object(JpegImagePlugin.JpegImageFile, 'draft'):
+            self.assertGreater(self.pixel_memory(upload), 96 * 1024 * 1024)
+
+    def test_pixel_budget_checked_before_decoding(self):
+        upload = self.jpeg((600, 400))
+        with mock.patch('core.images.MAX_PIXELS', 200_000), \
+                mock.patch.object(ImageFile.ImageFile, 'load') as load:
+            with self.assertRaises(ImageTooLarge):
+                process_image(upload, AVATAR_SIZE, AVATAR_WIDTHS)
+        load.assert_not_called()
+
+    def test_upright_and_stripped(self):
+        """EXIF orientation is applied and GPS/camera metadata removed, even for small photos."""
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = 6  # rotated 90° clockwise
+        exif[ExifTags.Base.Make] = 'Apple'
+        exif[ExifTags.Base.GPSInfo] = {ExifTags.GPS.GPSLatitudeRef: 'N', ExifTags.GPS.GPSLatitude: (54.0, 41.0, 0.0)}
+        upload = self.jpeg((300, 200), exif=exif)
+        rewritten, renditions = process_image(upload, AVATAR_SIZE, AVATAR_WIDTHS)
+        for content in [rewritten] + [content for _, _, content in renditions]:
+            with Image.open(content) as img:
+                self.assertNotIn('exif', img.info)
+                self.assertEqual(len(img.getexif()), 0)
+        with Image.open(rewritten) as img:
+            self.assertEqual(img.size, (200, 300))
+
+    def test_clean_small_photo_not_rewritten(self):
+        rewritten, renditions = process_image(self.jpeg((300, 200)), AVATAR_SIZE, AVATAR_WIDTHS)
+        self.assertIsNone(rewritten)
+        self.assertTrue(renditions)
+
+    def test_upload_form_rejects_over_budget(self):
+        upload = SimpleUploadedFile('phone.jpg', self.jpeg((600, 400)).getvalue(), content_type='image/jpeg')
+        with mock.patch('core.forms.MAX_PIXELS', 200_000):
+            form = AvatarUploadForm(data={}, files={'photo': upload})
+            self.assertFalse(form.is_valid())
+        self.assertIn('megapikselių', str(form.errors['photo']))
@@ -0,0 +1,326 @@
+"""
+Tests for the points ledger service (core/ledger.py).
+
+Tests cover:
+- Milestone crossing and bonus tail rules
+- Guarded status claims (double approval is a no-op)
+- Conditional redemption debit
+- Bulk approval equivalence with sequential approve() calls
+- Ledger entries replaying to the stored balances (verify_ledger command)
+- Concurrent approvals for the same kid (no lost updates)
+"""
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.ledger import (
+    milestones_crossed, credit, debit, approve_chore_log, approve_redemption,
+    bulk_approve_chore_logs, bulk_approve_redemptions,
+)
+from core.management.commands.verify_ledger import replay_ledger
+from core.models import Kid, Chore, Reward, ChoreLog, Redemption, PointAdjustment, LedgerEntry
+
+
+class MilestonesCrossedTests(TestCase):
+    """Test milestone crossing rules."""
+
+    def test_crossing_defined_milestones(self):
+        """Every configured milestone between old and new position is returned."""
+        crossed = milestones_crossed(40, 210)
+        self.assertEqual([m['position'] for m in crossed], [50, 100, 200])
+
+    def test_no_crossing_on_exact_old_position(self):
+        """A milestone at the old position was already reached before."""
+        self.assertEqual(milestones_crossed(50, 99), [])
+
+    def test_bonus_tail_after_last_milestone(self):
+        """Past the last milestone, every 500 points gives a bonus."""
+        crossed = milestones_crossed(3000, 4100)
+        self.assertEqual([m['position'] for m in crossed], [3500, 4000])
+        self.assertTrue(all(m['bonus'] == 50 for m in crossed))
+
+
+class LedgerServiceTests(TestCase):
+    """Test ledger credit/debit and approval helpers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ledgerparent', password='testpass123')
+        self.kid = Kid.objects.create(name='Ledger', parent=self.user, pin='1234')
+        self.chore = Chore.objects.create(title='Dishes', points=45, parent=self.user)
+        self.reward = Reward.objects.create(title='Movie', cost_points=30, parent=self.user)
+
+    def test_credit_awards_milestone_bonus(self):
+        """Crossing 50 adds the 10 point bonus to balance and map."""
+        result = credit(self.kid.pk, 55)
+        self.assertEqual(result.points_balance, 65)
+        self.assertEqual(result.map_position, 65)
+        self.assertEqual(result.highest_milestone, 50)
+        self.assertEqual([m['position'] for m in result.milestones_crossed], [50])
+        self.kid.refresh_from_db()
+        self.assertEqual(self.kid.points_balance, 65)
+        self.assertEqual(self.kid.highest_milestone, 50)
+
+    def test_debit_refuses_overdraw(self):
+        """Debit leaves the balance untouched when points are insufficient."""
+        self.assertIsNone(debit(self.kid.pk, 5))
+        result = debit(self.kid.pk, 5, allow_negative=True)
+        self.assertEqual(result.points_balance, -5)
+        self.assertEqual(result.map_position, 0)
+
+    def test_approve_chore_log_reports_result_and_syncs_kid(self):
+        """Approval returns the new balance and updates the loaded kid."""
+        log = ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        result = approve_chore_log(log)
+        self.assertEqual(result.points_balance, 45)
+        self.assertEqual(log.status, ChoreLog.Status.APPROVED)
+        self.assertEqual(log.child.points_balance, 45)
+
+    def test_stale_instance_cannot_approve_twice(self):
+        """A second in-memory copy of an approved log does not add points again."""
+        log = ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        stale_copy = ChoreLog.objects.get(pk=log.pk)
+        self.assertTrue(log.approve())
+        self.assertFalse(stale_copy.approve())
+        self.kid.refresh_from_db()
+        self.assertEqual(self.kid.points_balance, 45)
+
+    def test_insufficient_redemption_stays_pending(self):
+        """Failed redemption rolls back its status claim."""
+        redemption = Redemption.objects.create(child=self.kid, reward=self.reward)
+        self.assertIsNone(approve_redemption(redemption))
+        redemption.refresh_from_db()
+        self.assertEqual(redemption.status, Redemption.Status.PENDING)
+        self.assertIsNone(redemption.processed_at)
+
+    def test_approval_query_count(self):
+        """Chore approval without milestones: claim UPDATE, kid UPDATE, one SELECT, ledger INSERT."""
+        chore = Chore.objects.create(title='Small', points=5, parent=self.user)
+        log = ChoreLog.objects.create(child=self.kid, chore=chore)
+        with CaptureQueriesContext(connection) as queries:
+            log.approve()
+        statements = [q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(statements), 4, statements)
+
+
+class BulkApprovalTests(TestCase):
+    """Bulk approval must match sequential approve() calls exactly."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulkparent', password='testpass123')
+        self.chores = [
+            Chore.objects.create(title=f'Chore {i}', points=p, parent=self.user)
+            for i, p in enumerate([15, 40, 7, 120, 33, 260, 9, 500])
+        ]
+        self.rewards = [
+            Reward.objects.create(title=f'Reward {i}', cost_points=c, parent=self.user)
+            for i, c in enumerate([30, 400, 20, 5000, 60])
+        ]
+
+    def _make_kid(self, name, position=0):
+        kid = Kid.objects.create(
+            name=name, parent=self.user, pin='1234',
+            points_balance=position, map_position=position,
+        )
+        logs = [ChoreLog.objects.create(child=kid, chore=chore) for chore in self.chores]
+        redemptions = [Redemption.objects.create(child=kid, reward=reward) for reward in self.rewards]
+        return kid, logs, redemptions
+
+    def _state(self, kid):
+        kid.refresh_from_db()
+        return kid.points_balance, kid.map_position, kid.highest_milestone
+
+    def test_bulk_matches_sequential(self):
+        """Same balances, positions, milestones and statuses as a loop of approve()."""
+        for start in (0, 2990):
+            seq_kid, seq_logs, seq_reds = self._make_kid(f'Seq{start}', start)
+            bulk_kid, bulk_logs, bulk_reds = self._make_kid(f'Bulk{start}', start)
+
+            seq_count = sum(log.approve() for log in ChoreLog.objects.filter(child=seq_kid).order_by('pk'))
+            bulk_count = bulk_approve_chore_logs(ChoreLog.objects.filter(child=bulk_kid).order_by('pk'))
+            self.assertEqual(seq_count, bulk_count)
+            self.assertEqual(self._state(seq_kid), self._state(bulk_kid))
+
+            seq_count = sum(red.approve() for red in Redemption.objects.filter(child=seq_kid).order_by('pk'))
+            bulk_count = bulk_approve_redemptions(Redemption.objects.filter(child=bulk_kid).order_by('pk'))
+            self.assertEqual(seq_count, bulk_count)
+            self.assertEqual(self._state(seq_kid), self._state(bulk_kid))
+            self.assertEqual(
+                list(Redemption.objects.filter(child=seq_kid).order_by('pk').values_list('status', flat=True)),
+                list(Redemption.objects.filter(child=bulk_kid).order_by('pk').values_list('status', flat=True)),
+            )
+
+    def test_bulk_skips_already_processed(self):
+        """Approved or rejected rows in the selection are left alone."""
+        kid, logs, _ = self._make_kid('Mixed')
+        logs[0].approve()
+        logs[1].reject()
+        balance_before = self._state(kid)[0]
+        count = bulk_approve_chore_logs(ChoreLog.objects.filter(pk__in=[logs[0].pk, logs[1].pk]))
+        self.assertEqual(count, 0)
+        self.assertEqual(self._state(kid)[0], balance_before)
+
+
+
+class LedgerEntryTests(TestCase):
+    """Every balance change is journaled and the journal replays to the kid row."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='journalparent', password='testpass123')
+        self.kid = Kid.objects.create(name='Journal', parent=self.user, pin='1234', points_balance=30, map_position=30)
+        self.chore = Chore.objects.create(title='Big', points=25, parent=self.user)
+        self.reward = Reward.objects.create(title='Treat', cost_points=20, parent=self.user)
+
+    def _replayed(self):
+        return {kid_id: state for kid_id, *state in replay_ledger(chunk_size=2)}[self.kid.pk]
+
+    def _stored(self):
+        self.kid.refresh_from_db()
+        return [self.kid.points_balance, self.kid.map_position, self.kid.highest_milestone]
+
+    def _verify(self, *args):
+        out = StringIO()
+        call_command('verify_ledger', *args, stdout=out)
+        return out.getvalue()
+
+    def test_entries_for_each_operation(self):
+        """Opening, chore, milestone bonus, redemption and adjustment rows are written."""
+        ChoreLog.objects.create(child=self.kid, chore=self.chore).approve()
+        Redemption.objects.create(child=self.kid, reward=self.reward).approve()
+        PointAdjustment.objects.create(kid=self.kid, parent=self.user, points=-5, reason='Bauda')
+        kinds = list(self.kid.ledger_entries.order_by('id').values_list('kind', 'balance_delta', 'milestone'))
+        self.assertEqual(kinds, [
+            ('OPENING', 30, None),
+            ('CHORE', 25, None),
+            ('MILESTONE', 10, 50),
+            ('REDEMPTION', -20, None),
+            ('ADJUSTMENT', -5, None),
+        ])
+        self.assertEqual(self._replayed(), self._stored())
+
+    def test_bulk_approval_replays(self):
+        """Bulk paths journal the same rows as single approvals."""
+        chores = [Chore.objects.create(title=f'C{i}', points=p, parent=self.user) for i, p in enumerate([80, 200])]
+        for chore in chores:
+            ChoreLog.objects.create(child=self.kid, chore=chore)
+        bulk_approve_chore_logs(ChoreLog.objects.filter(child=self.kid))
+        Redemption.objects.create(child=self.kid, reward=self.reward)
+        bulk_approve_redemptions(Redemption.objects.filter(child=self.kid))
+        self.assertEqual(self._replayed(), self._stored())
+
+    def test_direct_edit_is_journaled_once(self):
+        """Saving changed counters records a correction; ledger-synced values do not."""
+        log = ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        log.approve()
+        log.child.name = 'Renamed'
+        log.child.save()
+        self.kid.refresh_from_db()
+        self.kid.points_balance = 0
+        self.kid.save()
+        self.assertEqual(self.kid.ledger_entries.filter(kind=LedgerEntry.Kind.CORRECTION).count(), 1)
+        self.assertEqual(self._replayed(), self._stored())
+
+    def test_entries_timestamped_under_kid_lock(self):
+        """created_at is taken after the locking UPDATE, so it orders concurrent approvals."""
+        log = ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        real_now = timezone.now
+        with CaptureQueriesContext(connection) as queries:
+            def now():
+                sql = [query['sql'] for query in queries.captured_queries]
+                self.assertTrue(any(q.startswith('UPDATE "core_kid"') for q in sql))
+                return real_now()
+            with mock.patch('core.ledger.timezone.now', side_effect=now) as stamp:
+                credit(self.kid.pk, 5, chore_log=log)
+        self.assertTrue(stamp.called)
+
+    def test_entries_are_append_only(self):
+        """Existing entries cannot be saved again."""
+        entry = self.kid.ledger_entries.get()
+        entry.balance_delta = 1000
+        with self.assertRaises(ValueError):
+            entry.save()
+
+    def test_verify_reports_and_fixes_drift(self):
+        """Drift from raw UPDATEs is reported, and --fix rewrites the row."""
+        ChoreLog.objects.create(child=self.kid, chore=self.chore).approve()
+        self.assertIn('0 drifted', self._verify())
+        Kid.objects.filter(pk=self.kid.pk).update(points_balance=999, highest_milestone=0)
+
+        output = self._verify('--chunk-size', '1')
+        self.assertIn('1 drifted', output)
+        self.assertEqual(self._stored()[0], 999)
+
+        output = self._verify('--fix')
+        self.assertIn('Fixed 1 kids', output)
+        self.assertEqual(self._stored(), [65, 65, 50])
+        self.assertIn('0 drifted', self._verify())
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentApprovalBenchmark(TransactionTestCase):
+    """Approve hundreds of logs for one kid from parallel threads.
+
+    Needs a database with real row locking (PostgreSQL); SQLite's shared
+    in-memory test database cannot serve concurrent writers.
+    """
+
+    LOGS = 300
+    THREADS = 8
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='benchparent', password='testpass123')
+        self.kid = Kid.objects.create(name='Bench', parent=self.user, pin='1234')
+        chores = Chore.objects.bulk_create(
+            Chore(title=f'Chore {i}', points=7, parent=self.user) for i in range(self.LOGS)
+        )
+        ChoreLog.objects.bulk_create(
+            ChoreLog(child=self.kid, chore=chore, points_awarded=7) for chore in chores
+        )
+
+    def test_parallel_approvals_do_not_lose_updates(self):
+        """Final balance equals sequential result no matter the interleaving."""
+        log_ids = list(ChoreLog.objects.values_list('pk', flat=True))
+        chunks = [log_ids[i::self.THREADS] for i in range(self.THREADS)]
+        errors = []
+
+        def worker(ids):
+            try:
+                for log in ChoreLog.objects.filter(pk__in=ids):
+                    log.approve()
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(errors, [])
+        # Replay the same approvals sequentially to get the expected state
+        position = 0
+        balance = 0
+        highest = 0
+        for _ in range(self.LOGS):
+            crossed = milestones_crossed(position, position + 7)
+            bonus = sum(m['bonus'] for m in crossed)
+            position += 7 + bonus
+            balance += 7 + bonus
+            highest = max([highest] + [m['position'] for m in crossed if m['name'] != 'Bonus Milestone'])
+        self.kid.refresh_from_db()
+        self.assertEqual(self.kid.points_balance, balance)
+        self.assertEqual(self.kid.map_position, position)
+        self.assertEqual(self.kid.highest_milestone, highest)
+        self.assertEqual(ChoreLog.objects.filter(status=ChoreLog.Status.APPROVED).count(), self.LOGS)
+        print(f"\n{self.LOGS} approvals on {self.THREADS} threads: {elapsed:.3f}s "
+              f"({self.LOGS / elapsed:.0f} approvals/s)")
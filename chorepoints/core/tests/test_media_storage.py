@@ -0,0 +1,146 @@
+"""
+Tests for content-addressed media storage (core/media_storage.py).
+
+Tests cover:
+- Hash names: same file name with different bytes never overwrites
+- Deduplication: identical uploads stored once, reference-counted
+- Deleting the last reference removes the file, unless saved again meanwhile
+- Local FileSystemStorage variant and the image worker on top of it
+"""
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.media_storage import ContentAddressedFileSystemStorage, ContentAddressedStorageMixin
+from core.models import Chore, Kid, MediaBlob
+from core.tests.test_images import FakeBlobStorage, image_upload
+
+
+class FakeContentBlobStorage(ContentAddressedStorageMixin, FakeBlobStorage):
+    """In-memory stand-in for AzureMediaStorage."""
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "core.tests.test_media_storage.FakeContentBlobStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kids = [Kid.objects.create(name=name, pin='1234', parent=self.parent) for name in ('Elija', 'Agota')]
+        self.blobs = default_storage.blobs
+        self.blobs.clear()
+
+    def upload(self, kid, upload):
+        kid.photo = upload
+        kid.save()
+        return kid.photo.name
+
+    def test_same_file_name_different_bytes(self):
+        """Two kids' IMG_4762.jpg are both kept."""
+        first = self.upload(self.kids[0], image_upload('IMG_4762.jpg', (100, 100), color='red'))
+        second = self.upload(self.kids[1], image_upload('IMG_4762.jpg', (100, 100), color='blue'))
+        self.assertNotEqual(first, second)
+        self.assertRegex(first, r'^sha256/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(len(self.blobs), 2)
+
+    def test_duplicate_upload_is_not_written(self):
+        upload = image_upload('icon.png', (64, 64), 'PNG')
+        chores = []
+        with mock.patch.object(FakeBlobStorage, '_save', wraps=default_storage._save) as save:
+            for title in ('Dishes', 'Laundry', 'Bins'):
+                upload.seek(0)
+                chores.append(Chore.objects.create(title=title, parent=self.parent, icon_image=upload))
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len({chore.icon_image.name for chore in chores}), 1)
+        self.assertEqual(MediaBlob.objects.get().refs, 3)
+
+    def test_last_reference_deletes_file(self):
+        upload = image_upload('phone.jpg', (100, 100))
+        name = self.upload(self.kids[0], upload)
+        upload.seek(0)
+        self.upload(self.kids[1], upload)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kids[0].photo.delete(save=False)
+        self.assertIn(name, self.blobs)
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kids[1].photo.delete(save=False)
+        self.assertNotIn(name, self.blobs)
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_resaved_before_removal_keeps_file(self):
+        """Bytes saved again between the last delete and its removal stay stored."""
+        name = default_storage.save('a.png', ContentFile(b'icon bytes'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            default_storage.delete(name)
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 0)
+        self.assertEqual(default_storage.save('b.png', ContentFile(b'icon bytes')), name)
+        for callback in callbacks:
+            callback()
+        self.assertIn(name, self.blobs)
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+
+    def test_released_blob_is_rewritten(self):
+        """A released row whose file is already gone gets its bytes back on save."""
+        name = default_storage.save('a.png', ContentFile(b'icon bytes'))
+        MediaBlob.objects.filter(name=name).update(refs=0)
+        del self.blobs[name]
+        default_storage.save('b.png', ContentFile(b'icon bytes'))
+        self.assertEqual(self.blobs[name], b'icon bytes')
+
+    def test_legacy_file_without_row_is_deleted(self):
+        self.blobs['kid_avatars/old.jpg'] = b'old'
+        with self.captureOnCommitCallbacks(execute=True):
+            default_storage.delete('kid_avatars/old.jpg')
+        self.assertEqual(self.blobs, {})
+
+    def test_worker_shares_renditions_of_duplicate_photos(self):
+        """Identical photos of two kids end up as one set of stored files."""
+        upload = image_upload('phone.jpg', (1200, 900))
+        self.upload(self.kids[0], upload)
+        upload.seek(0)
+        self.upload(self.kids[1], upload)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_image_jobs', '--once', stdout=StringIO())
+        for kid in self.kids:
+            kid.refresh_from_db()
+        self.assertEqual(self.kids[0].photo.name, self.kids[1].photo.name)
+        self.assertEqual(self.kids[0].photo_renditions, self.kids[1].photo_renditions)
+        names = [self.kids[0].photo.name] + [
+            name for names in self.kids[0].photo_renditions.values() for name in names.values()]
+        # The original upload is gone; everything left is shared by both kids
+        self.assertEqual(sorted(self.blobs), sorted(names))
+        self.assertEqual(set(MediaBlob.objects.values_list('refs', flat=True)), {2})
+
+
+class ContentAddressedFileSystemStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = ContentAddressedFileSystemStorage(location=self.root)
+
+    def test_duplicate_save_keeps_single_file(self):
+        first = self.storage.save('chore_icons/a.png', ContentFile(b'icon bytes'))
+        second = self.storage.save('reward_icons/b.PNG', ContentFile(b'icon bytes'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith('.png'))
+        self.assertEqual([p.name for p in Path(self.root).rglob('*.png')], [Path(first).name])
+        self.assertEqual(MediaBlob.objects.get(name=first).size, len(b'icon bytes'))
+
+    def test_rewrite_after_file_was_removed(self):
+        """A file whose row is gone is written again over any leftover copy."""
+        name = self.storage.save('a.png', ContentFile(b'icon bytes'))
+        MediaBlob.objects.all().delete()
+        self.assertEqual(self.storage.save('a.png', ContentFile(b'icon bytes')), name)
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
@@ -0,0 +1,172 @@
+"""
+Tests for the precomputed milestone index (core/milestones.py).
+
+The bisect-based lookups are checked against a straightforward linear scan
+of the ladder for every position around each milestone. Family ladders are
+checked for cache hits and invalidation.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from core.milestones import (
+    ACHIEVEMENT_MILESTONES, DEFAULT_MILESTONE_INDEX, MILESTONE_INDEX_CACHE_KEY, MilestoneIndex, get_milestone_index,
+)
+from core.models import Kid, Chore, ChoreLog, MilestoneLadder, LadderMilestone
+
+
+def linear_current_index(milestones, position):
+    index = -1
+    for i, milestone in enumerate(milestones):
+        if position >= milestone['position']:
+            index = i
+    return index
+
+
+class MilestoneIndexTests(SimpleTestCase):
+    """Test MilestoneIndex lookups."""
+
+    def positions_to_check(self):
+        for milestone in ACHIEVEMENT_MILESTONES:
+            yield from (milestone['position'] - 1, milestone['position'], milestone['position'] + 1)
+        yield from (0, 4999, 5000, 12345)
+
+    def test_current_and_next_match_linear_scan(self):
+        """Binary search gives the same answers as scanning the list."""
+        for position in self.positions_to_check():
+            expected = linear_current_index(ACHIEVEMENT_MILESTONES, position)
+            self.assertEqual(DEFAULT_MILESTONE_INDEX.current_index(position), expected, position)
+            current = DEFAULT_MILESTONE_INDEX.current(position)
+            if expected == -1:
+                self.assertIsNone(current)
+            else:
+                self.assertEqual(current, ACHIEVEMENT_MILESTONES[expected])
+            upcoming = [m for m in ACHIEVEMENT_MILESTONES if m['position'] > position]
+            next_milestone = DEFAULT_MILESTONE_INDEX.next(position)
+            if upcoming:
+                self.assertEqual(next_milestone, upcoming[0])
+            else:
+                self.assertEqual(next_milestone['position'], (position // 500 + 1) * 500)
+
+    def test_crossed_includes_bonus_tail(self):
+        """Crossing past the ladder returns one bonus per 500 points."""
+        crossed = DEFAULT_MILESTONE_INDEX.crossed(3100, 4600)
+        self.assertEqual([m['position'] for m in crossed], [3500, 4000, 4500])
+        self.assertEqual(sum(m['bonus'] for m in crossed), 150)
+
+    def test_crossed_no_tail_when_starting_below_last_milestone(self):
+        """The tail only starts counting once the last milestone was already reached."""
+        crossed = DEFAULT_MILESTONE_INDEX.crossed(2900, 3600)
+        self.assertEqual([m['position'] for m in crossed], [3000])
+
+    def test_display_list_statuses(self):
+        """Display payloads are marked achieved/locked with aria text."""
+        milestones = DEFAULT_MILESTONE_INDEX.display_list(120)
+        self.assertEqual([m['status'] for m in milestones[:3]], ['achieved', 'achieved', 'locked'])
+        self.assertEqual(milestones[2]['aria_label'], "Aukso ženkliukas, 200 taškai, dar reikia 80 taškų")
+        self.assertEqual(DEFAULT_MILESTONE_INDEX.reached_between(milestones, 40, 120), milestones[:2])
+
+    def test_payloads_are_copies(self):
+        """Callers mutating a result cannot corrupt the shared index."""
+        DEFAULT_MILESTONE_INDEX.current(60)['name'] = 'Changed'
+        self.assertEqual(DEFAULT_MILESTONE_INDEX.current(60)['name'], 'Bronzos ženkliukas')
+
+    def test_unsorted_custom_ladder(self):
+        """Custom ladders are sorted on build and use their own tail rule."""
+        index = MilestoneIndex(
+            [
+                {'position': 20, 'name': 'B', 'icon': 'b', 'bonus': 2},
+                {'position': 10, 'name': 'A', 'icon': 'a', 'bonus': 1},
+            ],
+            bonus_interval=100,
+            bonus_points=5,
+        )
+        self.assertEqual(index.current(15)['name'], 'A')
+        self.assertEqual(index.avatar_percentage(25), 100)
+        self.assertEqual([m['position'] for m in index.crossed(20, 250)], [100, 200])
+
+
+class FamilyLadderTests(TestCase):
+    """Test per-family milestone ladders and their cached compiled form."""
+
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='ladderparent', password='testpass123')
+        self.ladder = MilestoneLadder.objects.create(parent=self.parent, bonus_interval=100, bonus_points=5)
+        LadderMilestone.objects.create(ladder=self.ladder, position=20, name='Pirmas', icon='⭐', bonus=3)
+        LadderMilestone.objects.create(ladder=self.ladder, position=40, name='Antras', icon='🌟', bonus=4)
+        self.kid = Kid.objects.create(name='Ladder', parent=self.parent, pin='1234')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_family_without_ladder_uses_default(self):
+        """Parents without a ladder get the built-in milestones."""
+        other = User.objects.create_user(username='defaultparent', password='testpass123')
+        self.assertEqual(len(get_milestone_index(other.pk)), len(ACHIEVEMENT_MILESTONES))
+
+    def test_kid_map_uses_family_ladder(self):
+        """Map progress and next milestone follow the custom ladder and tail."""
+        self.kid.map_position = 45
+        progress = self.kid.get_map_progress()
+        self.assertEqual([m['name'] for m in progress['milestones']], ['Pirmas', 'Antras'])
+        self.assertTrue(progress['completed_all_milestones'])
+        self.assertEqual(self.kid.get_next_milestone()['position'], 100)
+
+    def test_approval_awards_family_bonus(self):
+        """Ledger credits use the kid's own ladder."""
+        chore = Chore.objects.create(title='Lova', points=25, parent=self.parent)
+        ChoreLog.objects.create(child=self.kid, chore=chore).approve()
+        self.kid.refresh_from_db()
+        self.assertEqual(self.kid.points_balance, 28)
+        self.assertEqual(self.kid.highest_milestone, 20)
+
+    def test_compiled_ladder_served_from_cache(self):
+        """After the first build, lookups do not touch the database."""
+        get_milestone_index(self.parent.pk)
+        with self.assertNumQueries(0):
+            index = Kid(parent=self.parent).milestone_index
+        self.assertEqual(index.last_position, 40)
+
+    def test_saving_milestone_invalidates_cache(self):
+        """Edits show up on the next lookup."""
+        self.assertEqual(get_milestone_index(self.parent.pk).last_position, 40)
+        LadderMilestone.objects.create(ladder=self.ladder, position=80, name='Trečias', icon='🏆', bonus=6)
+        self.assertEqual(get_milestone_index(self.parent.pk).last_position, 80)
+        self.ladder.delete()
+        self.assertEqual(len(get_milestone_index(self.parent.pk)), len(ACHIEVEMENT_MILESTONES))
+
+    def test_queryset_delete_falls_back_to_default_ladder(self):
+        """Bulk and cascade deletes (admin "delete selected", a deleted parent) invalidate too."""
+        get_milestone_index(self.parent.pk)
+        MilestoneLadder.objects.filter(parent=self.parent).delete()
+        self.assertIs(get_milestone_index(self.parent.pk, for_update=True), DEFAULT_MILESTONE_INDEX)
+        chore = Chore.objects.create(title='Lova', points=55, parent=self.parent)
+        ChoreLog.objects.create(child=self.kid, chore=chore).approve()
+        self.kid.refresh_from_db()
+        self.assertEqual((self.kid.points_balance, self.kid.highest_milestone), (65, 50))
+
+    def test_queryset_milestone_delete_invalidates(self):
+        get_milestone_index(self.parent.pk)
+        LadderMilestone.objects.filter(ladder=self.ladder, position=40).delete()
+        self.assertEqual(get_milestone_index(self.parent.pk).last_position, 20)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_unshared_cache_approvals_use_current_ladder(self):
+        """An edit another worker made (no local invalidation) applies to the next approval."""
+        get_milestone_index(self.parent.pk)
+        self.assertIsNotNone(cache.get(MILESTONE_INDEX_CACHE_KEY.format(parent_id=self.parent.pk)))
+        LadderMilestone.objects.filter(ladder=self.ladder, position=20).update(bonus=7)
+        chore = Chore.objects.create(title='Lova', points=25, parent=self.parent)
+        ChoreLog.objects.create(child=self.kid, chore=chore).approve()
+        self.kid.refresh_from_db()
+        self.assertEqual(self.kid.points_balance, 32)
+
+    def test_map_fragment_key_follows_ladder(self):
+        """Map cache keys change with ladder edits and are shared by same-position siblings."""
+        sibling = Kid.objects.create(name='Sibling', parent=self.parent, pin='1234')
+        self.assertEqual(self.kid.map_fragment_key(), sibling.map_fragment_key())
+        key = self.kid.map_fragment_key()
+        LadderMilestone.objects.create(ladder=self.ladder, position=80, name='Trečias', icon='🏆', bonus=6)
+        self.assertNotEqual(Kid.objects.get(pk=self.kid.pk).map_fragment_key(), key)
+        self.kid.map_position = 5
+        self.assertNotEqual(self.kid.map_fragment_key(), sibling.map_fragment_key())
@@ -268,10 +268,13 @@ class ChoreLogModelTests(TestCase):
     
     def test_chorelog_bulk_approve_race_condition_fix(self):
         """Test bulk approval uses refresh_from_db() to prevent race condition."""
-        # Create 3 ChoreLog entries
-        log1 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=15)
-        log2 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=5)
-        log3 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=10)
+        # Create 3 ChoreLog entries (only one pending log per chore is allowed)
+        chores = [self.chore] + [
+            Chore.objects.create(title=f'Chore {i}', points=5, parent=self.user) for i in range(2)
+        ]
+        log1 = ChoreLog.objects.create(child=self.kid, chore=chores[0], points_awarded=15)
+        log2 = ChoreLog.objects.create(child=self.kid, chore=chores[1], points_awarded=5)
+        log3 = ChoreLog.objects.create(child=self.kid, chore=chores[2], points_awarded=10)
         
         # Approve all three (simulating bulk admin action)
         log1.approve()
@@ -457,9 +460,12 @@ class ModelIntegrationTests(TestCase):
     def test_full_workflow_chore_to_reward(self):
         """Test complete workflow: submit chores, approve, redeem reward."""
         # Step 1: Submit 3 chores
-        log1 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=10)
-        log2 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=10)
-        log3 = ChoreLog.objects.create(child=self.kid, chore=self.chore, points_awarded=10)
+        chores = [self.chore] + [
+            Chore.objects.create(title=f'Chore {i}', points=10, parent=self.user) for i in range(2)
+        ]
+        log1 = ChoreLog.objects.create(child=self.kid, chore=chores[0], points_awarded=10)
+        log2 = ChoreLog.objects.create(child=self.kid, chore=chores[1], points_awarded=10)
+        log3 = ChoreLog.objects.create(child=self.kid, chore=chores[2], points_awarded=10)
         
         # Step 2: Approve all chores (bulk)
         log1.approve()
@@ -2,13 +2,26 @@
 Performance tests for ChorePoints application.
 Tests query optimization, load times, and performance metrics.
 """
-from django.test import TestCase, override_settings
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.test.utils import override_settings
-from django.db import connection
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
 from django.test.utils import CaptureQueriesContext
+from unittest import skipUnless
 from core.models import Kid, Chore, Reward, ChoreLog, Redemption, PointAdjustment
+from core.ledger import bulk_approve_chore_logs
+import importlib.util
+import shutil
+import statistics
+import tempfile
+import threading
 import time
 
 
@@ -89,6 +102,111 @@ class QueryOptimizationTests(TestCase):
             for i, query in enumerate(queries, 1):
                 print(f"{i}. {query['sql'][:100]}...")
     
+    @override_settings(DASHBOARD_SNAPSHOT_TIMEOUT=0)
+    def test_kid_home_exact_query_budget(self):
+        """Kid home runs a fixed number of queries regardless of history length."""
+        self.client.post(reverse('kid_login'), {
+            'kid': self.kids[0].id,
+            'pin': '0000'
+        })
+        self.client.get(reverse('kid_home'))  # warm caches, consume login message
+
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(reverse('kid_home'))
+
+        # Grow history and pending lists well past the display limits
+        kid = self.kids[0]
+        for chore in self.chores[3:]:
+            ChoreLog.objects.create(child=kid, chore=chore).approve()
+        for chore in self.chores[:3]:
+            ChoreLog.objects.create(child=kid, chore=chore)
+        for reward in self.rewards:
+            Redemption.objects.create(child=kid, reward=reward)
+        for i in range(15):
+            PointAdjustment.objects.create(kid=kid, points=1, reason=f'Bonus {i}', parent=self.parent)
+
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.status_code, 200)
+
+        # chores, rewards, pending logs, pending redemptions, approved logs,
+        # approved redemptions, adjustments, seen cursor (the session and the
+        # kid row come from the cache)
+        self.assertEqual(len(before), 8, [q['sql'] for q in before])
+        # Plus the kid row (its version changed) and one UPDATE recording the
+        # approvals as seen
+        self.assertEqual(len(after), len(before) + 2, [q['sql'] for q in after])
+
+    def test_kid_home_snapshot_hit_skips_dashboard_queries(self):
+        """A repeat visit is served from the cached snapshot until something changes."""
+        self.client.post(reverse('kid_login'), {
+            'kid': self.kids[0].id,
+            'pin': '0000'
+        })
+        self.client.get(reverse('kid_home'))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('kid_home'))
+        # seen cursor
+        self.assertEqual(len(queries), 1, [q['sql'] for q in queries])
+
+        # Approval invalidates the snapshot and the new balance is shown
+        log = ChoreLog.objects.create(child=self.kids[0], chore=self.chores[5])
+        log.approve()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('kid_home'))
+        # kid row, 7 dashboard queries, seen cursor and its UPDATE
+        self.assertEqual(len(queries), 10)
+        self.assertContains(response, 'data-current-points="115"')
+
+    def test_kid_row_cached_until_version_bump(self):
+        """The logged-in kid is reused across requests but never shown stale."""
+        def kid_queries(queries):
+            return [q['sql'] for q in queries if 'FROM "core_kid"' in q['sql']]
+
+        kid = self.kids[0]
+        self.client.post(reverse('kid_login'), {'kid': kid.id, 'pin': '0000'})
+        self.client.get(reverse('kid_home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('kid_home'))
+            self.client.get(reverse('api_dashboard'))
+        self.assertEqual(kid_queries(queries), [])
+
+        ChoreLog.objects.create(child=kid, chore=self.chores[5]).approve()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api_dashboard'))
+        self.assertEqual(len(kid_queries(queries)), 1)
+        self.assertEqual(response.json()['balance'], 115)
+
+        kid.refresh_from_db()
+        kid.active = False
+        kid.save()
+        self.assertEqual(self.client.get(reverse('kid_home')).status_code, 404)
+
+    def test_kid_home_steady_state_writes_nothing(self):
+        """Repeated loads write only when the seen cursor actually advances."""
+        def writes(queries):
+            return [q['sql'] for q in queries if q['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+
+        self.client.post(reverse('kid_login'), {
+            'kid': self.kids[0].id,
+            'pin': '0000'
+        })
+        self.client.get(reverse('kid_home'))
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('kid_home'))
+            self.assertEqual(writes(queries), [])
+
+        ChoreLog.objects.create(child=self.kids[0], chore=self.chores[5]).approve()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('kid_home'))
+        self.assertEqual(len(writes(queries)), 1, writes(queries))
+        self.assertIn('core_kidseencursor', writes(queries)[0])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('kid_home'))
+        self.assertEqual(writes(queries), [])
+
     def test_kid_login_query_count(self):
         """Test that kid login page doesn't have excessive queries."""
         with CaptureQueriesContext(connection) as queries:
@@ -99,6 +217,47 @@ class QueryOptimizationTests(TestCase):
         query_count = len(queries)
         self.assertLess(query_count, 5, 
             f"Kid login page generated {query_count} queries")
+
+    def test_kid_login_picker_served_from_cache(self):
+        """The tile grid is rendered once; failed logins look up only the chosen kid."""
+        self.client.get(reverse('kid_login'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('kid_login'))
+        # Only the family lookup for the device's family code
+        self.assertEqual(len(queries), 1, [q['sql'] for q in queries])
+        self.assertIn('"core_family"', queries[0]['sql'])
+        self.assertContains(response, 'data-kid-id="%d"' % self.kids[2].id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('kid_login'), {'kid': self.kids[1].id, 'pin': '9999'})
+        kid_queries = [q['sql'] for q in queries if 'FROM "core_kid"' in q['sql']]
+        self.assertEqual(len(kid_queries), 1, kid_queries)
+        self.assertIn('"core_kid"."id" = %d' % self.kids[1].id, kid_queries[0])
+        self.assertContains(response, 'data-selected-kid="%d"' % self.kids[1].id)
+
+        # Kid changes replace the cached grid
+        self.kids[2].active = False
+        self.kids[2].save()
+        response = self.client.get(reverse('kid_login'))
+        self.assertNotContains(response, 'data-kid-id="%d"' % self.kids[2].id)
+
+    def test_family_login_cost_independent_of_other_families(self):
+        """Other families' kids are neither listed nor queried."""
+        url = reverse('family_kid_login', args=[self.parent.family.login_code])
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        cache.clear()
+
+        for i in range(20):
+            other = User.objects.create_user(username=f'other{i}', password='x')
+            for j in range(3):
+                Kid.objects.create(name=f'Other {i}-{j}', pin='1111', parent=other)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(len(large), len(small))
+        self.assertNotContains(response, 'Other 0-0')
+        kid_query = next(q['sql'] for q in large if 'FROM "core_kid"' in q['sql'])
+        self.assertIn('"core_kid"."parent_id" = %d' % self.parent.id, kid_query)
     
     def test_chore_submission_query_count(self):
         """Test that chore submission doesn't have excessive queries."""
@@ -272,6 +431,250 @@ class LoadTimeTests(TestCase):
             f"Reward redemption took {response_time:.3f}s to respond")
 
 
+class PageWeightTests(TestCase):
+    """Pages ship markup plus a small data payload; CSS/JS come from cacheable static bundles.
+
+    Before the extraction kid_home was ~105 KB and kid_login ~30 KB of HTML
+    on every request (mostly inline <style>/<script>).
+    """
+
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', points_balance=100, parent=self.parent)
+        for i in range(12):
+            Chore.objects.create(title=f'Chore {i}', points=10, parent=self.parent)
+            Reward.objects.create(title=f'Reward {i}', cost_points=20 * i + 10, parent=self.parent)
+
+    def assertNoInlineAssets(self, html):
+        self.assertNotIn('<style>', html)
+        # The only inline script left is the json_script data payload
+        self.assertEqual(html.count('<script>'), 0)
+
+    def test_kid_login_links_bundles(self):
+        """Login page is small and references the login bundles."""
+        response = self.client.get(reverse('kid_login'))
+        html = response.content.decode()
+        self.assertNoInlineAssets(html)
+        self.assertIn('core/css/base.css', html)
+        self.assertIn('core/js/login.js', html)
+        self.assertLess(len(response.content), 8 * 1024)
+        print(f"\nkid_login HTML: {len(response.content)} bytes")
+
+    def test_kid_home_links_bundles(self):
+        """Dashboard HTML is markup plus the kid-home-data payload."""
+        self.client.post(reverse('kid_login'), {'kid': self.kid.id, 'pin': '1234'})
+        response = self.client.get(reverse('kid_home'))
+        html = response.content.decode()
+        self.assertNoInlineAssets(html)
+        self.assertIn('core/css/home.css', html)
+        self.assertIn('<script id="kid-home-data" type="application/json">', html)
+        self.assertLess(len(response.content), 40 * 1024)
+        print(f"\nkid_home HTML: {len(response.content)} bytes")
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    },
+    STATIC_URL='/static/',
+)
+class StaticServingTests(TestCase):
+    """Production static mode: WhiteNoise serves hashed, precompressed bundles."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        with override_settings(STATIC_ROOT=cls.static_root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+    def setUp(self):
+        middleware = list(settings.MIDDLEWARE)
+        middleware.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+        override = override_settings(STATIC_ROOT=self.static_root, MIDDLEWARE=middleware)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_hashed_bundle_served_with_brotli_and_immutable_caching(self):
+        """Hashed names come precompressed and cacheable forever."""
+        url = static('core/css/home.css')
+        self.assertRegex(url, r'^/static/core/css/home\.[0-9a-f]{12}\.css$')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response.close()
+
+    def test_pages_reference_hashed_names(self):
+        """Templates resolve bundles through the manifest."""
+        parent = User.objects.create_user(username='parent', password='parentpass123')
+        Kid.objects.create(name='Elija', pin='1234', parent=parent)
+        response = self.client.get(reverse('kid_login'))
+        self.assertContains(response, static('core/js/login.js'))
+        self.assertNotContains(response, '/static/core/js/login.js"')
+
+
+@skipUnless(importlib.util.find_spec('storages'), 'needs django-storages[azure] (requirements.txt)')
+class AzureStaticCacheControlTests(SimpleTestCase):
+    """AZURE_STATIC_FILES mode: only content-hashed blobs are cached forever."""
+
+    def setUp(self):
+        from django.core.files.storage import FileSystemStorage
+        from chorepoints.storage_backends import AzureManifestStaticStorage
+        manifest_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, manifest_dir)
+        self.storage = AzureManifestStaticStorage(manifest_storage=FileSystemStorage(location=manifest_dir))
+        self.storage.hashed_files = {'core/css/home.css': 'core/css/home.0123456789ab.css'}
+
+    def cache_control(self, name):
+        return self.storage._get_content_settings_parameters(name)['cache_control']
+
+    def test_hashed_names_are_immutable(self):
+        self.assertIn('immutable', self.cache_control('core/css/home.0123456789ab.css'))
+        # Hashed copies are uploaded before the manifest lists them
+        self.assertIn('immutable', self.cache_control('core/js/login.abcdef012345.js'))
+
+    def test_unhashed_originals_and_manifest_expire_soon(self):
+        for name in ('core/css/home.css', 'staticfiles.json'):
+            self.assertEqual(self.cache_control(name), 'public, max-age=300')
+
+
+class MapFragmentCacheBenchmark(TestCase):
+    """kid_home render time with a cold vs. warm adventure map fragment cache."""
+
+    RENDERS = 20
+
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', map_position=640, avatar_emoji='🦊', parent=self.parent)
+        self.sibling = Kid.objects.create(name='Agota', pin='4321', map_position=640, avatar_emoji='🦊', parent=self.parent)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _login(self, kid):
+        session = self.client.session
+        session['kid_id'] = kid.id
+        session.save()
+
+    def _render_time(self):
+        start = time.perf_counter()
+        for _ in range(self.RENDERS):
+            response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.status_code, 200)
+        return (time.perf_counter() - start) / self.RENDERS
+
+    def test_sibling_reuses_rendered_fragment(self):
+        """A kid with the same map key gets the cached markup without re-rendering it."""
+        self._login(self.kid)
+        self.client.get(reverse('kid_home'))
+        key = make_template_fragment_key('kid_map', [self.kid.map_fragment_key()])
+        self.assertIn('Karūnos ženkliukas', cache.get(key))
+        cache.set(key, '<div id="cached-map-marker"></div>')
+
+        self._login(self.sibling)
+        response = self.client.get(reverse('kid_home'))
+        self.assertContains(response, 'cached-map-marker')
+
+    def test_warm_vs_cold_render_time(self):
+        """Warm fragment cache skips the milestone loop on every render."""
+        self._login(self.kid)
+        with override_settings(DASHBOARD_SNAPSHOT_TIMEOUT=300, MAP_FRAGMENT_TIMEOUT=0):
+            cold = self._render_time()
+        warm = self._render_time()
+        print(f"\nkid_home render: cold map {cold * 1000:.2f} ms, warm map {warm * 1000:.2f} ms")
+        self.assertIsNotNone(cache.get(make_template_fragment_key('kid_map', [self.kid.map_fragment_key()])))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL, see LOCAL_POSTGRES_DB in settings.py')
+class ConnectionReuseBenchmark(TransactionTestCase):
+    """Per-request latency with a new database connection per request vs. reused ones.
+
+    Run against a local PostgreSQL standing in for Azure, e.g.::
+
+        docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:15
+        LOCAL_POSTGRES_DB=postgres LOCAL_POSTGRES_PASSWORD=postgres \
+            python manage.py test core.tests.test_performance.ConnectionReuseBenchmark
+
+    Over TLS to Azure the gap is much larger than on localhost.
+    """
+
+    REQUESTS = 50
+
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Elija', pin='1234', parent=self.parent)
+        self.chore = Chore.objects.create(title='Dishes', points=10, parent=self.parent)
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+
+        saved = {key: connection.settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        saved_options = dict(connection.settings_dict['OPTIONS'])
+
+        def restore():
+            connection.close()
+            connection.close_pool()
+            connection.settings_dict.update(saved)
+            connection.settings_dict['OPTIONS'] = saved_options
+        self.addCleanup(restore)
+
+    def _configure(self, conn_max_age, pool=None):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        connection.settings_dict['CONN_HEALTH_CHECKS'] = True
+        options = dict(connection.settings_dict['OPTIONS'])
+        options.pop('pool', None)
+        if pool:
+            options['pool'] = pool
+        connection.settings_dict['OPTIONS'] = options
+
+    def _median_ms(self):
+        """Median latency of a chore submission plus a family login page view."""
+        complete_url = reverse('complete_chore', args=[self.chore.id])
+        login_url = reverse('family_kid_login', args=[self.parent.family.login_code])
+        timings = []
+        for _ in range(self.REQUESTS):
+            start = time.perf_counter()
+            for method, url in ((self.client.post, complete_url), (self.client.get, login_url)):
+                # The test client disconnects these request_started/finished
+                # handlers; call them as a gunicorn worker would
+                close_old_connections()
+                response = method(url)
+                close_old_connections()
+                self.assertLess(response.status_code, 400)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def test_persistent_vs_new_connection_per_request(self):
+        """CONN_MAX_AGE skips the connection setup on every request."""
+        self._configure(conn_max_age=0)
+        fresh = self._median_ms()
+        self._configure(conn_max_age=600)
+        persistent = self._median_ms()
+        print(f"\n2 requests: new connections {fresh:.2f} ms, persistent {persistent:.2f} ms")
+        self.assertLess(persistent, fresh)
+
+    def test_pooled_vs_new_connection_per_request(self):
+        """DB_POOL hands out already open, health-checked connections."""
+        if importlib.util.find_spec('psycopg_pool') is None:
+            self.skipTest('psycopg[pool] is not installed')
+        self._configure(conn_max_age=0)
+        fresh = self._median_ms()
+        self._configure(conn_max_age=0, pool={'min_size': 1, 'max_size': 2})
+        pooled = self._median_ms()
+        print(f"\n2 requests: new connections {fresh:.2f} ms, pooled {pooled:.2f} ms")
+        self.assertLess(pooled, fresh)
+
+
 class ScalabilityTests(TestCase):
     """Test application scalability with larger datasets."""
     
@@ -292,18 +695,16 @@ class ScalabilityTests(TestCase):
     
     def test_many_chore_logs_performance(self):
         """Test performance with many chore logs."""
-        chore = Chore.objects.create(
-            title='Test chore',
-            points=10,
-            parent=self.parent
+        chores = Chore.objects.bulk_create(
+            Chore(title=f'Test chore {i}', points=10, parent=self.parent) for i in range(50)
         )
         
-        # Create 50 chore logs
+        # Create 50 chore logs (one pending log per chore)
         logs = []
         for i in range(50):
             logs.append(ChoreLog(
                 child=self.kid,
-                chore=chore,
+                chore=chores[i],
                 points_awarded=10,
                 status='APPROVED' if i % 2 == 0 else 'PENDING'
             ))
@@ -356,18 +757,16 @@ class ScalabilityTests(TestCase):
     
     def test_database_query_efficiency_at_scale(self):
         """Test that query count doesn't increase dramatically with more data."""
-        chore = Chore.objects.create(
-            title='Test chore',
-            points=10,
-            parent=self.parent
+        chores = Chore.objects.bulk_create(
+            Chore(title=f'Test chore {i}', points=10, parent=self.parent) for i in range(100)
         )
         
-        # Create 100 chore logs (large scale test)
+        # Create 100 chore logs (large scale test, one pending log per chore)
         logs = []
         for i in range(100):
             logs.append(ChoreLog(
                 child=self.kid,
-                chore=chore,
+                chore=chores[i],
                 points_awarded=10,
                 status='PENDING'
             ))
@@ -385,11 +784,155 @@ class ScalabilityTests(TestCase):
             self.assertEqual(response.status_code, 200)
         
         query_count = len(queries)
-        # NOTE: With 100 pending logs, some N+1 issues may appear
-        # For MVP with family use (typically <20 pending items), this is acceptable
-        # Production optimization would use select_related/prefetch_related
-        self.assertLess(query_count, 150, 
+        # Dashboard loader joins chores with select_related, so pending
+        # items do not add queries (no N+1)
+        self.assertLess(query_count, 15, 
             f"Kid home with 100 logs generated {query_count} queries")
-        
-        # Document that query count scales with pending items (N+1 issue exists)
-        # Acceptable for MVP with small datasets (family use)
+
+
+class BulkApprovalBenchmark(TestCase):
+    """Benchmark admin bulk approval against per-row approve() calls."""
+
+    KIDS = 10
+    LOGS_PER_KID = 50
+
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        kids = [
+            Kid.objects.create(name=f'Kid{i}', pin='1234', parent=self.parent)
+            for i in range(self.KIDS)
+        ]
+        chores = Chore.objects.bulk_create(
+            Chore(title=f'Chore {i}', points=10, parent=self.parent)
+            for i in range(self.LOGS_PER_KID)
+        )
+        ChoreLog.objects.bulk_create(
+            ChoreLog(child=kid, chore=chore, points_awarded=chore.points)
+            for kid in kids for chore in chores
+        )
+
+    def test_week_backlog_query_count(self):
+        """500 logs across 10 kids are approved with a constant number of queries."""
+        total_logs = self.KIDS * self.LOGS_PER_KID
+        start_time = time.time()
+        with CaptureQueriesContext(connection) as queries:
+            approved = bulk_approve_chore_logs(ChoreLog.objects.all())
+        bulk_time = time.time() - start_time
+
+        self.assertEqual(approved, total_logs)
+        statements = [q for q in queries if 'SAVEPOINT' not in q['sql']]
+        # select logs, select kids, bulk_update logs, bulk_update kids, insert ledger entries
+        self.assertLessEqual(len(statements), 4 + self.KIDS,
+            f"Bulk approval of {total_logs} logs generated {len(statements)} queries")
+        self.assertLess(len(statements), total_logs // 10)
+        print(f"\nBulk approval: {total_logs} logs, {len(statements)} queries, {bulk_time:.3f}s")
+
+
+class IndexUsageTests(TestCase):
+    """EXPLAIN the hot status filters and check they hit the composite/partial indexes.
+
+    Test tables are tiny, so PostgreSQL is told to avoid sequential scans to
+    show which index the planner would pick on a real table.
+    """
+
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Kid', pin='1234', parent=self.parent)
+        self.chore = Chore.objects.create(title='Chore', points=10, parent=self.parent)
+        self.reward = Reward.objects.create(title='Reward', cost_points=10, parent=self.parent)
+
+    def assertUsesIndex(self, queryset, index_name):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_pending_lists_use_partial_indexes(self):
+        """Dashboard pending lists read only the PENDING slice of each table."""
+        self.assertUsesIndex(
+            self.kid.chore_logs.filter(status=ChoreLog.Status.PENDING).order_by('-logged_at'),
+            'chorelog_pending_idx',
+        )
+        self.assertUsesIndex(
+            self.kid.redemptions.filter(status=Redemption.Status.PENDING).order_by('-redeemed_at'),
+            'redemption_pending_idx',
+        )
+
+    def test_duplicate_guard_uses_unique_constraint(self):
+        """The duplicate-pending lookup is answered by the partial unique index."""
+        self.assertUsesIndex(
+            ChoreLog.objects.filter(child=self.kid, chore=self.chore, status=ChoreLog.Status.PENDING),
+            'unique_pending_chorelog',
+        )
+        self.assertUsesIndex(
+            Redemption.objects.filter(child=self.kid, reward=self.reward, status=Redemption.Status.PENDING),
+            'unique_pending_redemption',
+        )
+
+    def test_history_uses_status_processed_index(self):
+        """Approved history and the new-approvals check filter by (child, status)."""
+        self.assertUsesIndex(
+            self.kid.chore_logs.filter(status=ChoreLog.Status.APPROVED)
+            .order_by(F('processed_at').desc(nulls_last=True)),
+            'chorelog_child_status_proc_idx',
+        )
+        self.assertUsesIndex(
+            self.kid.redemptions.filter(status=Redemption.Status.APPROVED, processed_at__gt=self.kid.created_at),
+            'redemption_child_status_proc',
+        )
+
+    def test_adjustments_use_kid_created_index(self):
+        """Recent adjustments are read in index order without a sort."""
+        self.assertUsesIndex(self.kid.point_adjustments.order_by('-created_at'), 'adjustment_kid_created_idx')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentSubmissionLoadTest(TransactionTestCase):
+    """Fire simultaneous duplicate chore/reward submissions for one kid.
+
+    Needs a database with real concurrent writers (PostgreSQL); SQLite's
+    shared in-memory test database cannot serve parallel requests.
+    """
+
+    THREADS = 8
+
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='parentpass123')
+        self.kid = Kid.objects.create(name='Tapper', pin='1234', parent=self.parent, points_balance=100)
+        self.chore = Chore.objects.create(title='Chore', points=10, parent=self.parent)
+        self.reward = Reward.objects.create(title='Reward', cost_points=10, parent=self.parent)
+
+    def _fire(self, url):
+        barrier = threading.Barrier(self.THREADS)
+        statuses, errors = [], []
+
+        def worker():
+            try:
+                client = self.client_class()
+                session = client.session
+                session['kid_id'] = self.kid.id
+                session.save()
+                barrier.wait()
+                statuses.append(client.post(url).status_code)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [302] * self.THREADS)
+
+    def test_duplicate_taps_create_one_pending_row(self):
+        """Exactly one pending log and one pending redemption survive the burst."""
+        self._fire(reverse('complete_chore', args=[self.chore.id]))
+        self._fire(reverse('redeem_reward', args=[self.reward.id]))
+        self.assertEqual(ChoreLog.objects.filter(child=self.kid, status='PENDING').count(), 1)
+        self.assertEqual(Redemption.objects.filter(child=self.kid, status='PENDING').count(), 1)
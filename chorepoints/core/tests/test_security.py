@@ -2,10 +2,15 @@
 Security tests for ChorePoints application.
 Tests authentication, authorization, and security measures.
 """
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
 from core.models import Kid, Chore, Reward, ChoreLog, Redemption
+from core.sessions import SessionStore
 
 
 class AuthenticationSecurityTests(TestCase):
@@ -85,6 +90,41 @@ class AuthenticationSecurityTests(TestCase):
         # Logout
         self.client.post(reverse('kid_logout'))
         self.assertNotIn('kid_id', self.client.session)
+
+    def test_logged_out_session_key_cannot_be_replayed(self):
+        """Logout removes the cached copy as well as the database row."""
+        self.client.post(reverse('kid_login'), {
+            'kid': self.kid1.id,
+            'pin': '1234'
+        })
+        old_key = self.client.cookies['sessionid'].value
+        self.client.post(reverse('kid_logout'))
+
+        self.client.cookies['sessionid'] = old_key
+        response = self.client.get(reverse('kid_home'))
+        self.assertRedirects(response, reverse('kid_login'))
+
+    def test_session_falls_back_to_database(self):
+        """Sessions survive an emptied or failing cache (write-through to the DB)."""
+        self.client.post(reverse('kid_login'), {
+            'kid': self.kid1.id,
+            'pin': '1234'
+        })
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('kid_home')).status_code, 200)
+
+        def unavailable_for_sessions(method):
+            def wrapper(self, key, *args, **kwargs):
+                if key.startswith(SessionStore.cache_key_prefix):
+                    raise ConnectionError
+                return method(self, key, *args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(LocMemCache, 'get', unavailable_for_sessions(LocMemCache.get)), \
+                mock.patch.object(LocMemCache, 'set', unavailable_for_sessions(LocMemCache.set)):
+            with self.assertLogs('django.contrib.sessions', 'ERROR'):
+                response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.status_code, 200)
     
     def test_pin_stored_as_plaintext_mvp_limitation(self):
         """Test that PINs are stored as plaintext (MVP limitation, documented)."""
@@ -10,9 +10,12 @@ Tests cover:
 - Landing page view: display and navigation
 """
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
 from core.models import Kid, Chore, Reward, ChoreLog, Redemption
 
 
@@ -101,6 +104,68 @@ class KidLoginViewTests(TestCase):
         self.assertNotIn('kid_id', self.client.session)
 
 
+class FamilyLoginViewTests(TestCase):
+    """Test family-scoped kid login."""
+
+    def setUp(self):
+        self.client = Client()
+        self.parent = User.objects.create_user(username='family1', password='testpass123')
+        self.other_parent = User.objects.create_user(username='family2', password='testpass123')
+        self.kid = Kid.objects.create(name='Elija', parent=self.parent, pin='1234')
+        self.other_kid = Kid.objects.create(name='Kaimynas', parent=self.other_parent, pin='1234')
+        self.url = reverse('family_kid_login', args=[self.parent.family.login_code])
+
+    def test_first_kid_creates_family(self):
+        """Every parent with kids gets a login code."""
+        self.assertEqual(len(self.parent.family.login_code), 8)
+        self.assertNotEqual(self.parent.family.login_code, self.other_parent.family.login_code)
+
+    def test_family_url_lists_only_own_kids(self):
+        """The picker shows one family's kids and binds the device to it."""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Elija')
+        self.assertNotContains(response, 'Kaimynas')
+        self.assertEqual(response.cookies['family_code'].value, self.parent.family.login_code)
+
+    def test_plain_url_asks_for_code_when_several_families(self):
+        """Without a code no kids are listed at all."""
+        response = self.client.get(reverse('kid_login'))
+        self.assertContains(response, 'name="family"')
+        self.assertNotContains(response, 'Elija')
+        self.assertNotContains(response, 'Kaimynas')
+
+    def test_plain_url_rejects_login_without_family(self):
+        """Without a code or cookie a posted kid and PIN from any family is refused."""
+        response = self.client.post(reverse('kid_login'), {'kid': self.kid.id, 'pin': '1234'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('kid_id', self.client.session)
+
+    def test_plain_url_uses_typed_code_then_device_cookie(self):
+        """A typed code opens the family picker and is remembered."""
+        response = self.client.get(reverse('kid_login'), {'family': self.parent.family.login_code})
+        self.assertContains(response, 'Elija')
+        self.assertNotContains(response, 'Kaimynas')
+
+        response = self.client.get(reverse('kid_login'))
+        self.assertContains(response, 'Elija')
+
+    def test_unknown_code(self):
+        """Unknown codes show an error or a 404 for the family URL."""
+        response = self.client.get(reverse('kid_login'), {'family': 'nope'})
+        self.assertContains(response, 'Tokio šeimos kodo nėra')
+        response = self.client.get(reverse('family_kid_login', args=['nope']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_family_url_rejects_other_family_kid(self):
+        """Only kids of the URL's family can log in there."""
+        response = self.client.post(self.url, {'kid': self.other_kid.id, 'pin': '1234'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('kid_id', self.client.session)
+
+        response = self.client.post(self.url, {'kid': self.kid.id, 'pin': '1234'})
+        self.assertRedirects(response, reverse('kid_home'))
+
+
 class KidHomeViewTests(TestCase):
     """Test kid home view."""
     
@@ -187,6 +252,54 @@ class KidHomeViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Pasiekei visus apdovanojimus!")
 
+    def test_snapshot_refreshes_after_catalog_change(self):
+        """New chores and rewards from the parent appear on the next load."""
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+        self.client.get(reverse('kid_home'))
+        
+        Chore.objects.create(title='Fresh Chore', points=3, parent=self.user)
+        self.reward.title = 'Renamed Reward'
+        self.reward.save()
+        
+        response = self.client.get(reverse('kid_home'))
+        self.assertContains(response, 'Fresh Chore')
+        self.assertContains(response, 'Renamed Reward')
+    
+    def test_snapshot_refreshes_after_rejection(self):
+        """Rejecting a pending chore removes it from the pending list."""
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+        log = ChoreLog.objects.create(child=self.kid, chore=self.chore)
+        response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.context['pending_logs'], [log])
+        
+        log.reject()
+        response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.context['pending_logs'], [])
+
+    def test_seen_cursor_effects_fire_once(self):
+        """Confetti and unlock effects show on the first load after an approval only."""
+        session = self.client.session
+        session['kid_id'] = self.kid.id
+        session.save()
+        response = self.client.get(reverse('kid_home'))
+        self.assertFalse(response.context['approved_new'])
+        
+        ChoreLog.objects.create(child=self.kid, chore=self.chore).approve()
+        response = self.client.get(reverse('kid_home'))
+        self.assertTrue(response.context['approved_new'])
+        self.assertTrue(response.context['milestone_unlocked'])
+        self.assertTrue(response.context['points_changed'])
+        
+        response = self.client.get(reverse('kid_home'))
+        self.assertFalse(response.context['approved_new'])
+        self.assertFalse(response.context['milestone_unlocked'])
+        self.assertFalse(response.context['points_changed'])
+        self.assertNotIn('last_seen_approval_ts', self.client.session)
+
 
 class ChoreSubmissionViewTests(TestCase):
     """Test chore submission view."""
@@ -249,6 +362,23 @@ class ChoreSubmissionViewTests(TestCase):
         # Should only have one ChoreLog
         self.assertEqual(ChoreLog.objects.filter(child=self.kid, chore=self.chore).count(), 1)
     
+    def test_duplicate_tap_resolved_in_one_query(self):
+        """A repeated submission finds the pending log with a single ChoreLog query."""
+        self.client.post(reverse('complete_chore', args=[self.chore.id]))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('complete_chore', args=[self.chore.id]))
+        log_queries = [q['sql'] for q in queries if 'core_chorelog' in q['sql']]
+        self.assertEqual(len(log_queries), 1, log_queries)
+        self.assertTrue(log_queries[0].startswith('SELECT'))
+
+    def test_resubmit_after_approval_creates_new_log(self):
+        """Only pending logs block a submission; approved chores can be done again."""
+        self.client.post(reverse('complete_chore', args=[self.chore.id]))
+        ChoreLog.objects.get(child=self.kid).approve()
+        self.client.post(reverse('complete_chore', args=[self.chore.id]))
+        self.assertEqual(ChoreLog.objects.filter(child=self.kid, status='PENDING').count(), 1)
+        self.assertEqual(ChoreLog.objects.filter(child=self.kid).count(), 2)
+
     def test_submit_nonexistent_chore(self):
         """Test submitting non-existent chore fails gracefully."""
         response = self.client.post(reverse('complete_chore', args=[99999]))
@@ -372,6 +502,23 @@ class PINChangeViewTests(TestCase):
         self.kid.refresh_from_db()
         self.assertEqual(self.kid.pin, '5678')
     
+    def test_change_pin_keeps_balance_changed_elsewhere(self):
+        """A PIN change never writes back a balance read before an approval."""
+        self.client.get(reverse('kid_home'))  # kid row cached by this worker
+        # Another worker's approval: its stamp bump is not seen here
+        Kid.objects.filter(pk=self.kid.pk).update(points_balance=F('points_balance') + 50)
+        self.client.post(reverse('change_pin'), {'old_pin': '1234', 'new_pin': '5678', 'confirm_pin': '5678'})
+        self.kid.refresh_from_db()
+        self.assertEqual((self.kid.pin, self.kid.points_balance), ('5678', 50))
+
+    @override_settings(SHARED_CACHE=False, DASHBOARD_SNAPSHOT_TIMEOUT=0)  # as in production without Redis
+    def test_unshared_cache_reads_kid_row_every_request(self):
+        """Without a shared cache a balance changed by another worker shows up at once."""
+        self.client.get(reverse('kid_home'))
+        Kid.objects.filter(pk=self.kid.pk).update(points_balance=F('points_balance') + 50)
+        response = self.client.get(reverse('kid_home'))
+        self.assertEqual(response.context['kid'].points_balance, 50)
+
     def test_change_pin_with_incorrect_old_pin(self):
         """Test changing PIN fails with incorrect old PIN."""
         response = self.client.post(reverse('change_pin'), {
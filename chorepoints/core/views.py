@@ -1,12 +1,15 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from chorepoints.db_router import primary_reads
 from .forms import KidLoginForm, ChangePinForm, AvatarUploadForm
-from .models import Kid, Chore, Reward, ChoreLog, Redemption
-from django.utils import timezone
-import json
+from .models import Family, Kid, Chore, Reward, ChoreLog, Redemption, KidSeenCursor
+from .caching import cache_is_shared, get_kid_version, get_kid_picker_version
+from .dashboard import get_dashboard_snapshot
+from .images import delete_renditions
 import datetime
 
 def index(request):
@@ -22,9 +25,37 @@ def health_check(request):
         "message": "Deployment verification endpoint - version updated via GitHub Actions"
     })
 
+# Remembers which family a kid device (tablet) belongs to
+FAMILY_COOKIE = "family_code"
+FAMILY_COOKIE_AGE = 365 * 24 * 3600
+
+
+def _device_family(request):
+    """Family for a visit to the plain /kid/login/ URL.
+
+    A typed family code wins, then the code the device remembered. A
+    deployment with a single family needs no code at all.
+    """
+    code = request.GET.get("family") or request.COOKIES.get(FAMILY_COOKIE)
+    if code:
+        return Family.objects.filter(login_code=code.strip().lower()).first()
+    families = list(Family.objects.all()[:2])
+    return families[0] if len(families) == 1 else None
+
+
 @require_http_methods(["GET", "POST"])
-def kid_login(request):
-    form = KidLoginForm(request.POST or None)
+def kid_login(request, family_code=None):
+    if family_code is not None:
+        family = get_object_or_404(Family, login_code=family_code)
+    else:
+        family = _device_family(request)
+        if request.GET.get("family") and family is None:
+            messages.error(request, "Tokio šeimos kodo nėra.")
+    if family is None:
+        # A posted kid/PIN pair is not even validated without a family
+        form = KidLoginForm()
+    else:
+        form = KidLoginForm(request.POST or None, parent_id=family.parent_id)
     if request.method == "POST" and form.is_valid():
         kid = form.cleaned_data["kid"]
         pin = form.cleaned_data["pin"]
@@ -33,78 +64,102 @@ def kid_login(request):
             messages.success(request, kid.get_greeting())
             return redirect("kid_home")
         messages.error(request, "Neteisingas PIN arba paskyra neaktyvi.")
-    return render(request, "kid/login.html", {"form": form})
+    if family is None:
+        # Without a family only the code form is shown, never other families' kids
+        return render(request, "kid/login.html", {"form": form, "family": None})
+
+    # The tile grid is cached as rendered HTML; the family's kids are only
+    # queried (and photo URLs built) when its picker version changes
+    response = render(request, "kid/login.html", {
+        "form": form,
+        "family": family,
+        "picker_version": get_kid_picker_version(family.parent_id),
+        "kid_picker_timeout": getattr(settings, "KID_PICKER_TIMEOUT", 3600),
+    })
+    response.set_cookie(
+        FAMILY_COOKIE, family.login_code, max_age=FAMILY_COOKIE_AGE, httponly=True, samesite="Lax",
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+    return response
 
 def kid_logout(request):
     request.session.pop("kid_id", None)
     messages.info(request, "Atsijungta.")
     return redirect("index")
 
+# Kid rows per worker process: kid id -> (kid version stamp, field values).
+# The stamp is bumped on every kid save and ledger update, so a balance or
+# active flag can never be served stale; entries are reused until then. That
+# only holds if every worker sees the bumps, so without a shared cache
+# (SHARED_CACHE) the row is read on every request.
+_KID_FIELDS = [field.attname for field in Kid._meta.concrete_fields]
+_KID_ROWS = {}
+_KID_ROWS_MAX = 1000
+
+
+def _load_kid_row(kid_id):
+    if not cache_is_shared():
+        return Kid.objects.filter(pk=kid_id).values_list(*_KID_FIELDS).first()
+    version = get_kid_version(kid_id)
+    cached = _KID_ROWS.get(kid_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    with primary_reads():  # the balance and active flag are cached until the next bump
+        row = Kid.objects.filter(pk=kid_id).values_list(*_KID_FIELDS).first()
+    if len(_KID_ROWS) >= _KID_ROWS_MAX:
+        _KID_ROWS.clear()
+    _KID_ROWS[kid_id] = (version, row)
+    return row
+
+
 def _get_kid(request):
+    """The logged-in kid, loaded once per request and cached per process."""
     kid_id = request.session.get("kid_id")
     if not kid_id:
         return None
-    return get_object_or_404(Kid, pk=kid_id, active=True)
+    if getattr(request, "_cached_kid", None) is None:
+        row = _load_kid_row(kid_id)
+        # A fresh instance per request, so views may modify and save it
+        kid = Kid.from_db(Kid.objects.db, _KID_FIELDS, row) if row else None
+        if kid is None or not kid.active:
+            raise Http404("No Kid matches the given query.")
+        request._cached_kid = kid
+    return request._cached_kid
 
 def kid_home(request):
     kid = _get_kid(request)
     if not kid:
         return redirect("kid_login")
-    chores = Chore.objects.filter(parent=kid.parent, active=True).order_by("title")
-    rewards = Reward.objects.filter(parent=kid.parent, active=True).order_by("cost_points")
-    pending_logs = kid.chore_logs.filter(status=ChoreLog.Status.PENDING).order_by('-logged_at')
-    pending_redemptions = kid.redemptions.filter(status=Redemption.Status.PENDING).order_by('-redeemed_at')
-    pending_chore_ids = list(pending_logs.values_list('chore_id', flat=True))
-    pending_reward_ids = list(pending_redemptions.values_list('reward_id', flat=True))
+    # Cached per kid; only per-visit effects are computed below
+    data = get_dashboard_snapshot(kid)
+    rewards = data["rewards"]
+    map_data = data["map_data"]
 
-    # Progress to next reward
-    next_reward = None
-    progress_percent = 0
-    if rewards:
-        # reward just above current balance
-        higher = [r for r in rewards if r.cost_points > kid.points_balance]
-        if higher:
-            next_reward = higher[0]
-            progress_percent = int(min(100, (kid.points_balance / next_reward.cost_points) * 100))
-        else:
-            # already can afford all rewards
-            next_reward = rewards.last()  # most expensive
-            progress_percent = 100
+    # "New since last visit" effects compare against the kid's seen cursor,
+    # which is only written when something actually changed
+    cursor = KidSeenCursor.objects.filter(pk=kid.pk).first() or KidSeenCursor(kid=kid)
+    first_visit = cursor._state.adding
 
     # Confetti trigger: detect newly approved logs or redemptions since last visit
-    last_seen_iso = request.session.get("last_seen_approval_ts")
-    approved_new = False
-    now_ts = timezone.now()
-    if last_seen_iso:
-        try:
-            last_seen_dt = timezone.datetime.fromisoformat(last_seen_iso)
-            if timezone.is_naive(last_seen_dt):
-                last_seen_dt = timezone.make_aware(last_seen_dt, timezone.get_current_timezone())
-        except Exception:
-            last_seen_dt = None
-        if last_seen_dt:
-            new_approved_logs = kid.chore_logs.filter(status=ChoreLog.Status.APPROVED, processed_at__gt=last_seen_dt).exists()
-            new_approved_reds = kid.redemptions.filter(status=Redemption.Status.APPROVED, processed_at__gt=last_seen_dt).exists()
-            approved_new = new_approved_logs or new_approved_reds
-    # update timestamp AFTER computing
-    request.session["last_seen_approval_ts"] = now_ts.isoformat()
+    latest_approval_at = data["latest_approval_at"]
+    approved_new = bool(
+        latest_approval_at and not first_visit
+        and (cursor.approval_at is None or latest_approval_at > cursor.approval_at)
+    )
     
     # Milestone unlock detection: check if map_position has advanced
-    last_seen_map_position = request.session.get("last_seen_map_position", 0)
+    last_seen_map_position = cursor.map_position
     milestone_unlocked = kid.map_position > last_seen_map_position
     newly_unlocked_milestones = []
     old_map_position = last_seen_map_position  # Store for animation
     if milestone_unlocked:
         # Find which milestones were just unlocked
-        map_data_temp = kid.get_map_progress()
-        for milestone in map_data_temp['milestones']:
-            if last_seen_map_position < milestone['position'] <= kid.map_position:
-                newly_unlocked_milestones.append(milestone)
-    # Update last seen map position
-    request.session["last_seen_map_position"] = kid.map_position
+        newly_unlocked_milestones = kid.milestone_index.reached_between(
+            map_data['milestones'], last_seen_map_position, kid.map_position
+        )
     
     # Track newly affordable rewards (treasure unlock effect)
-    last_seen_balance = request.session.get("last_seen_balance", kid.points_balance)
+    last_seen_balance = kid.points_balance if cursor.points_balance is None else cursor.points_balance
     points_changed = kid.points_balance != last_seen_balance
     old_points_balance = last_seen_balance
     newly_affordable_reward_ids = []
@@ -113,18 +168,12 @@ def kid_home(request):
         for reward in rewards:
             if last_seen_balance < reward.cost_points <= kid.points_balance:
                 newly_affordable_reward_ids.append(reward.id)
-    # Update last seen balance AFTER we've captured the old value
-    request.session["last_seen_balance"] = kid.points_balance
-    
-    # Recent approved history (limit 10 each)
-    approved_logs = kid.chore_logs.filter(status=ChoreLog.Status.APPROVED).order_by('-processed_at')[:10]
-    approved_redemptions = kid.redemptions.filter(status=Redemption.Status.APPROVED).order_by('-processed_at')[:10]
-    
-    # Get recent point adjustments (both positive and negative)
-    recent_adjustments = kid.point_adjustments.order_by('-created_at')[:10]
-    
-    # Adventure Map progress data
-    map_data = kid.get_map_progress()
+
+    # Update the cursor AFTER we've captured the old values
+    seen = {"map_position": kid.map_position, "points_balance": kid.points_balance}
+    if latest_approval_at:
+        seen["approval_at"] = latest_approval_at
+    cursor.advance(**seen)
     
     # Calculate old progress percentage for movement animation
     old_progress_percentage = kid.get_avatar_progress_percentage(old_map_position)
@@ -149,28 +198,41 @@ def kid_home(request):
         "kid/home.html",
         {
             "kid": kid,
-            "chores": chores,
+            "chores": data["chores"],
             "rewards": rewards,
-            "pending_logs": pending_logs,
-            "pending_redemptions": pending_redemptions,
-            "next_reward": next_reward,
-            "progress_percent": progress_percent,
+            "pending_logs": data["pending_logs"],
+            "pending_redemptions": data["pending_redemptions"],
+            "next_reward": data["next_reward"],
+            "progress_percent": data["progress_percent"],
             "approved_new": approved_new,
-            "pending_chore_ids": pending_chore_ids,
-            "pending_reward_ids": pending_reward_ids,
-            "approved_logs": approved_logs,
-            "approved_redemptions": approved_redemptions,
-            "recent_adjustments": recent_adjustments,
+            "pending_chore_ids": data["pending_chore_ids"],
+            "pending_reward_ids": data["pending_reward_ids"],
+            "approved_logs": data["approved_logs"],
+            "approved_redemptions": data["approved_redemptions"],
+            "recent_adjustments": data["recent_adjustments"],
             "map_data": map_data,
+            "map_fragment_timeout": getattr(settings, "MAP_FRAGMENT_TIMEOUT", 3600),
             "milestone_unlocked": milestone_unlocked,
             "newly_unlocked_milestones": newly_unlocked_milestones,
-            "newly_unlocked_milestones_json": json.dumps(newly_unlocked_milestones),
             "old_map_position": old_map_position,
             "old_progress_percentage": old_progress_percentage,
             "newly_affordable_reward_ids": newly_affordable_reward_ids,
-            "django_messages_json": json.dumps(django_messages),
             "points_changed": points_changed,
             "old_points_balance": old_points_balance,
+            # Everything static/core/js/home.js needs, rendered with json_script
+            "page_data": {
+                "messages": django_messages,
+                "pointsChanged": points_changed,
+                "milestoneUnlocked": milestone_unlocked,
+                "newlyUnlockedMilestones": newly_unlocked_milestones,
+                "approvedNew": approved_new,
+                "stats": {
+                    "approvedChores": len(data["approved_logs"]),
+                    "currentPoints": kid.points_balance,
+                    "mapPosition": kid.map_position,
+                    "approvedRedemptions": len(data["approved_redemptions"]),
+                },
+            },
         },
     )
 
@@ -179,12 +241,16 @@ def complete_chore(request, chore_id):
     kid = _get_kid(request)
     if not kid:
         return redirect("kid_login")
-    chore = get_object_or_404(Chore, pk=chore_id, parent=kid.parent, active=True)
-    # Prevent duplicate pending submission for same chore
-    if ChoreLog.objects.filter(child=kid, chore=chore, status=ChoreLog.Status.PENDING).exists():
+    chore = get_object_or_404(Chore, pk=chore_id, parent_id=kid.parent_id, active=True)
+    # One pending submission per chore (unique_pending_chorelog); a double tap
+    # finds the existing row with one SELECT, a racing one hits the constraint
+    _, created = ChoreLog.objects.get_or_create(
+        child=kid, chore=chore, status=ChoreLog.Status.PENDING,
+        defaults={"points_awarded": chore.points},
+    )
+    if not created:
         messages.info(request, "Šis darbas jau laukia patvirtinimo.")
         return redirect("kid_home")
-    ChoreLog.objects.create(child=kid, chore=chore, points_awarded=chore.points)
     messages.success(request, f"Pateikta patvirtinimui: '{chore.title}' (+{chore.points} tšk). Laukia tėvų patvirtinimo.")
     return redirect("kid_home")
 
@@ -193,13 +259,15 @@ def redeem_reward(request, reward_id):
     kid = _get_kid(request)
     if not kid:
         return redirect("kid_login")
-    reward = get_object_or_404(Reward, pk=reward_id, parent=kid.parent, active=True)
-    # Prevent duplicate pending request for same reward
-    if Redemption.objects.filter(child=kid, reward=reward, status=Redemption.Status.PENDING).exists():
+    reward = get_object_or_404(Reward, pk=reward_id, parent_id=kid.parent_id, active=True)
+    # Pending request, idempotent like complete_chore (points are deducted upon approval)
+    _, created = Redemption.objects.get_or_create(
+        child=kid, reward=reward, status=Redemption.Status.PENDING,
+        defaults={"cost_points": reward.cost_points},
+    )
+    if not created:
         messages.info(request, "Šis apdovanojimo prašymas jau laukia patvirtinimo.")
         return redirect("kid_home")
-    # create pending request (points will be deducted upon approval)
-    Redemption.objects.create(child=kid, reward=reward, cost_points=reward.cost_points)
     messages.success(request, f"Prašymas dėl apdovanojimo: '{reward.title}' ({reward.cost_points} tšk) pateiktas ir laukia patvirtinimo.")
     return redirect("kid_home")
 
@@ -221,9 +289,10 @@ def change_pin(request):
                 messages.error(request, "Neteisingas senas PIN. Bandyk dar kartą.")
                 return render(request, "kid/change_pin.html", {"form": form, "kid": kid})
             
-            # Update to new PIN
+            # Update to new PIN; only the PIN, so a kid row read before a
+            # concurrent approval can never write back an older balance
             kid.pin = new_pin
-            kid.save()
+            kid.save(update_fields=["pin"])
             messages.success(request, "PIN sėkmingai pakeistas! Dabar gali naudoti naują PIN prisijungimui.")
             return redirect("kid_home")
     else:
@@ -261,13 +330,19 @@ def upload_avatar(request):
             # If emoji is set, clear photo  
             elif avatar_emoji:
                 if updated_kid.photo:
-                    # Delete old photo from storage
+                    # Delete old photo and its renditions from storage
+                    delete_renditions(updated_kid.photo.storage, updated_kid.photo_renditions)
                     updated_kid.photo.delete(save=False)
                 updated_kid.photo = None
+                updated_kid.photo_renditions = {}
             
-            # Now save with changes
-            updated_kid.save()
-            messages.success(request, "Avataras sėkmingai atnaujintas! 🎉")
+            # Now save with changes (never the ledger counters, see change_pin)
+            updated_kid.save(update_fields=["photo", "photo_ready", "photo_renditions", "avatar_emoji"])
+            if photo:
+                # Downscaled by the image worker; shown once it is ready
+                messages.success(request, "Nuotrauka įkelta! 🎉 Ji atsiras po kelių akimirkų.")
+            else:
+                messages.success(request, "Avataras sėkmingai atnaujintas! 🎉")
             return redirect("kid_home")
     else:
         form = AvatarUploadForm(instance=kid)
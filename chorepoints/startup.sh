@@ -6,12 +6,40 @@ echo "Starting ChorePoints Django App..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
-# Collect static files
-python manage.py collectstatic --noinput
+# Collect static files. The deploy workflow ships them prebuilt (hashed names +
+# .br/.gz variants served by WhiteNoise), so this only runs when they are
+# missing or when AZURE_STATIC_FILES opts into publishing them to Blob Storage.
+if [ -n "$AZURE_STATIC_FILES" ] || [ ! -f staticfiles/staticfiles.json ]; then
+    python manage.py collectstatic --noinput
+fi
 
 # Run database migrations
 python manage.py migrate --noinput
 
+# Delete expired sessions now and then every hour (SESSION_CLEANUP_INTERVAL
+# seconds) for as long as the instance runs, so django_session does not grow
+# without a cron job. Cached session copies expire with SESSION_COOKIE_AGE.
+python manage.py clearsessions
+(
+    while true; do
+        sleep "${SESSION_CLEANUP_INTERVAL:-3600}"
+        python manage.py clearsessions || echo "clearsessions failed with status $?" >&2
+    done
+) &
+
+# Background worker that downscales uploaded photos and icons (ImageJob queue);
+# uploads show the emoji/letter fallback until it has processed them, so it is
+# restarted whenever it exits (the exit is logged to the App Service log stream)
+(
+    args="--backfill"
+    while true; do
+        python manage.py process_image_jobs $args
+        echo "process_image_jobs exited with status $?, restarting in 5s" >&2
+        args=""
+        sleep 5
+    done
+) &
+
 # Create superuser if it doesn't exist (optional)
 # python manage.py shell -c "from django.contrib.auth import get_user_model; User = get_user_model(); User.objects.filter(username='admin').exists() or User.objects.create_superuser('admin', 'admin@example.com', 'changeme')"
 